@@ -1,23 +1,27 @@
 from django.contrib import admin
-from .models import User, ArtistProfile, OrganizerProfile, PortfolioItem, Availability, GroupMember
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
+from django.db import transaction
+from .models import User, ArtistProfile, OrganizerProfile, PortfolioItem, Availability, GroupMember, ArtistApprovalEmail
 from django.urls import reverse
+from . import profile_page, search
 
 # Action function to approve artists
 def approve_artists(modeladmin, request, queryset):
-    for artist_profile in queryset:
-        artist_profile.is_approved = True
-        artist_profile.user.is_active = True
-        artist_profile.user.save()
-        artist_profile.save()
-        # Check preference before sending email
-        if artist_profile.user.email_notifications_enabled:
-            subject = 'Your StageLink Account has been Approved!'
-            login_url = request.build_absolute_uri(reverse('account_login'))
-            context = {'artist': artist_profile, 'login_url': login_url}
-            message = render_to_string('emails/artist_approval_email.html', context)
-            send_mail(subject, message, 'donotreply@stagelink.com', [artist_profile.user.email], html_message=message)
+    # Set-based: two UPDATEs and one bulk INSERT, however many artists are selected.
+    artist_ids = list(queryset.filter(is_approved=False).values_list('pk', flat=True))
+    login_url = request.build_absolute_uri(reverse('account_login'))
+    with transaction.atomic():
+        ArtistProfile.objects.filter(pk__in=artist_ids).update(is_approved=True)
+        User.objects.filter(pk__in=artist_ids).update(is_active=True)
+        # Check preference before queueing the email; `manage.py send_approval_emails` delivers them.
+        opted_in = User.objects.filter(pk__in=artist_ids, email_notifications_enabled=True).values_list('pk', flat=True)
+        ArtistApprovalEmail.objects.bulk_create(
+            [ArtistApprovalEmail(artist_id=pk, login_url=login_url) for pk in opted_in]
+        )
+        # update() skips the save signals that keep the search index and the
+        # cached profile page fragments current.
+        transaction.on_commit(lambda: search.index_artists(artist_ids))
+        profile_page.invalidate_artists(artist_ids)
+    modeladmin.message_user(request, f"Approved {len(artist_ids)} artists; approval emails have been queued.")
 approve_artists.short_description = "Approve selected artists"
 
 # Inline admin for group members
@@ -33,6 +37,18 @@ class ArtistProfileAdmin(admin.ModelAdmin):
     search_fields = ('contact_name', 'group_name', 'user__email')
     actions = [approve_artists]
     inlines = [GroupMemberInline]
+    # Maintained by ratings.apply_review(); a full save from a stale change form would undo it.
+    readonly_fields = (
+        'rating_count', 'rating_sum', 'rating_average',
+        'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count',
+    )
+
+    def save_model(self, request, obj, form, change):
+        # Changing the primary key (user) saves a new row, which needs every column.
+        if change and 'user' not in form.changed_data:
+            obj.save(update_fields=[name for name in form.fields if name != 'user'])
+        else:
+            obj.save()
 
 # Register your models
 admin.site.register(User)
@@ -40,4 +56,5 @@ admin.site.register(ArtistProfile, ArtistProfileAdmin)
 admin.site.register(OrganizerProfile)
 admin.site.register(PortfolioItem)
 admin.site.register(Availability)
+admin.site.register(ArtistApprovalEmail)
 
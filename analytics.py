@@ -0,0 +1,171 @@
+# accounts/analytics.py
+"""
+Per-artist daily analytics rollups.
+
+Every booking request, answer and review adds to one ArtistDailyStats row
+(artist, day) with an F() update, so nothing here ever re-reads an artist's
+history:
+
+  - new booking request      -> requests        (accounts/signals.py)
+  - accept / decline         -> accepted, declined, responses, response_seconds,
+                                earnings at the artist's price (bookings/reservations.py)
+  - review written / deleted -> reviews, rating_total (accounts/signals.py)
+  - review edited            -> that day's review counters recounted
+
+artist_summary() reads a fixed window of rows - at most two rows per day of
+the window, whatever the artist's history length. backfill_artist() rebuilds
+the rows from Booking and Review (see `manage.py backfill_artist_stats`).
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from bookings.intervals import day_bounds, local_date
+from bookings.models import Booking
+from reviews.models import Review
+
+from .models import ArtistDailyStats
+
+COUNTERS = ('requests', 'accepted', 'declined', 'responses', 'response_seconds', 'earnings', 'reviews', 'rating_total')
+MAX_SUMMARY_DAYS = 365
+
+
+def _add(field, value):
+    if value > 0:
+        return F(field) + value
+    # Counters never go below zero, even if the matching increment was missed.
+    return Greatest(F(field) + value, 0, output_field=ArtistDailyStats._meta.get_field(field))
+
+
+def record(artist_id, day, **deltas):
+    """
+    Adds `deltas` (e.g. requests=1) to the artist's row for `day`, creating it
+    if needed. Negative deltas stop at zero; on a missing row they are no-ops.
+    """
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    rows = ArtistDailyStats.objects.filter(artist_id=artist_id, day=day)
+    updates = {field: _add(field, value) for field, value in deltas.items()}
+    if rows.update(**updates):
+        return
+    initial = {field: value for field, value in deltas.items() if value > 0}
+    if not initial:
+        return
+    try:
+        with transaction.atomic():
+            ArtistDailyStats.objects.create(artist_id=artist_id, day=day, **initial)
+    except IntegrityError:
+        # Another request created the row first; anything else is a real error.
+        if not rows.update(**updates):
+            raise
+
+
+def record_request(booking):
+    record(booking.artist_id, local_date(booking.created_at), requests=1)
+
+
+def record_responses(artist_id, responded_at, accepted=(), declined=(), earnings=0):
+    """`accepted` / `declined` are the created_at times of the requests answered at `responded_at`."""
+    waits = [max(0, int((responded_at - created_at).total_seconds())) for created_at in (*accepted, *declined)]
+    record(
+        artist_id, local_date(responded_at),
+        accepted=len(accepted), declined=len(declined),
+        responses=len(waits), response_seconds=sum(waits), earnings=earnings,
+    )
+
+
+def record_review(review, sign=1):
+    record(review.artist_id, local_date(review.created_at), reviews=sign, rating_total=sign * review.rating)
+
+
+def recount_reviews(artist_id, day):
+    """Rewrites one day's review counters from the Review table, e.g. after a rating was edited."""
+    start, end = day_bounds(day, day)
+    counts = Review.objects.filter(artist_id=artist_id, created_at__gte=start, created_at__lt=end).aggregate(
+        reviews=Count('pk'), rating_total=Coalesce(Sum('rating'), 0),
+    )
+    if not ArtistDailyStats.objects.filter(artist_id=artist_id, day=day).update(**counts):
+        record(artist_id, day, **counts)
+
+
+def _blank_day(day):
+    return {'day': day, **{field: 0 for field in COUNTERS}}
+
+
+def _totals(rows):
+    totals = {field: sum(row[field] for row in rows) for field in COUNTERS}
+    answered = totals['accepted'] + totals['declined']
+    totals['acceptance_rate'] = round(100 * totals['accepted'] / answered) if answered else None
+    totals['average_response_hours'] = (
+        round(totals['response_seconds'] / totals['responses'] / 3600, 1) if totals['responses'] else None
+    )
+    totals['average_rating'] = round(totals['rating_total'] / totals['reviews'], 2) if totals['reviews'] else None
+    return totals
+
+
+def artist_summary(artist_id, days=30, today=None):
+    """
+    Dashboard figures for the last `days` days: a zero-filled daily series for
+    charts, window totals, and the change in average rating against the
+    window before it. Reads at most 2 * days rows.
+    """
+    days = max(1, min(int(days), MAX_SUMMARY_DAYS))
+    today = today or timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    previous_start = start - timedelta(days=days)
+    stored = {
+        row['day']: row
+        for row in ArtistDailyStats.objects.filter(artist_id=artist_id, day__gte=previous_start, day__lte=today)
+        .values('day', *COUNTERS)
+    }
+    series = [stored.get(day, _blank_day(day)) for day in (start + timedelta(days=n) for n in range(days))]
+    previous = [row for day, row in stored.items() if day < start]
+    for row in series:
+        row['average_rating'] = round(row['rating_total'] / row['reviews'], 2) if row['reviews'] else None
+
+    totals = _totals(series)
+    previous_rating = _totals(previous)['average_rating']
+    rating_change = None
+    if totals['average_rating'] is not None and previous_rating is not None:
+        rating_change = round(totals['average_rating'] - previous_rating, 2)
+    return {'days': days, 'series': series, 'totals': totals, 'rating_change': rating_change}
+
+
+def backfill_artist(artist_id):
+    """Recomputes every row for one artist from Booking and Review. Returns the row count."""
+    buckets = defaultdict(lambda: defaultdict(int))
+    bookings = Booking.objects.filter(artist_id=artist_id).values_list(
+        'status', 'created_at', 'responded_at', 'artist__artistprofile__pricing_per_event',
+    )
+    for status, created_at, responded_at, price in bookings.iterator():
+        buckets[local_date(created_at)]['requests'] += 1
+        if status not in (Booking.Status.ACCEPTED, Booking.Status.DECLINED, Booking.Status.COMPLETED):
+            continue
+        # Bookings answered before responded_at existed are counted on their request day.
+        bucket = buckets[local_date(responded_at or created_at)]
+        if status == Booking.Status.DECLINED:
+            bucket['declined'] += 1
+        else:
+            bucket['accepted'] += 1
+            bucket['earnings'] += price or Decimal(0)
+        if responded_at:
+            bucket['responses'] += 1
+            bucket['response_seconds'] += max(0, int((responded_at - created_at).total_seconds()))
+    for rating, created_at in Review.objects.filter(artist_id=artist_id).values_list('rating', 'created_at').iterator():
+        bucket = buckets[local_date(created_at)]
+        bucket['reviews'] += 1
+        bucket['rating_total'] += rating
+
+    with transaction.atomic():
+        ArtistDailyStats.objects.filter(artist_id=artist_id).delete()
+        ArtistDailyStats.objects.bulk_create(
+            [ArtistDailyStats(artist_id=artist_id, day=day, **counts) for day, counts in buckets.items()],
+            batch_size=500,
+        )
+    return len(buckets)
@@ -0,0 +1,263 @@
+# accounts/availability.py
+"""
+Artist availability: blocked periods and month-windowed calendars.
+
+Blocked days are stored as Availability intervals (date .. end_date). An
+artist's intervals are kept disjoint, and adjacent only where a booked period
+meets a manually blocked one: block_ranges() merges new periods with the ones
+of the same kind they touch, so a whole touring season is one row and one
+INSERT. Because intervals are disjoint, "is this day blocked?" is a single
+index seek for the last interval starting on or before the day.
+
+For calendars, an artist's blocked days for one month are packed into an int
+bitmask (bit d-1 set = day d blocked). Masks are computed with one
+index-backed range query over the requested window and cached per
+(artist, month); the Availability save/delete signals and block_ranges() drop
+the cached months they touch. Checking a calendar cell is then a bit test
+instead of a list scan, and organizers can page through months without
+loading the artist's history.
+"""
+import calendar
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import DateField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThanOrEqual
+
+from bookings import intervals
+
+from .models import Availability
+
+CACHE_TIMEOUT = 60 * 60
+MAX_WINDOW_MONTHS = 12
+
+
+def add_months(year, month, delta):
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+
+def month_range(year, month):
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def parse_month(value, default=None):
+    """Parses 'YYYY-MM' into (year, month); returns `default` if invalid."""
+    try:
+        year, month = (int(part) for part in (value or '').split('-'))
+        date(year, month, 1)
+    except (TypeError, ValueError):
+        return default
+    return year, month
+
+
+def _cache_key(artist_id, year, month):
+    return f'availability:{artist_id}:{year}-{month:02d}'
+
+
+def invalidate_range(artist_id, start, end):
+    months = (end.year * 12 + end.month) - (start.year * 12 + start.month) + 1
+    cache.delete_many([_cache_key(artist_id, *add_months(start.year, start.month, offset)) for offset in range(months)])
+
+
+# --- BLOCKED PERIODS ---
+
+def expand_rule(start, end, weekdays=None):
+    """
+    Turns a rule into day ranges: every day from start to end, or only the given
+    weekdays (0=Monday) - e.g. every Monday in Q3. Consecutive days are coalesced.
+    """
+    if weekdays is None:
+        return [(start, end)] if start <= end else []
+    weekdays = set(weekdays)
+    days = []
+    day = start
+    while day <= end:
+        if day.weekday() in weekdays:
+            days.append(day)
+        day += timedelta(days=1)
+    return coalesce_days(days)
+
+
+def coalesce_days(days):
+    ranges = []
+    for day in sorted(set(days)):
+        if ranges and ranges[-1][1] + timedelta(days=1) == day:
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+def merge_ranges(ranges):
+    """Merges overlapping or adjacent (start, end) ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_ranges(ranges, cuts):
+    """The parts of merged `ranges` not covered by merged `cuts`."""
+    remaining = []
+    for start, end in ranges:
+        for cut_start, cut_end in cuts:
+            if cut_end < start or cut_start > end:
+                continue
+            if cut_start > start:
+                remaining.append((start, cut_start - timedelta(days=1)))
+            start = cut_end + timedelta(days=1)
+        if start <= end:
+            remaining.append((start, end))
+    return remaining
+
+
+def _day_count(periods):
+    return sum((end - start).days + 1 for start, end, _ in periods)
+
+
+def block_ranges(artist, ranges, is_booked=False):
+    """
+    Blocks every day in `ranges` for the artist. Existing periods of the same
+    kind (booked or manual) that overlap or touch the new ones are folded in,
+    and the result is written with one bulk_create. Booked days stay booked:
+    manual periods never absorb them, and booking over a manual period splits
+    it. Returns the number of days that were not blocked before.
+    """
+    ranges = merge_ranges(ranges)
+    if not ranges:
+        return 0
+    one_day = timedelta(days=1)
+    low, high = ranges[0][0] - one_day, ranges[-1][1] + one_day
+    with transaction.atomic():
+        touching = list(
+            Availability.objects.select_for_update()
+            .filter(artist=artist, date__lte=high, end_date__gte=low)
+            .order_by('date')
+        )
+        existing = {(row.date, row.end_date, row.is_booked) for row in touching}
+        booked = merge_ranges([(start, end) for start, end, kind in existing if kind] + (ranges if is_booked else []))
+        manual = merge_ranges([(start, end) for start, end, kind in existing if not kind] + ([] if is_booked else ranges))
+        wanted = {(start, end, True) for start, end in booked}
+        wanted |= {(start, end, False) for start, end in subtract_ranges(manual, booked)}
+        # Rewrite only the periods that changed; the rest stay as they are.
+        new_rows = [
+            Availability(artist=artist, date=start, end_date=end, is_booked=kind)
+            for start, end, kind in sorted(wanted - existing)
+        ]
+        replaced = [row.pk for row in touching if (row.date, row.end_date, row.is_booked) not in wanted]
+        Availability.objects.filter(pk__in=replaced).delete()
+        Availability.objects.bulk_create(new_rows)
+        newly_blocked = _day_count(wanted) - _day_count(existing)
+        artist_id = artist.pk
+        transaction.on_commit(lambda: invalidate_range(artist_id, low, high))
+    return newly_blocked
+
+
+def _predecessor(artist_ref, end):
+    return Availability.objects.filter(artist_id=artist_ref, date__lte=end).order_by('-date')
+
+
+def overlapping_period(artist_id, start, end):
+    """
+    The Availability row overlapping start..end, or None. Periods are disjoint,
+    so only the last one starting on or before `end` can reach into the range:
+    one index seek.
+    """
+    candidate = _predecessor(artist_id, end).first()
+    if candidate and candidate.end_date >= start:
+        return candidate
+    return None
+
+
+def blocking_period(artist_id, day):
+    """The Availability row covering `day`, or None."""
+    return overlapping_period(artist_id, day, day)
+
+
+def is_date_blocked(artist_id, day):
+    return blocking_period(artist_id, day) is not None
+
+
+def free_between(start, end, artist_ref='artist_id'):
+    """
+    A filter expression keeping only artists with nothing on between start and
+    end (inclusive): no blocked period overlapping the range and no accepted
+    booking reaching into it. `artist_ref` names the outer column holding the
+    artist id (profile pk == user id). Both checks are the same predecessor
+    seeks as overlapping_period() and intervals.clashing_booking(), written as
+    correlated scalar subqueries (not NOT EXISTS): each fetches the end of the
+    last period or accepted booking starting before the range ends (ORDER BY
+    ... DESC LIMIT 1) and compares it with the range start, so the whole filter
+    stays one query and each check is one index seek per artist.
+    """
+    previous_end = Subquery(_predecessor(OuterRef(artist_ref), end).values('end_date')[:1])
+    blocked = GreaterThanOrEqual(Coalesce(previous_end, Value(start - timedelta(days=1), output_field=DateField())), start)
+    booked = intervals.clash_condition(*intervals.day_bounds(start, end), artist_ref=artist_ref)
+    return ~Q(blocked) & ~Q(booked)
+
+
+def month_bitmaps(artist_id, year, month, months=1):
+    """
+    Returns {(year, month): bitmask} for `months` consecutive months starting at
+    (year, month). Only months missing from the cache hit the database, with a
+    single range query.
+    """
+    months = max(1, min(months, MAX_WINDOW_MONTHS))
+    window = [add_months(year, month, offset) for offset in range(months)]
+    keys = {ym: _cache_key(artist_id, *ym) for ym in window}
+    cached = cache.get_many(keys.values())
+    bitmaps = {ym: cached[key] for ym, key in keys.items() if key in cached}
+
+    missing = [ym for ym in window if ym not in bitmaps]
+    if missing:
+        start, _ = month_range(*missing[0])
+        _, end = month_range(*missing[-1])
+        fresh = {ym: 0 for ym in missing}
+        periods = Availability.objects.filter(artist_id=artist_id, date__lte=end, end_date__gte=start).values_list('date', 'end_date')
+        for period_start, period_end in periods:
+            day = max(period_start, start)
+            while day <= min(period_end, end):
+                ym = (day.year, day.month)
+                if ym in fresh:
+                    fresh[ym] |= 1 << (day.day - 1)
+                day += timedelta(days=1)
+        cache.set_many({keys[ym]: bits for ym, bits in fresh.items()}, CACHE_TIMEOUT)
+        bitmaps.update(fresh)
+    return bitmaps
+
+
+def is_blocked(bitmaps, day):
+    return bool(bitmaps.get((day.year, day.month), 0) >> (day.day - 1) & 1)
+
+
+def blocked_days(bits):
+    return [day for day in range(1, 32) if bits >> (day - 1) & 1]
+
+
+def calendar_weeks(artist_id, year, month, today=None):
+    """
+    The month grid used by the profile page: a list of weeks, each a list of
+    cells with the date and its flags. Leading/trailing days from the
+    neighbouring months are included, as calendar.monthdatescalendar does.
+    """
+    today = today or date.today()
+    weeks = calendar.Calendar().monthdatescalendar(year, month)
+    first, last = weeks[0][0], weeks[-1][-1]
+    span = (last.year * 12 + last.month) - (first.year * 12 + first.month) + 1
+    bitmaps = month_bitmaps(artist_id, first.year, first.month, span)
+    return [
+        [{
+            'date': day,
+            'day': day.day,
+            'in_month': day.month == month,
+            'unavailable': is_blocked(bitmaps, day),
+            'past': day < today,
+        } for day in week]
+        for week in weeks
+    ]
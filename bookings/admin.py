@@ -2,4 +2,9 @@
 from django.contrib import admin
 from .models import Booking
 
-admin.site.register(Booking)
\ No newline at end of file
+@admin.register(Booking)
+class BookingAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'event_date', 'status')
+    list_filter = ('status',)
+    # __str__ names both sides; without this every row costs four queries.
+    list_select_related = ('artist__artistprofile', 'organizer__organizerprofile')
\ No newline at end of file
@@ -7,3 +7,7 @@ class BookingsConfig(AppConfig):
 
     def ready(self):
         import bookings.signals # This line is the crucial addition
+        from django.db.models.signals import post_migrate
+        from . import intervals
+        # Interval exclusion constraints (PostgreSQL only); bookings has no migrations of its own.
+        post_migrate.connect(intervals.install_on_migrate, sender=self)
@@ -0,0 +1,101 @@
+"""
+Per-user unread counters for the navbar badges.
+
+Counts live in one UnreadCounter row per user and are adjusted with F()
+updates as notifications/messages are created (see bookings/signals.py and
+messaging/signals.py) and
+marked read (see the notifications and conversation views). Reads go through
+the cache first, so a page that shows the badges costs at most one indexed
+primary-key lookup, and usually none.
+
+If a row is missing it is rebuilt from the source tables; `manage.py
+reconcile_unread_counters` does the same for everyone to repair drift.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Greatest
+
+from .models import Notification, UnreadCounter
+
+try:
+    from messaging.models import Conversation
+except ImportError:
+    Conversation = None
+
+CACHE_TIMEOUT = 10 * 60
+EMPTY_COUNTS = {'notifications': 0, 'messages': 0}
+
+
+def _cache_key(user_id):
+    return f'unread_counts:{user_id}'
+
+
+def _invalidate(user_id):
+    transaction.on_commit(lambda: cache.delete(_cache_key(user_id)))
+
+
+def count_unread(user_id):
+    """Computes the true counts from the source tables (slow path)."""
+    counts = dict(EMPTY_COUNTS)
+    counts['notifications'] = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+    if Conversation:
+        as_artist = Conversation.objects.filter(artist_id=user_id).aggregate(n=Sum('artist_unread_count'))['n']
+        as_organizer = Conversation.objects.filter(organizer_id=user_id).aggregate(n=Sum('organizer_unread_count'))['n']
+        counts['messages'] = (as_artist or 0) + (as_organizer or 0)
+    return counts
+
+
+def reconcile_user(user_id):
+    counts = count_unread(user_id)
+    UnreadCounter.objects.update_or_create(user_id=user_id, defaults=counts)
+    _invalidate(user_id)
+    return counts
+
+
+def get_counts(user_id):
+    counts = cache.get(_cache_key(user_id))
+    if counts is None:
+        counts = UnreadCounter.objects.filter(user_id=user_id).values('notifications', 'messages').first()
+        if counts is None:
+            counts = reconcile_user(user_id)
+        cache.set(_cache_key(user_id), counts, CACHE_TIMEOUT)
+    return counts
+
+
+def adjust(user_id, notifications=0, messages=0):
+    """Adds (or with negative values, removes) unread items for a user."""
+    if not notifications and not messages:
+        return
+    updated = UnreadCounter.objects.filter(user_id=user_id).update(
+        notifications=Greatest(F('notifications') + notifications, 0),
+        messages=Greatest(F('messages') + messages, 0),
+    )
+    if not updated:
+        # First activity for this user: seed the row from the source tables,
+        # which already include the change being recorded.
+        reconcile_user(user_id)
+        return
+    _invalidate(user_id)
+
+
+def reset_notifications(user_id):
+    UnreadCounter.objects.filter(user_id=user_id).update(notifications=0)
+    _invalidate(user_id)
+
+
+def reconcile_all(batch_size=1000):
+    """Recomputes every existing counter row. Returns the number of users reconciled."""
+    total = 0
+    user_ids = UnreadCounter.objects.order_by('pk').values_list('user_id', flat=True)
+    last_id = None
+    while True:
+        page = user_ids.filter(pk__gt=last_id) if last_id is not None else user_ids
+        batch = list(page[:batch_size])
+        if not batch:
+            break
+        for user_id in batch:
+            reconcile_user(user_id)
+        total += len(batch)
+        last_id = batch[-1]
+    return total
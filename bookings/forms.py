@@ -1,9 +1,26 @@
+from datetime import timedelta
+
 from django import forms
 from .models import Booking
+from .intervals import combine, day_bounds
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
+MAX_BOOKING_DAYS = 31
+
+
 class BookingForm(forms.ModelForm):
+    end_date = forms.DateField(
+        required=False, label="Last day",
+        help_text="For multi-day events such as festival runs. Leave empty for a single day.",
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+    )
+    start_time = forms.TimeField(required=False, widget=forms.TimeInput(attrs={'type': 'time', 'class': 'form-control'}))
+    end_time = forms.TimeField(
+        required=False, help_text="Leave both times empty to book whole days.",
+        widget=forms.TimeInput(attrs={'type': 'time', 'class': 'form-control'}),
+    )
+
     class Meta:
         model = Booking
         fields = ['event_date', 'event_details']
@@ -28,3 +45,27 @@ class BookingForm(forms.ModelForm):
         if event_date and event_date < timezone.now().date():
             raise ValidationError("You cannot book an event for a past date.")
         return event_date
+
+    def clean(self):
+        cleaned_data = super().clean()
+        first_day = cleaned_data.get('event_date')
+        if not first_day:
+            return cleaned_data
+        last_day = cleaned_data.get('end_date') or first_day
+        start_time, end_time = cleaned_data.get('start_time'), cleaned_data.get('end_time')
+        if last_day < first_day:
+            raise ValidationError("The last day cannot be before the first day.")
+        if (last_day - first_day).days >= MAX_BOOKING_DAYS:
+            raise ValidationError(f"A booking can span at most {MAX_BOOKING_DAYS} days.")
+        if (start_time is None) != (end_time is None):
+            raise ValidationError("Give both a start and an end time, or neither.")
+
+        if start_time is None:
+            starts_at, ends_at = day_bounds(first_day, last_day)
+        else:
+            starts_at, ends_at = combine(first_day, start_time), combine(last_day, end_time)
+            if ends_at <= starts_at:
+                # A slot past midnight, e.g. 22:00-02:00 on one day.
+                ends_at += timedelta(days=1)
+        self.instance.starts_at, self.instance.ends_at = starts_at, ends_at
+        return cleaned_data
@@ -0,0 +1,133 @@
+"""
+Booking intervals and overlap checks.
+
+A booking occupies the half-open interval [starts_at, ends_at): a festival
+run spans several days, a short slot a couple of hours. An artist's accepted
+bookings never overlap (reservations.accept_booking checks here while holding
+the artist's lock), so finding a clash is a predecessor seek: only the last
+accepted booking starting before the new one ends can reach into it. With the
+partial (artist, starts_at) index that is one O(log n) lookup however full
+the calendar gets.
+
+On PostgreSQL the invariant is also enforced by the database:
+install_constraints() adds GiST exclusion constraints (btree_gist) over
+tstzrange(starts_at, ends_at) for accepted bookings and over
+daterange(date, end_date) for blocked periods. It runs after every migrate
+(see BookingsConfig.ready); other databases rely on the seek above.
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, ProgrammingError, connections, transaction
+from django.db.models import DateTimeField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from accounts.models import Availability
+
+from .models import Booking
+
+logger = logging.getLogger(__name__)
+
+BOOKING_EXCLUSION = 'booking_accepted_no_overlap'
+AVAILABILITY_EXCLUSION = 'availability_no_overlap'
+
+
+def combine(day, at=time.min):
+    value = datetime.combine(day, at)
+    return timezone.make_aware(value) if settings.USE_TZ else value
+
+
+def day_start(day):
+    return combine(day)
+
+
+def day_bounds(first_day, last_day):
+    """[start, end) covering whole days first_day..last_day."""
+    return day_start(first_day), day_start(last_day + timedelta(days=1))
+
+
+def local_date(value):
+    return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+
+
+def days_touched(starts_at, ends_at):
+    """First and last calendar day the interval reaches into."""
+    return local_date(starts_at), local_date(ends_at - timedelta(microseconds=1))
+
+
+def whole_days(starts_at, ends_at):
+    """(first_day, last_day) if the interval is made of whole days, else None."""
+    midnight = [
+        (timezone.localtime(value) if timezone.is_aware(value) else value).time() == time.min
+        for value in (starts_at, ends_at)
+    ]
+    return days_touched(starts_at, ends_at) if all(midnight) else None
+
+
+def _predecessor(artist_ref, ends_at):
+    return (
+        Booking.objects.filter(artist_id=artist_ref, status=Booking.Status.ACCEPTED, starts_at__lt=ends_at)
+        .order_by('-starts_at')
+    )
+
+
+def clashing_booking(artist_id, starts_at, ends_at):
+    """The accepted booking overlapping [starts_at, ends_at), or None."""
+    candidate = _predecessor(artist_id, ends_at).first()
+    if candidate and candidate.ends_at > starts_at:
+        return candidate
+    return None
+
+
+def clash_condition(starts_at, ends_at, artist_ref):
+    """
+    clashing_booking() as a filter expression for an outer query whose
+    `artist_ref` column holds the artist id: true if the artist has an
+    accepted booking overlapping the interval.
+    """
+    previous_end = Subquery(_predecessor(OuterRef(artist_ref), ends_at).values('ends_at')[:1])
+    return GreaterThan(Coalesce(previous_end, Value(starts_at, output_field=DateTimeField())), starts_at)
+
+
+def install_constraints(conn=None):
+    """
+    Adds the exclusion constraints on PostgreSQL. Idempotent; returns False if
+    existing rows already overlap (run backfill_booking_intervals and resolve
+    the clashes, then retry).
+    """
+    conn = conn or connections['default']
+    if conn.vendor != 'postgresql':
+        return True
+    statements = {
+        BOOKING_EXCLUSION: (
+            f"ALTER TABLE {Booking._meta.db_table} ADD CONSTRAINT {BOOKING_EXCLUSION} "
+            f"EXCLUDE USING gist (artist_id WITH =, tstzrange(starts_at, ends_at, '[)') WITH &&) "
+            f"WHERE (status = 'ACCEPTED' AND starts_at IS NOT NULL)"
+        ),
+        AVAILABILITY_EXCLUSION: (
+            f"ALTER TABLE {Availability._meta.db_table} ADD CONSTRAINT {AVAILABILITY_EXCLUSION} "
+            f"EXCLUDE USING gist (artist_id WITH =, daterange(date, end_date, '[]') WITH &&)"
+        ),
+    }
+    with conn.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        cursor.execute("SELECT conname FROM pg_constraint WHERE conname IN %s", [tuple(statements)])
+        existing = {row[0] for row in cursor.fetchall()}
+    installed = True
+    for name, sql in statements.items():
+        if name in existing:
+            continue
+        try:
+            with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+                cursor.execute(sql)
+        except (IntegrityError, ProgrammingError) as exc:
+            logger.warning("Could not add %s: %s", name, exc)
+            installed = False
+    return installed
+
+
+def install_on_migrate(sender, using='default', **kwargs):
+    install_constraints(connections[using])
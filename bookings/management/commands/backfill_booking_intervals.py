@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from bookings import intervals
+from bookings.models import Booking
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills starts_at/ends_at on bookings created before time slots existed "
+        "(whole days from event_date), then installs the interval exclusion "
+        "constraints on PostgreSQL. Safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        pending = Booking.objects.filter(starts_at__isnull=True).order_by('pk')
+        total = 0
+        while True:
+            batch = list(pending.only('pk', 'event_date')[:options['batch_size']])
+            if not batch:
+                break
+            for booking in batch:
+                booking.starts_at, booking.ends_at = intervals.day_bounds(booking.event_date, booking.event_date)
+            Booking.objects.bulk_update(batch, ['starts_at', 'ends_at'])
+            total += len(batch)
+        self.stdout.write(f"Backfilled {total} bookings.")
+        if intervals.install_constraints():
+            self.stdout.write(self.style.SUCCESS("Interval constraints are in place."))
+        else:
+            self.stdout.write(self.style.WARNING(
+                "Some accepted bookings or blocked periods overlap; resolve them and re-run to add the constraints."
+            ))
@@ -0,0 +1,142 @@
+import random
+import threading
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.db.models import Count
+
+from accounts.models import ArtistProfile, Availability, OrganizerProfile, User
+from bookings import intervals, reservations
+from bookings.models import Booking
+
+
+class Command(BaseCommand):
+    help = (
+        "Fires concurrent accepts at competing booking requests and reports accept "
+        "throughput and any double-bookings. Creates throwaway users and removes them "
+        "afterwards; run it against a development or staging database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--artists', type=int, default=5)
+        parser.add_argument('--dates', type=int, default=10, help="Contested dates per artist.")
+        parser.add_argument('--requests-per-date', type=int, default=8, help="Competing pending requests per date.")
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--retries', type=int, default=20, help="Retries per accept on lock errors (e.g. SQLite 'database is locked').")
+        parser.add_argument('--keep', action='store_true', help="Keep the generated users and bookings.")
+
+    def handle(self, *args, **options):
+        if options['requests_per_date'] < 1 or options['threads'] < 1:
+            raise CommandError("--requests-per-date and --threads must be at least 1.")
+        run = int(time.time())
+        users = self._setup(run, options)
+        try:
+            self._run(options)
+        finally:
+            if not options['keep']:
+                User.objects.filter(pk__in=users).delete()
+
+    def _setup(self, run, options):
+        organizers = []
+        for i in range(options['requests_per_date']):
+            user = User.objects.create_user(email=f'bench-org-{run}-{i}@example.invalid', role='ORGANIZER')
+            OrganizerProfile.objects.create(user=user, full_name=f'Benchmark Organizer {i}', organization_name='Benchmark', phone='0')
+            organizers.append(user)
+        artists = []
+        for i in range(options['artists']):
+            user = User.objects.create_user(email=f'bench-artist-{run}-{i}@example.invalid', role='ARTIST')
+            ArtistProfile.objects.create(
+                user=user, contact_name=f'Benchmark Artist {i}', phone='0', category='Singer', location='Benchmark',
+                pricing_per_event=0,
+            )
+            artists.append(user)
+        first_day = date.today() + timedelta(days=365)
+        bookings = []
+        for d in range(options['dates']):
+            day = first_day + timedelta(days=d)
+            starts_at, ends_at = intervals.day_bounds(day, day)
+            bookings.extend(
+                Booking(artist=artist, organizer=organizer, event_date=day, starts_at=starts_at, ends_at=ends_at, event_details='benchmark')
+                for artist in artists
+                for organizer in organizers
+            )
+        Booking.objects.bulk_create(bookings)
+        self.artist_ids = [user.pk for user in artists]
+        return [user.pk for user in organizers + artists]
+
+    def _run(self, options):
+        jobs = list(Booking.objects.filter(artist_id__in=self.artist_ids).values_list('pk', 'artist_id'))
+        random.shuffle(jobs)
+        lock = threading.Lock()
+        stats = {'accepted': 0, 'refused': 0, 'retries': 0, 'errors': 0}
+        latencies = []
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        if not jobs:
+                            return
+                        booking_id, artist_id = jobs.pop()
+                    started = time.perf_counter()
+                    outcome = self._accept(booking_id, artist_id, options['retries'], stats, lock)
+                    with lock:
+                        stats[outcome] += 1
+                        latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        attempts = len(latencies)
+        self.stdout.write(f"{attempts} accept attempts on {connection.vendor} with {options['threads']} threads in {elapsed:.2f}s")
+        self.stdout.write(f"  accepted: {stats['accepted']}  refused: {stats['refused']}  lock retries: {stats['retries']}  errors: {stats['errors']}")
+        if attempts:
+            self.stdout.write(
+                f"  throughput: {attempts / elapsed:.1f} attempts/s, {stats['accepted'] / elapsed:.1f} accepts/s; "
+                f"latency p50 {latencies[attempts // 2] * 1000:.1f}ms, p95 {latencies[int(attempts * 0.95) - 1] * 1000:.1f}ms"
+            )
+        self._verify(options)
+
+    def _accept(self, booking_id, artist_id, retries, stats, lock):
+        for attempt in range(retries + 1):
+            try:
+                reservations.accept_booking(booking_id, artist_id)
+                return 'accepted'
+            except reservations.ReservationError:
+                return 'refused'
+            except OperationalError:
+                with lock:
+                    stats['retries'] += 1
+                time.sleep(0.005 * (attempt + 1))
+        return 'errors'
+
+    def _verify(self, options):
+        bookings = Booking.objects.filter(artist_id__in=self.artist_ids)
+        double_booked = (
+            bookings.filter(status=Booking.Status.ACCEPTED)
+            .values('artist_id', 'event_date').annotate(n=Count('pk')).filter(n__gt=1).count()
+        )
+        still_pending = bookings.filter(status=Booking.Status.PENDING).count()
+        accepted_dates = bookings.filter(status=Booking.Status.ACCEPTED).count()
+        blocked_days = sum(
+            (end - start).days + 1
+            for start, end in Availability.objects.filter(artist_id__in=self.artist_ids).values_list('date', 'end_date')
+        )
+        expected = options['artists'] * options['dates']
+        self.stdout.write(
+            f"  double-booked dates: {double_booked}  dates accepted: {accepted_dates}/{expected}  "
+            f"left pending: {still_pending}  blocked days: {blocked_days}"
+        )
+        if double_booked or blocked_days != accepted_dates:
+            raise CommandError("Reservation invariants violated.")
+        self.stdout.write(self.style.SUCCESS("No double-bookings."))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from bookings import outbox
+
+
+class Command(BaseCommand):
+    help = "Turns pending booking outbox events into notifications, in batches. Safe to re-run."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of exiting when the outbox is empty.")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            total = outbox.drain_all(batch_size=options['batch_size'])
+            if total:
+                self.stdout.write(f"Delivered {total} booking notification events.")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from bookings import counters
+
+
+class Command(BaseCommand):
+    help = "Recomputes the per-user unread notification/message counters from the source tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help="Only reconcile this user id.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['user']:
+            counts = counters.reconcile_user(options['user'])
+            self.stdout.write(self.style.SUCCESS(f"User {options['user']}: {counts}"))
+            return
+        total = counters.reconcile_all(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Reconciled unread counters for {total} users."))
@@ -32,19 +32,41 @@ class Booking(models.Model):
     )
     # --- END OF FIX ---
 
-    event_date = models.DateField()
+    event_date = models.DateField(help_text="First day of the event.")
+    starts_at = models.DateTimeField(null=True, blank=True, help_text="Start of the booked interval.")
+    ends_at = models.DateTimeField(null=True, blank=True, help_text="End of the booked interval (exclusive).")
     event_details = models.TextField()
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
+    responded_at = models.DateTimeField(null=True, blank=True, help_text="When the artist accepted or declined.")
+
+    class Meta:
+        indexes = [
+            # Predecessor seeks for overlap checks (bookings/intervals.py).
+            models.Index(fields=['artist', 'starts_at'], name='booking_accepted_start_idx', condition=models.Q(status='ACCEPTED')),
+            # Competing requests declined when one is accepted.
+            models.Index(fields=['artist', 'starts_at'], name='booking_pending_start_idx', condition=models.Q(status='PENDING')),
+            # Organizer dashboards: upcoming/past accepted events.
+            models.Index(fields=['organizer', 'status', 'event_date'], name='booking_org_status_date_idx'),
+            # Artist request list, newest first.
+            models.Index(fields=['artist', 'created_at'], name='booking_artist_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Requests without explicit times book whole days.
+        if self.starts_at is None and self.event_date:
+            from .intervals import day_bounds
+            self.starts_at, self.ends_at = day_bounds(self.event_date, self.event_date)
+        super().save(*args, **kwargs)
 
     def __str__(self):
-        # We now access the profile through the user relationship
-        return f"Booking for {self.artist.artistprofile.contact_name} by {self.organizer.organizerprofile.full_name}"
-    
-    def __str__(self):
-    artist_name = getattr(self.artist.artistprofile, "contact_name", self.artist.email)
-    organizer_name = getattr(self.organizer.organizerprofile, "full_name", self.organizer.email)
-    return f"Booking for {artist_name} by {organizer_name}"
+        # Reads both profiles: select_related('artist__artistprofile',
+        # 'organizer__organizerprofile') wherever bookings are listed by name.
+        artist = getattr(self.artist, 'artistprofile', None)
+        organizer = getattr(self.organizer, 'organizerprofile', None)
+        artist_name = artist.contact_name if artist else self.artist.email
+        organizer_name = organizer.full_name if organizer else self.organizer.email
+        return f"Booking for {artist_name} by {organizer_name}"
 
 class Notification(models.Model):
     """
@@ -58,6 +80,8 @@ class Notification(models.Model):
     
     message = models.TextField()
     related_booking = models.ForeignKey(Booking, on_delete=models.CASCADE, null=True, blank=True)
+    # The outbox event this notification was generated from; unique, so re-draining is a no-op.
+    outbox_event = models.OneToOneField('NotificationOutbox', on_delete=models.SET_NULL, null=True, blank=True, related_name='notification')
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -66,4 +90,51 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', 'created_at'], name='notification_recipient_idx'),
+            # Only unread rows; marking everything read touches just these.
+            models.Index(fields=['recipient'], name='notification_unread_idx', condition=models.Q(is_read=False)),
+        ]
+
+
+
+class UnreadCounter(models.Model):
+    """
+    Per-user unread badge counts, maintained incrementally by bookings/counters.py
+    so the navbar badges never need a COUNT over Notification or Message.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='unread_counter')
+    notifications = models.IntegerField(default=0)
+    messages = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Unread for user {self.user_id}: {self.notifications} notifications, {self.messages} messages'
+
+
+class NotificationOutbox(models.Model):
+    """
+    A booking event waiting to be turned into a Notification. Rows are written in
+    the same transaction as the booking change and drained in batches by
+    `manage.py drain_notification_outbox` (see bookings/outbox.py).
+    """
+    class Event(models.TextChoices):
+        REQUESTED = "REQUESTED", "Requested"
+        ACCEPTED = "ACCEPTED", "Accepted"
+        DECLINED = "DECLINED", "Declined"
 
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='outbox_events')
+    event = models.CharField(max_length=20, choices=Event.choices)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['booking', 'event'], name='unique_outbox_event_per_booking'),
+        ]
+        indexes = [
+            models.Index(fields=['id'], name='outbox_pending_idx', condition=models.Q(processed_at__isnull=True)),
+        ]
+
+    def __str__(self):
+        return f'{self.event} for booking {self.booking_id}'
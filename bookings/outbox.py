@@ -0,0 +1,88 @@
+"""
+Transactional outbox for booking notifications.
+
+Booking writes only record *that* something happened (enqueue(), called from
+the post_save receiver inside the booking's transaction). Turning events into
+Notification rows - looking up profile names, writing one row per recipient -
+happens later in drain(), in batches, outside the request.
+
+drain() is safe to retry: each Notification points at its outbox event through
+a unique column, and events already turned into notifications are skipped.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Notification, NotificationOutbox
+from . import counters
+
+
+def enqueue(booking, event):
+    NotificationOutbox.objects.get_or_create(booking=booking, event=event)
+
+
+def enqueue_many(booking_ids, event):
+    """For status changes made with queryset.update(), which skips post_save."""
+    NotificationOutbox.objects.bulk_create(
+        [NotificationOutbox(booking_id=pk, event=event) for pk in booking_ids], ignore_conflicts=True,
+    )
+
+
+def _display_name(user, profile_attr, name_attr):
+    profile = getattr(user, profile_attr, None)
+    return getattr(profile, name_attr, None) or user.get_full_name() or user.email
+
+
+def build_notification(event):
+    booking = event.booking
+    if event.event == NotificationOutbox.Event.REQUESTED:
+        organizer_name = _display_name(booking.organizer, 'organizerprofile', 'full_name')
+        return Notification(
+            recipient_id=booking.artist_id,
+            sender_id=booking.organizer_id,
+            message=f"{organizer_name} has sent you a booking request for {booking.event_date.strftime('%d %b, %Y')}.",
+            related_booking=booking,
+            outbox_event=event,
+        )
+    artist_name = _display_name(booking.artist, 'artistprofile', 'contact_name')
+    return Notification(
+        recipient_id=booking.organizer_id,
+        sender_id=booking.artist_id,
+        message=f"{artist_name} has {event.event} your booking request.",
+        related_booking=booking,
+        outbox_event=event,
+    )
+
+
+def drain(batch_size=500):
+    """Processes one batch of pending events. Returns how many events were handled."""
+    with transaction.atomic():
+        events = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(processed_at__isnull=True)
+            .select_related('booking__artist__artistprofile', 'booking__organizer__organizerprofile')
+            .order_by('pk')[:batch_size]
+        )
+        if not events:
+            return 0
+        event_ids = [event.pk for event in events]
+        already_done = set(
+            Notification.objects.filter(outbox_event_id__in=event_ids).values_list('outbox_event_id', flat=True)
+        )
+        notifications = [build_notification(event) for event in events if event.pk not in already_done]
+        Notification.objects.bulk_create(notifications, batch_size=batch_size)
+        NotificationOutbox.objects.filter(pk__in=event_ids).update(processed_at=timezone.now())
+        # bulk_create skips post_save, so the badge counters are bumped here.
+        for recipient_id, count in Counter(n.recipient_id for n in notifications).items():
+            counters.adjust(recipient_id, notifications=count)
+    return len(events)
+
+
+def drain_all(batch_size=500):
+    total = 0
+    while True:
+        handled = drain(batch_size)
+        if not handled:
+            return total
+        total += handled
@@ -0,0 +1,98 @@
+"""
+Accepting and declining booking requests.
+
+Accepting is the one write path that can double-book an artist, so it is
+serialized per artist and guarded three ways:
+
+  1. the artist's profile row is locked (select_for_update) for the whole
+     transaction, so two accepts for the same artist run one after the other;
+  2. the PENDING -> ACCEPTED transition is a conditional UPDATE, so a request
+     that was already answered (e.g. by a second tab) is left alone;
+  3. the new interval must not overlap an accepted one (intervals.py: an index
+     seek, backed by an exclusion constraint on PostgreSQL).
+
+Once an interval is taken, the pending requests overlapping it are declined
+in the same transaction. Status changes here use queryset.update(), which skips the
+Booking post_save receivers, so the outbox events, dashboard invalidations and
+analytics rollups are done explicitly.
+"""
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from accounts import analytics, availability, dashboard
+from accounts.models import ArtistProfile
+
+from .models import Booking, NotificationOutbox
+from . import intervals, outbox
+
+
+class ReservationError(Exception):
+    pass
+
+
+class BookingNotPending(ReservationError):
+    """The request was already accepted or declined."""
+
+
+class DateUnavailable(ReservationError):
+    """The artist already has an accepted booking overlapping the request."""
+
+
+def accept_booking(booking_id, artist_id):
+    """
+    Accepts a pending request and declines the pending requests it overlaps.
+    Whole-day bookings are also blocked on the artist's calendar; short slots
+    leave the rest of the day open. Returns (booking, declined_ids).
+    """
+    try:
+        with transaction.atomic():
+            profile = ArtistProfile.objects.select_for_update().get(pk=artist_id)
+            booking = Booking.objects.get(pk=booking_id, artist_id=artist_id)
+            if booking.status != Booking.Status.PENDING:
+                raise BookingNotPending(booking.pk)
+            if booking.starts_at is None:
+                booking.starts_at, booking.ends_at = intervals.day_bounds(booking.event_date, booking.event_date)
+            if intervals.clashing_booking(artist_id, booking.starts_at, booking.ends_at):
+                raise DateUnavailable(booking.event_date)
+            now = timezone.now()
+            accepted = Booking.objects.filter(pk=booking.pk, status=Booking.Status.PENDING).update(
+                status=Booking.Status.ACCEPTED, starts_at=booking.starts_at, ends_at=booking.ends_at, responded_at=now,
+            )
+            if not accepted:
+                raise BookingNotPending(booking.pk)
+            booking.status = Booking.Status.ACCEPTED
+
+            days = intervals.whole_days(booking.starts_at, booking.ends_at)
+            if days:
+                availability.block_ranges(profile, [days], is_booked=True)
+            competing = Booking.objects.filter(
+                artist_id=artist_id, status=Booking.Status.PENDING,
+                starts_at__lt=booking.ends_at, ends_at__gt=booking.starts_at,
+            )
+            declined = list(competing.values_list('pk', 'organizer_id', 'created_at'))
+            declined_ids = [pk for pk, _, _ in declined]
+            competing.filter(pk__in=declined_ids).update(status=Booking.Status.DECLINED, responded_at=now)
+
+            outbox.enqueue_many([booking.pk], NotificationOutbox.Event.ACCEPTED)
+            outbox.enqueue_many(declined_ids, NotificationOutbox.Event.DECLINED)
+            dashboard.invalidate_organizers([booking.organizer_id, *(organizer_id for _, organizer_id, _ in declined)])
+            analytics.record_responses(
+                artist_id, now, accepted=[booking.created_at], declined=[created_at for _, _, created_at in declined],
+                earnings=profile.pricing_per_event,
+            )
+    except IntegrityError as exc:
+        raise DateUnavailable(str(exc)) from exc
+    return booking, declined_ids
+
+
+def decline_booking(booking_id, artist_id):
+    with transaction.atomic():
+        pending = Booking.objects.filter(pk=booking_id, artist_id=artist_id, status=Booking.Status.PENDING)
+        row = pending.values_list('organizer_id', 'created_at').first()
+        now = timezone.now()
+        if row is None or not pending.update(status=Booking.Status.DECLINED, responded_at=now):
+            raise BookingNotPending(booking_id)
+        organizer_id, created_at = row
+        outbox.enqueue_many([booking_id], NotificationOutbox.Event.DECLINED)
+        dashboard.invalidate_organizers([organizer_id])
+        analytics.record_responses(artist_id, now, declined=[created_at])
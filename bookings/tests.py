@@ -1,3 +1,234 @@
-from django.test import TestCase
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from accounts.models import Availability
+from accounts.tests import make_artist, make_organizer
+from core.query_plans import QueryPlanAssertionsMixin
+
+from . import counters, outbox, reservations
+from .context_processors import notification_counts
+from .models import Booking, Notification, NotificationOutbox, UnreadCounter
+
+
+class HotQueryPlanTests(QueryPlanAssertionsMixin, TestCase):
+    """The booking and notification queries must stay index-backed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artist = make_artist(1)
+        cls.organizers = [make_organizer(n) for n in range(3)]
+        cls.day = date.today() + timedelta(days=30)
+        cls.requests = [
+            Booking.objects.create(artist=cls.artist.user, organizer=organizer.user, event_date=cls.day, event_details='Gig')
+            for organizer in cls.organizers
+        ]
+        for booking in cls.requests:
+            Notification.objects.create(recipient=cls.artist.user, sender=booking.organizer, message='New request', related_booking=booking)
+
+    def test_artist_booking_requests(self):
+        self.client.force_login(self.artist.user)
+        with self.assertNoFullScans():
+            response = self.client.get(reverse('artist_booking_requests'))
+            list(response.context['bookings'])
+
+    def test_notifications(self):
+        self.client.force_login(self.artist.user)
+        with self.assertNoFullScans():
+            response = self.client.get(reverse('notifications'))
+            list(response.context['notifications'])
+
+    def test_create_booking_conflict_checks(self):
+        self.client.force_login(self.organizers[0].user)
+        with self.assertNoFullScans():
+            self.client.post(reverse('create_booking', args=[self.artist.pk]), {
+                'event_date': (self.day + timedelta(days=1)).isoformat(),
+                'start_time': '18:00', 'end_time': '20:00', 'event_details': 'Slot',
+            })
+
+    def test_accept_declines_competing_requests(self):
+        self.client.force_login(self.artist.user)
+        with self.assertNoFullScans():
+            self.client.get(reverse('respond_to_booking', args=[self.requests[0].pk, 'accept']))
+        self.assertEqual(
+            list(Booking.objects.filter(artist=self.artist.user).order_by('pk').values_list('status', flat=True)),
+            [Booking.Status.ACCEPTED, Booking.Status.DECLINED, Booking.Status.DECLINED],
+        )
+
+
+class OutboxTests(TestCase):
+    """Booking notifications go through the outbox, and draining it is idempotent."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artist = make_artist(1)
+        cls.organizer = make_organizer(1)
+
+    def setUp(self):
+        self.booking = Booking.objects.create(
+            artist=self.artist.user, organizer=self.organizer.user, event_date=date.today() + timedelta(days=30),
+            event_details='Gig',
+        )
+
+    def unread(self):
+        return UnreadCounter.objects.get(user=self.artist.user).notifications
+
+    def test_booking_writes_one_event(self):
+        self.assertEqual(
+            list(NotificationOutbox.objects.values_list('booking_id', 'event')),
+            [(self.booking.pk, NotificationOutbox.Event.REQUESTED)],
+        )
+        self.assertFalse(Notification.objects.exists())
+
+    def test_drain_creates_one_notification_and_counts_it(self):
+        self.assertEqual(outbox.drain_all(), 1)
+        notification = Notification.objects.get()
+        self.assertEqual((notification.recipient_id, notification.related_booking_id), (self.artist.pk, self.booking.pk))
+        self.assertIn('Organizer 1', notification.message)
+        self.assertEqual(self.unread(), 1)
+
+    def test_draining_again_is_a_no_op(self):
+        outbox.drain_all()
+        self.assertEqual(outbox.drain_all(), 0)
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(self.unread(), 1)
+
+    def test_event_with_an_existing_notification_is_not_notified_twice(self):
+        # The event already has its notification but isn't marked processed.
+        event = NotificationOutbox.objects.get()
+        Notification.objects.create(recipient=self.artist.user, message='New request', related_booking=self.booking, outbox_event=event)
+        self.assertEqual(self.unread(), 1)
+        self.assertEqual(outbox.drain_all(), 1)
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(self.unread(), 1)
+        self.assertIsNotNone(NotificationOutbox.objects.get().processed_at)
+
+
+class ReservationTests(TestCase):
+    """accept_booking / decline_booking: one accepted booking per slot, everything else declined."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artist = make_artist(1)
+        cls.organizers = [make_organizer(n) for n in range(3)]
+        cls.day = date.today() + timedelta(days=30)
+
+    def request(self, organizer, day=None):
+        return Booking.objects.create(
+            artist=self.artist.user, organizer=organizer.user, event_date=day or self.day, event_details='Gig',
+        )
+
+    def events(self, event):
+        return set(NotificationOutbox.objects.filter(event=event).values_list('booking_id', flat=True))
+
+    def test_second_answer_raises(self):
+        booking = self.request(self.organizers[0])
+        reservations.accept_booking(booking.pk, self.artist.pk)
+        with self.assertRaises(reservations.BookingNotPending):
+            reservations.accept_booking(booking.pk, self.artist.pk)
+        with self.assertRaises(reservations.BookingNotPending):
+            reservations.decline_booking(booking.pk, self.artist.pk)
+
+    def test_overlapping_accepted_booking_makes_the_date_unavailable(self):
+        reservations.accept_booking(self.request(self.organizers[0]).pk, self.artist.pk)
+        late = self.request(self.organizers[1])
+        with self.assertRaises(reservations.DateUnavailable):
+            reservations.accept_booking(late.pk, self.artist.pk)
+        late.refresh_from_db()
+        self.assertEqual(late.status, Booking.Status.PENDING)
+
+    def test_competing_requests_are_declined(self):
+        accepted, *competing = [self.request(organizer) for organizer in self.organizers]
+        other_day = self.request(self.organizers[1], self.day + timedelta(days=1))
+        booking, declined_ids = reservations.accept_booking(accepted.pk, self.artist.pk)
+        self.assertEqual(booking.status, Booking.Status.ACCEPTED)
+        self.assertEqual(sorted(declined_ids), [booking.pk for booking in competing])
+        self.assertEqual(
+            dict(Booking.objects.values_list('pk', 'status')),
+            {accepted.pk: Booking.Status.ACCEPTED, competing[0].pk: Booking.Status.DECLINED,
+             competing[1].pk: Booking.Status.DECLINED, other_day.pk: Booking.Status.PENDING},
+        )
+        self.assertEqual(self.events(NotificationOutbox.Event.ACCEPTED), {accepted.pk})
+        self.assertEqual(self.events(NotificationOutbox.Event.DECLINED), set(declined_ids))
+
+    def test_accept_blocks_the_day(self):
+        reservations.accept_booking(self.request(self.organizers[0]).pk, self.artist.pk)
+        self.assertEqual(
+            list(Availability.objects.filter(artist=self.artist).values_list('date', 'end_date', 'is_booked')),
+            [(self.day, self.day, True)],
+        )
+
+    def test_decline(self):
+        booking = self.request(self.organizers[0])
+        reservations.decline_booking(booking.pk, self.artist.pk)
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, Booking.Status.DECLINED)
+        self.assertEqual(self.events(NotificationOutbox.Event.DECLINED), {booking.pk})
+
+
+class UnreadCounterTests(TestCase):
+    """The badge counters seed themselves, never go negative and cost nothing when no badge renders."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artist = make_artist(1)
+        cls.organizer = make_organizer(1)
+
+    def setUp(self):
+        cache.clear()
+
+    def notify(self, count=1):
+        for _ in range(count):
+            Notification.objects.create(recipient=self.artist.user, sender=self.organizer.user, message='Hello')
+
+    def stored(self):
+        return UnreadCounter.objects.values_list('notifications', 'messages').get(user=self.artist.user)
+
+    def test_adjust_creates_a_missing_row(self):
+        self.assertFalse(UnreadCounter.objects.filter(user=self.artist.user).exists())
+        self.notify()
+        self.assertEqual(self.stored(), (1, 0))
+        counters.adjust(self.artist.user.pk, notifications=2)
+        self.assertEqual(self.stored(), (3, 0))
+
+    def test_reconcile_creates_a_missing_row_and_repairs_drift(self):
+        self.notify(2)
+        UnreadCounter.objects.filter(user=self.artist.user).delete()
+        self.assertEqual(counters.reconcile_user(self.artist.user.pk), {'notifications': 2, 'messages': 0})
+        self.assertEqual(self.stored(), (2, 0))
+        UnreadCounter.objects.filter(user=self.artist.user).update(notifications=7, messages=3)
+        self.assertEqual(counters.reconcile_all(), 1)
+        self.assertEqual(self.stored(), (2, 0))
+
+    def test_adjust_floors_at_zero(self):
+        self.notify()
+        counters.adjust(self.artist.user.pk, notifications=-5, messages=-1)
+        self.assertEqual(self.stored(), (0, 0))
+
+    def test_notifications_view_resets_the_count(self):
+        self.notify(2)
+        self.assertEqual(counters.get_counts(self.artist.user.pk)['notifications'], 2)
+        self.client.force_login(self.artist.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('notifications'))
+        self.assertEqual(self.stored(), (0, 0))
+        self.assertFalse(Notification.objects.filter(recipient=self.artist.user, is_read=False).exists())
+        self.assertEqual(counters.get_counts(self.artist.user.pk)['notifications'], 0)
+
+    def test_context_processor_is_lazy(self):
+        self.notify()
+        cache.clear()
+        request = RequestFactory().get('/')
+        request.user = self.artist.user
+        with self.assertNumQueries(0):
+            context = notification_counts(request)
+        with self.assertNumQueries(1):
+            self.assertEqual(context['unread_notifications_count'](), 1)
+            self.assertEqual(context['unread_messages_count'](), 0)
+
+        request.user = AnonymousUser()
+        with self.assertNumQueries(0):
+            self.assertEqual(notification_counts(request)['unread_notifications_count'](), 0)
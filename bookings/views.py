@@ -2,9 +2,12 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
+from django.db import transaction
 
 from .models import Booking, Notification
-from accounts.models import ArtistProfile, Availability, OrganizerProfile
+from . import counters, intervals, reservations
+from accounts.models import ArtistProfile, OrganizerProfile
+from accounts import availability
 from .forms import BookingForm
 
 
@@ -64,16 +67,20 @@ def create_booking_view(request, artist_id):
                 messages.error(request, "You cannot book for a past date. Please choose a future date.")
                 return redirect('create_booking', artist_id=artist_id)
 
-            # ✅ Check artist availability
-            if Availability.objects.filter(artist=artist_profile, date=event_date).exists():
-                messages.error(request, f"{artist_profile.contact_name} is not available on that date.")
+            # ✅ Check artist availability over the whole requested interval
+            booking = form.save(commit=False)
+            first_day, last_day = intervals.days_touched(booking.starts_at, booking.ends_at)
+            if (availability.overlapping_period(artist_profile.pk, first_day, last_day)
+                    or intervals.clashing_booking(artist_profile.pk, booking.starts_at, booking.ends_at)):
+                messages.error(request, f"{artist_profile.contact_name} is not available at that time.")
                 return redirect('create_booking', artist_id=artist_id)
 
-            booking = form.save(commit=False)
             booking.organizer = request.user
             booking.artist = artist_profile.user
             booking.status = 'PENDING'
-            booking.save()
+            # The notification outbox row is written in the same transaction.
+            with transaction.atomic():
+                booking.save()
 
             return redirect('booking_success', booking_id=booking.pk)
     else:
@@ -103,23 +110,21 @@ def artist_booking_requests_view(request):
 def respond_to_booking_view(request, booking_id, action):
     """Allows an artist to accept or decline a booking request."""
     booking = get_object_or_404(Booking, pk=booking_id, artist=request.user)
-    artist_profile = get_object_or_404(ArtistProfile, user=request.user)
+    get_object_or_404(ArtistProfile, user=request.user)
 
-    if booking.status == 'PENDING':
+    try:
         if action == 'accept':
-            booking.status = 'ACCEPTED'
-            Availability.objects.create(
-                artist=artist_profile,
-                date=booking.event_date,
-                is_booked=True,
-            )
+            booking, declined_ids = reservations.accept_booking(booking.pk, request.user.pk)
             messages.success(request, "Booking accepted! The date has been blocked on your calendar.")
+            if declined_ids:
+                messages.info(request, f"{len(declined_ids)} other request(s) for that date were declined.")
         elif action == 'decline':
-            booking.status = 'DECLINED'
+            reservations.decline_booking(booking.pk, request.user.pk)
             messages.info(request, "Booking has been declined.")
-        booking.save()
-    else:
+    except reservations.BookingNotPending:
         messages.error(request, "This booking has already been responded to.")
+    except reservations.DateUnavailable:
+        messages.error(request, "You already have an accepted booking on that date.")
 
     return redirect('artist_booking_requests')
 
@@ -131,7 +136,8 @@ def notifications_view(request):
     """Displays and marks notifications as read."""
     # FIX: The Notification model's field is 'recipient', not 'user'.
     notifications = Notification.objects.filter(recipient=request.user).order_by('-created_at')
-    notifications.filter(is_read=False).update(is_read=True)
+    if notifications.filter(is_read=False).update(is_read=True):
+        counters.reset_notifications(request.user.pk)
 
     return render(request, 'bookings/notifications.html', {'notifications': notifications})
 
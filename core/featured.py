@@ -0,0 +1,166 @@
+# core/featured.py
+"""
+Featured-artist rotation pool for the homepage.
+
+The pool is a list of approved artist ids, built off the request path (by
+`manage.py refresh_featured_pool`, or by the first request that finds the
+cached copy stale) and stored in the cache in chunks of CHUNK_SIZE slots,
+next to a small summary with the homepage category list. Weighting is done
+by repeating ids: an artist with weight 2 occupies twice as many slots.
+The slots are shuffled before chunking, so a random offset into a random
+chunk keeps the weighting, and a homepage hit reads only the summary and
+one chunk however many artists there are.
+
+A stale pool keeps being served while one request rebuilds it behind a
+cache.add() lock, so concurrent misses don't all rebuild. On a cold cache
+there is nothing to serve meanwhile, so the requests that lose the race get
+a small sample of the best-rated artists straight from the rating index.
+
+Weight hooks are plain functions listed in settings.FEATURED_ARTIST_WEIGHT_HOOKS.
+Each receives the candidate rows (dicts with 'pk', 'date_joined',
+'rating_average' and 'rating_count') and returns {pk: multiplier}; artists
+missing from the result keep weight 1.
+"""
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from accounts.models import ArtistProfile
+
+POOL_CACHE_KEY = 'core:featured_artist_pool'
+POOL_LOCK_KEY = 'core:featured_artist_pool:lock'
+# How long a pool is fresh; it stays cached (and served) for a few rebuilds longer.
+POOL_TIMEOUT = getattr(settings, 'FEATURED_POOL_TIMEOUT', 15 * 60)
+POOL_KEEP_TIMEOUT = POOL_TIMEOUT * 4
+POOL_LOCK_TIMEOUT = 60
+CHUNK_SIZE = 200
+SLOTS_PER_WEIGHT = 4
+MAX_SLOTS_PER_ARTIST = 20
+FEATURED_CATEGORY_COUNT = 5
+FALLBACK_SAMPLE_SIZE = 50
+
+DEFAULT_WEIGHT_HOOKS = [
+    'core.featured.rating_weight',
+    'core.featured.recency_weight',
+]
+
+
+def rating_weight(candidates):
+    """Well-reviewed artists show up more often (4.5 stars -> ~1.9x)."""
+    return {row['pk']: max(row['rating_average'] - 2, 1) / 1.3 for row in candidates if row['rating_count']}
+
+
+def recency_weight(candidates):
+    """Give artists who joined recently a boost so new talent gets seen."""
+    recent_days = getattr(settings, 'FEATURED_RECENT_DAYS', 30)
+    cutoff = timezone.now() - timedelta(days=recent_days)
+    return {row['pk']: 1.5 for row in candidates if row['date_joined'] and row['date_joined'] >= cutoff}
+
+
+def _weight_hooks():
+    return [import_string(path) for path in getattr(settings, 'FEATURED_ARTIST_WEIGHT_HOOKS', DEFAULT_WEIGHT_HOOKS)]
+
+
+def build_pool():
+    """Scans the approved artists once and returns the pool dict that gets cached."""
+    candidates = list(
+        ArtistProfile.objects.filter(is_approved=True)
+        .values('pk', 'category', 'rating_average', 'rating_count', date_joined=F('user__date_joined'))
+    )
+    weights = {row['pk']: 1.0 for row in candidates}
+    for hook in _weight_hooks():
+        for pk, multiplier in hook(candidates).items():
+            if pk in weights:
+                weights[pk] *= multiplier
+
+    slots = []
+    for pk, weight in weights.items():
+        slots.extend([pk] * max(1, min(MAX_SLOTS_PER_ARTIST, round(weight * SLOTS_PER_WEIGHT))))
+    random.shuffle(slots)
+
+    categories = []
+    for row in candidates:
+        if row['category'] not in categories:
+            categories.append(row['category'])
+            if len(categories) == FEATURED_CATEGORY_COUNT:
+                break
+    return {'slots': slots, 'categories': categories, 'built_at': timezone.now()}
+
+
+def _chunk_key(generation, index):
+    return f'{POOL_CACHE_KEY}:{generation}:{index}'
+
+
+def refresh_pool():
+    """Rebuilds the pool and caches it; returns the summary (without the slots)."""
+    pool = build_pool()
+    slots = pool.pop('slots')
+    # Chunk keys are per build, so a reader holding the old summary keeps reading the old chunks.
+    generation = time.time_ns()
+    chunks = {
+        _chunk_key(generation, index): slots[offset:offset + CHUNK_SIZE]
+        for index, offset in enumerate(range(0, len(slots), CHUNK_SIZE))
+    }
+    cache.set_many(chunks, POOL_KEEP_TIMEOUT)
+    pool.update(generation=generation, chunks=len(chunks), slot_count=len(slots), artist_count=len(set(slots)))
+    cache.set(POOL_CACHE_KEY, pool, POOL_KEEP_TIMEOUT)
+    return pool
+
+
+def fallback_pool():
+    """An unchunked pool of the best-rated artists, for a cold cache while another request builds the real one."""
+    rows = list(
+        ArtistProfile.objects.filter(is_approved=True)
+        .order_by('-rating_average', '-rating_count')
+        .values_list('pk', 'category')[:FALLBACK_SAMPLE_SIZE]
+    )
+    categories = list(dict.fromkeys(category for _, category in rows))[:FEATURED_CATEGORY_COUNT]
+    return {'slots': [pk for pk, _ in rows], 'categories': categories, 'chunks': 0}
+
+
+def get_pool():
+    """The cached pool summary, rebuilt by at most one request at a time once stale."""
+    pool = cache.get(POOL_CACHE_KEY)
+    stale = pool is None or timezone.now() - pool['built_at'] > timedelta(seconds=POOL_TIMEOUT)
+    if stale and cache.add(POOL_LOCK_KEY, True, POOL_LOCK_TIMEOUT):
+        try:
+            pool = refresh_pool()
+        finally:
+            cache.delete(POOL_LOCK_KEY)
+    # Only missing on a cold cache while another request is building it.
+    return pool or fallback_pool()
+
+
+def sample_artist_ids(count=3, pool=None):
+    """Picks `count` distinct ids from a random offset into one random chunk, moving on to the next if short."""
+    pool = pool or get_pool()
+    if 'slots' in pool:
+        return random.sample(pool['slots'], min(count, len(pool['slots'])))
+    picked = []
+    first = random.randrange(pool['chunks']) if pool['chunks'] else 0
+    for step in range(pool['chunks']):
+        # An evicted chunk just gets skipped.
+        slots = cache.get(_chunk_key(pool['generation'], (first + step) % pool['chunks'])) or []
+        start = random.randrange(len(slots)) if slots else 0
+        # Duplicates come from weighting, so the walk is short.
+        for offset in range(len(slots)):
+            pk = slots[(start + offset) % len(slots)]
+            if pk not in picked:
+                picked.append(pk)
+                if len(picked) == count:
+                    return picked
+    return picked
+
+
+def featured_artists(count=3):
+    """Returns (artists, categories) for the homepage using only primary-key lookups."""
+    pool = get_pool()
+    ids = sample_artist_ids(count, pool)
+    profiles = ArtistProfile.objects.filter(is_approved=True).in_bulk(ids)
+    return [profiles[pk] for pk in ids if pk in profiles], pool['categories']
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.featured import refresh_pool
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the cached featured-artist pool used by the homepage. Run periodically (e.g. from cron)."
+
+    def handle(self, *args, **options):
+        pool = refresh_pool()
+        self.stdout.write(self.style.SUCCESS(
+            f"Featured pool refreshed: {pool['artist_count']} artists in {pool['slot_count']} slots "
+            f"({pool['chunks']} chunks)."
+        ))
@@ -0,0 +1,143 @@
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import ArtistProfile, OrganizerProfile
+from core.querycount import record_queries
+from messaging.models import Conversation
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the key pages through the test client against the current database (see "
+        "seed_demo_data) and writes p50/p95 latency and query counts to a JSON file. "
+        "Pass --compare with an earlier file to print the change per page."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2, help="Untimed requests per page first.")
+        parser.add_argument('--cold', action='store_true', help="Clear the cache before every request.")
+        parser.add_argument('--output', default='benchmarks.json')
+        parser.add_argument('--label', default='', help="Stored with the results, e.g. a commit hash.")
+        parser.add_argument('--compare', help="An earlier results file to diff against.")
+        parser.add_argument('--only', nargs='*', help="Only these page names.")
+
+    def scenarios(self):
+        """(name, url, user) for each page, using the busiest seeded accounts."""
+        artist = (
+            ArtistProfile.objects.filter(is_approved=True)
+            .annotate(reviews=Count('user__reviews_received')).order_by('-reviews', 'pk').select_related('user').first()
+        )
+        organizer = (
+            OrganizerProfile.objects.annotate(bookings=Count('user__organizer_bookings'))
+            .order_by('-bookings', 'pk').select_related('user').first()
+        )
+        if artist is None or organizer is None:
+            raise CommandError("No approved artist or organizer to benchmark with; run seed_demo_data first.")
+        conversation = Conversation.objects.filter(organizer=organizer).order_by('-last_message_at').first()
+        pages = [
+            ('home', reverse('home'), None),
+            ('browse', reverse('artist_list'), None),
+            ('browse_filtered', reverse('artist_list') + f'?category={artist.category}&location={artist.location}&sort=top_rated', None),
+            ('browse_feed', reverse('artist_list_feed') + '?sort=price_low', organizer.user),
+            ('artist_profile', reverse('artist_profile', args=[artist.pk]), organizer.user),
+            ('artist_profile_anonymous', reverse('artist_profile', args=[artist.pk]), None),
+            ('organizer_dashboard', reverse('dashboard'), organizer.user),
+            ('artist_dashboard', reverse('dashboard'), artist.user),
+            ('artist_booking_requests', reverse('artist_booking_requests'), artist.user),
+            ('organizer_bookings', reverse('organizer_bookings'), organizer.user),
+            ('inbox', reverse('inbox'), organizer.user),
+            ('notifications', reverse('notifications'), artist.user),
+        ]
+        if conversation:
+            pages.append(('conversation', reverse('conversation', args=[conversation.pk]), organizer.user))
+        return pages
+
+    def measure(self, client, url, iterations, warmup, cold):
+        for _ in range(warmup):
+            client.get(url)
+        timings, queries, statuses = [], [], set()
+        for _ in range(iterations):
+            if cold:
+                cache.clear()
+            with record_queries() as recorder:
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(recorder.count)
+            statuses.add(response.status_code)
+        return {
+            'url': url,
+            'status': sorted(statuses),
+            'p50_ms': round(percentile(timings, 0.5), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'mean_ms': round(statistics.mean(timings), 2),
+            'queries_p50': percentile(queries, 0.5),
+            'queries_max': max(queries),
+        }
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError("--iterations must be at least 1.")
+        # Allows the 'testserver' host and keeps outgoing email in memory.
+        try:
+            setup_test_environment()
+            owns_environment = True
+        except RuntimeError:
+            # Already inside a test run, which keeps its own environment.
+            owns_environment = False
+        try:
+            results = {}
+            for name, url, user in self.scenarios():
+                if options['only'] and name not in options['only']:
+                    continue
+                client = Client()
+                if user is not None:
+                    client.force_login(user)
+                results[name] = self.measure(client, url, options['iterations'], options['warmup'], options['cold'])
+                row = results[name]
+                self.stdout.write(f"{name:<26} p50 {row['p50_ms']:>8.2f} ms  p95 {row['p95_ms']:>8.2f} ms  {row['queries_p50']:>3} queries  {row['status']}")
+        finally:
+            if owns_environment:
+                teardown_test_environment()
+
+        report = {
+            'label': options['label'],
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'iterations': options['iterations'],
+            'cold_cache': options['cold'],
+            'results': results,
+        }
+        Path(options['output']).write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+        if options['compare']:
+            self.compare(json.loads(Path(options['compare']).read_text()), report)
+
+    def compare(self, before, after):
+        self.stdout.write(f"Change against {before.get('label') or before['created_at']}:")
+        for name, row in after['results'].items():
+            old = before['results'].get(name)
+            if old is None:
+                continue
+            change = (row['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100 if old['p95_ms'] else 0
+            self.stdout.write(
+                f"{name:<26} p95 {old['p95_ms']:>8.2f} -> {row['p95_ms']:>8.2f} ms ({change:+.0f}%)  "
+                f"queries {old['queries_p50']} -> {row['queries_p50']}"
+            )
@@ -0,0 +1,256 @@
+import random
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F, Value
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from accounts import analytics, availability, ratings, search
+from accounts.models import ArtistProfile, Availability, GroupMember, OrganizerProfile, PortfolioItem, User
+from bookings.intervals import day_bounds
+from bookings.models import Booking, Notification
+from core.featured import refresh_pool
+from messaging.models import Conversation, Message
+from reviews.models import Favorite, Review
+
+CATEGORIES = ['Singer', 'Band', 'DJ', 'Musician (Instrumental)', 'Comedian', 'Dancer (Solo)', 'Dance Group', 'Magician', 'Host/MC', 'Speaker']
+LOCATIONS = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad', 'Jaipur', 'Kochi', 'Goa']
+FIRST_NAMES = ['Aarav', 'Diya', 'Ishaan', 'Kavya', 'Rohan', 'Saanvi', 'Vivaan', 'Anaya', 'Arjun', 'Meera', 'Kabir', 'Nisha']
+LAST_NAMES = ['Sharma', 'Iyer', 'Khan', 'Das', 'Patel', 'Reddy', 'Singh', 'Menon', 'Gupta', 'Nair', 'Bose', 'Rao']
+ROLES = ['Vocalist', 'Guitarist', 'Drummer', 'Keyboardist', 'Bassist', 'Lead Dancer']
+# Past events are mostly settled; future ones are mostly still open.
+PAST_STATUSES = ([Booking.Status.ACCEPTED] * 5 + [Booking.Status.COMPLETED] * 3 + [Booking.Status.DECLINED] * 2)
+FUTURE_STATUSES = ([Booking.Status.PENDING] * 5 + [Booking.Status.ACCEPTED] * 3 + [Booking.Status.DECLINED] * 2)
+RATINGS = [5] * 5 + [4] * 3 + [3] + [2] + [1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a synthetic dataset for load testing, e.g. --artists 100000 --organizers 10000 "
+        "--bookings 1000000. Rows are bulk-inserted in batches, then the denormalized tables "
+        "(search index, ratings, analytics, unread state, featured pool) are rebuilt."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--artists', type=int, default=1000)
+        parser.add_argument('--organizers', type=int, default=100)
+        parser.add_argument('--bookings', type=int, default=10000)
+        parser.add_argument('--review-rate', type=float, default=0.6, help="Share of settled past bookings that get a review.")
+        parser.add_argument('--favorites', type=int, default=5000)
+        parser.add_argument('--conversations', type=int, default=2000)
+        parser.add_argument('--messages', type=int, default=20000)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0, help="Random seed; the same seed gives the same data.")
+        parser.add_argument('--prefix', default='demo', help="Email prefix marking the seeded users.")
+        parser.add_argument('--password', default='demo-password', help="Password for every seeded user.")
+        parser.add_argument('--flush', action='store_true', help="Delete previously seeded users (and everything of theirs) first.")
+        parser.add_argument('--skip-analytics', action='store_true', help="Don't rebuild the per-artist daily analytics rows.")
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.prefix = options['prefix']
+        seeded = User.objects.filter(email__startswith=f'{self.prefix}-')
+        if options['flush']:
+            deleted = seeded.delete()[0]
+            self.stdout.write(f"Flushed {deleted} rows from the previous seed.")
+        elif seeded.exists():
+            raise CommandError(f"Users with the '{self.prefix}-' prefix already exist; pass --flush or another --prefix.")
+
+        self.password = make_password(options['password'])
+        self.today = timezone.localdate()
+        artist_ids = self.create_artists(options['artists'])
+        organizer_ids = self.create_organizers(options['organizers'])
+        if not artist_ids or not organizer_ids:
+            raise CommandError("Need at least one artist and one organizer.")
+        self.create_bookings(options['bookings'], artist_ids, organizer_ids)
+        self.create_reviews(options['review_rate'])
+        self.create_favorites(options['favorites'], artist_ids, organizer_ids)
+        self.create_conversations(options['conversations'], options['messages'], artist_ids, organizer_ids)
+        self.rebuild_denormalized(artist_ids, options['skip_analytics'])
+        self.stdout.write(self.style.SUCCESS("Seed complete."))
+
+    # --- helpers ---------------------------------------------------------
+
+    def batches(self, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def bulk_create(self, model, rows):
+        count = 0
+        for batch in self.batches(rows):
+            model.objects.bulk_create(batch, batch_size=self.batch_size)
+            count += len(batch)
+        self.stdout.write(f"  {model.__name__}: {count}")
+        return count
+
+    def create_users(self, role, count):
+        """Bulk-creates users; yields (n, user_id) in chunks so profiles can follow."""
+        kind = role.lower()
+        for start in range(0, count, self.batch_size):
+            numbers = range(start, min(count, start + self.batch_size))
+            emails = [f'{self.prefix}-{kind}-{n}@example.com' for n in numbers]
+            User.objects.bulk_create([User(email=email, password=self.password, role=role) for email in emails])
+            ids = dict(User.objects.filter(email__in=emails).values_list('email', 'pk'))
+            yield [(n, ids[email]) for n, email in zip(numbers, emails)]
+
+    def person(self):
+        return f'{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}'
+
+    # --- tables ----------------------------------------------------------
+
+    def create_artists(self, count):
+        rand = self.random
+        artist_ids = []
+        for chunk in self.create_users(User.Role.ARTIST, count):
+            profiles, members, items = [], [], []
+            for n, user_id in chunk:
+                is_group = rand.random() < 0.2
+                profiles.append(ArtistProfile(
+                    user_id=user_id, is_group=is_group, group_name=f'The {LAST_NAMES[n % len(LAST_NAMES)]} Collective {n}' if is_group else None,
+                    contact_name=self.person(), phone=f'9{n:09d}', category=rand.choice(CATEGORIES),
+                    location=rand.choice(LOCATIONS), pricing_per_event=rand.randrange(5, 500) * 100,
+                    bio=f'Performer #{n}. ' * rand.randrange(1, 6), government_id='gov_ids/demo.pdf',
+                    is_approved=rand.random() < 0.95,
+                ))
+                if is_group:
+                    members += [
+                        GroupMember(group_id=user_id, name=self.person(), role=rand.choice(ROLES))
+                        for _ in range(rand.randrange(2, 6))
+                    ]
+                items += [
+                    PortfolioItem(artist_id=user_id, file_type='VIDEO', title=f'Performance {k + 1}', url=f'https://example.com/{n}/{k}')
+                    for k in range(rand.randrange(0, 4))
+                ]
+                artist_ids.append(user_id)
+            ArtistProfile.objects.bulk_create(profiles, batch_size=self.batch_size)
+            GroupMember.objects.bulk_create(members, batch_size=self.batch_size)
+            PortfolioItem.objects.bulk_create(items, batch_size=self.batch_size)
+        self.stdout.write(f"  ArtistProfile: {len(artist_ids)}")
+        return artist_ids
+
+    def create_organizers(self, count):
+        organizer_ids = []
+        for chunk in self.create_users(User.Role.ORGANIZER, count):
+            OrganizerProfile.objects.bulk_create([
+                OrganizerProfile(user_id=user_id, full_name=self.person(), organization_name=f'Events Co {n}', phone=f'8{n:09d}')
+                for n, user_id in chunk
+            ], batch_size=self.batch_size)
+            organizer_ids += [user_id for _, user_id in chunk]
+        self.stdout.write(f"  OrganizerProfile: {len(organizer_ids)}")
+        return organizer_ids
+
+    def create_bookings(self, count, artist_ids, organizer_ids):
+        rand = self.random
+        # Accepted bookings may not share a day per artist; those days become blocked periods.
+        booked_days = defaultdict(set)
+
+        def bookings():
+            for _ in range(count):
+                artist_id = rand.choice(artist_ids)
+                event_date = self.today + timedelta(days=rand.randrange(-365, 180))
+                status = rand.choice(PAST_STATUSES if event_date < self.today else FUTURE_STATUSES)
+                if status in (Booking.Status.ACCEPTED, Booking.Status.COMPLETED):
+                    if event_date in booked_days[artist_id]:
+                        status = Booking.Status.DECLINED
+                    else:
+                        booked_days[artist_id].add(event_date)
+                starts_at, ends_at = day_bounds(event_date, event_date)
+                yield Booking(
+                    artist_id=artist_id, organizer_id=rand.choice(organizer_ids), event_date=event_date,
+                    starts_at=starts_at, ends_at=ends_at, event_details='Private event, about 3 hours.', status=status,
+                )
+
+        self.bulk_create(Booking, bookings())
+        # bulk_create stamps created_at with now; spread requests out to a month before each event.
+        seeded = Booking.objects.filter(organizer__email__startswith=f'{self.prefix}-')
+        now = timezone.now()
+        seeded.update(created_at=Least(F('starts_at') - timedelta(days=30), Value(now)))
+        seeded.exclude(status=Booking.Status.PENDING).update(responded_at=F('created_at') + timedelta(hours=20))
+
+        def notifications():
+            pending = seeded.filter(status=Booking.Status.PENDING).values_list('pk', 'artist_id', 'organizer_id')
+            for booking_id, artist_id, organizer_id in pending.iterator(chunk_size=self.batch_size):
+                yield Notification(recipient_id=artist_id, sender_id=organizer_id, message='You have a new booking request.', related_booking_id=booking_id)
+
+        self.bulk_create(Notification, notifications())
+
+        def periods():
+            for artist_id in artist_ids:
+                booked = booked_days.get(artist_id, set())
+                # A few days each artist blocked by hand, on top of their gigs.
+                manual = {self.today + timedelta(days=rand.randrange(0, 180)) for _ in range(rand.randrange(0, 4))}
+                # Stored the way block_ranges() leaves them: booked days stay booked, and
+                # a manual run touching a gig is its own period.
+                booked_ranges = availability.coalesce_days(booked)
+                for start, end in booked_ranges:
+                    yield Availability(artist_id=artist_id, date=start, end_date=end, is_booked=True)
+                for start, end in availability.subtract_ranges(availability.coalesce_days(manual), booked_ranges):
+                    yield Availability(artist_id=artist_id, date=start, end_date=end, is_booked=False)
+
+        self.bulk_create(Availability, periods())
+
+    def create_reviews(self, rate):
+        rand = self.random
+        settled = Booking.objects.filter(
+            organizer__email__startswith=f'{self.prefix}-', event_date__lt=self.today,
+            status__in=[Booking.Status.ACCEPTED, Booking.Status.COMPLETED],
+        ).values_list('pk', 'artist_id', 'organizer_id')
+
+        def reviews():
+            for booking_id, artist_id, organizer_id in settled.iterator(chunk_size=self.batch_size):
+                if rand.random() < rate:
+                    yield Review(booking_id=booking_id, artist_id=artist_id, organizer_id=organizer_id, rating=rand.choice(RATINGS), comment='Great show, would book again.')
+
+        self.bulk_create(Review, reviews())
+
+    def unique_pairs(self, count, artist_ids, organizer_ids):
+        count = min(count, len(artist_ids) * len(organizer_ids))
+        pairs = set()
+        while len(pairs) < count:
+            pairs.add((self.random.choice(artist_ids), self.random.choice(organizer_ids)))
+        return pairs
+
+    def create_favorites(self, count, artist_ids, organizer_ids):
+        pairs = self.unique_pairs(count, artist_ids, organizer_ids)
+        self.bulk_create(Favorite, (Favorite(artist_id=artist_id, organizer_id=organizer_id) for artist_id, organizer_id in pairs))
+
+    def create_conversations(self, count, message_count, artist_ids, organizer_ids):
+        pairs = self.unique_pairs(count, artist_ids, organizer_ids)
+        self.bulk_create(Conversation, (Conversation(artist_id=artist_id, organizer_id=organizer_id) for artist_id, organizer_id in pairs))
+        conversations = list(Conversation.objects.filter(organizer__user__email__startswith=f'{self.prefix}-').values_list('pk', 'artist_id', 'organizer_id'))
+        if not conversations:
+            return
+        rand = self.random
+
+        def messages():
+            for n in range(message_count):
+                conversation_id, artist_id, organizer_id = rand.choice(conversations)
+                yield Message(
+                    conversation_id=conversation_id, sender_id=rand.choice((artist_id, organizer_id)),
+                    content=f'Message {n} about the event.', is_read=rand.random() < 0.8,
+                )
+
+        self.bulk_create(Message, messages())
+
+    def rebuild_denormalized(self, artist_ids, skip_analytics):
+        self.stdout.write("Rebuilding denormalized data...")
+        search.rebuild_index()
+        ratings.reconcile()
+        if not skip_analytics:
+            for artist_id in artist_ids:
+                analytics.backfill_artist(artist_id)
+        call_command('refresh_conversation_activity', stdout=self.stdout)
+        # Turns the seeded Message.is_read flags into read watermarks and reconciles unread counters.
+        call_command('backfill_read_watermarks', stdout=self.stdout)
+        refresh_pool()
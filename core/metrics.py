@@ -0,0 +1,235 @@
+# core/metrics.py
+"""
+Per-view latency, SQL and template metrics.
+
+MetricsMiddleware times a sample of requests and files each one under the
+resolved URL name (e.g. 'artist_profile', 'bookings:detail'):
+
+  - request latency, as a histogram;
+  - SQL query count (also a histogram, to spot N+1 pages) and SQL time, from
+    an execute_wrapper on every database connection;
+  - template render time, from InstrumentedDjangoTemplates, a drop-in for
+    the DjangoTemplates backend (lazy queries run during rendering count
+    towards both SQL and template time):
+
+        TEMPLATES = [{'BACKEND': 'core.metrics.InstrumentedDjangoTemplates', ...}]
+
+The totals live in process memory and are served in the Prometheus text
+format by the /metrics/ view (core/views.py); every worker process reports
+its own series, as with any multi-process Prometheus client. Settings:
+
+  METRICS_ENABLED      (True)   switch the middleware off entirely
+  METRICS_SAMPLE_RATE  (1.0)    fraction of requests measured; unsampled
+                                requests cost one random() call
+  METRICS_LOG          (False)  also log one JSON line per sampled request
+                                to the 'core.metrics' logger
+  METRICS_TOKEN        (unset)  bearer token for scrapers
+
+/metrics/ is readable by staff users and by scrapers sending
+"Authorization: Bearer <METRICS_TOKEN>". METRICS_ALLOWED_IPS (empty by
+default) additionally lets listed REMOTE_ADDRs in without either; behind a
+reverse proxy every request comes from the proxy's address, so only use it
+when the app server is reached directly.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+UNRESOLVED = '<unresolved>'
+EXCLUDED_VIEWS = {'metrics'}
+
+_current = ContextVar('metrics_request', default=None)
+
+
+class RequestStats:
+    """What one request spent; also the execute_wrapper that counts its SQL."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_seconds += time.perf_counter() - start
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            yield bound, running
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.errors = 0
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, seconds, stats, status):
+        with self._lock:
+            metrics = self._views.get(view)
+            if metrics is None:
+                metrics = self._views[view] = ViewMetrics()
+            metrics.latency.observe(seconds)
+            metrics.queries.observe(stats.queries)
+            metrics.sql_seconds += stats.sql_seconds
+            metrics.template_seconds += stats.template_seconds
+            if status >= 500:
+                metrics.errors += 1
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+    def render(self):
+        """The Prometheus text exposition (format 0.0.4)."""
+        with self._lock:
+            views = sorted(self._views.items())
+            lines = [
+                '# HELP stagelink_metrics_sample_rate Fraction of requests measured.',
+                '# TYPE stagelink_metrics_sample_rate gauge',
+                f'stagelink_metrics_sample_rate {sample_rate()}',
+            ]
+            lines += _histogram_lines(
+                'stagelink_view_duration_seconds', 'Request latency by view.',
+                [(view, metrics.latency) for view, metrics in views],
+            )
+            lines += _histogram_lines(
+                'stagelink_view_sql_queries', 'SQL queries per request by view.',
+                [(view, metrics.queries) for view, metrics in views],
+            )
+            for name, help_text, attr in [
+                ('stagelink_view_sql_seconds_total', 'Time spent in SQL by view.', 'sql_seconds'),
+                ('stagelink_view_template_seconds_total', 'Time spent rendering templates by view.', 'template_seconds'),
+                ('stagelink_view_errors_total', 'Responses with a 5xx status by view.', 'errors'),
+            ]:
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                lines += [f'{name}{{view="{_escape(view)}"}} {getattr(metrics, attr)}' for view, metrics in views]
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogram_lines(name, help_text, series):
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for view, histogram in series:
+        label = f'view="{_escape(view)}"'
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+        lines.append(f'{name}_sum{{{label}}} {histogram.sum}')
+        lines.append(f'{name}_count{{{label}}} {histogram.count}')
+    return lines
+
+
+registry = Registry()
+
+
+def sample_rate():
+    return getattr(settings, 'METRICS_SAMPLE_RATE', 1.0)
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return (match.view_name if match else None) or UNRESOLVED
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+
+    def __call__(self, request):
+        if not self.enabled or random.random() >= sample_rate():
+            return self.get_response(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        seconds = time.perf_counter() - start
+        view = view_name(request)
+        if view not in EXCLUDED_VIEWS:
+            registry.record(view, seconds, stats, response.status_code)
+            if getattr(settings, 'METRICS_LOG', False):
+                logger.info(json.dumps({
+                    'view': view, 'method': request.method, 'status': response.status_code,
+                    'duration_ms': round(seconds * 1000, 2), 'sql_queries': stats.queries,
+                    'sql_ms': round(stats.sql_seconds * 1000, 2),
+                    'template_ms': round(stats.template_seconds * 1000, 2),
+                }))
+        return response
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(context, request)
+        # Only the outermost render is timed; nested ones are already inside it.
+        stats.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_depth -= 1
+            if not stats.template_depth:
+                stats.template_seconds += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
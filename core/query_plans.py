@@ -0,0 +1,88 @@
+# core/query_plans.py
+"""
+EXPLAIN-based checks for query-plan regression tests.
+
+QueryPlanAssertionsMixin.assertNoFullScans() records every SELECT/UPDATE/DELETE
+run inside the block, asks the database for its plan and fails if any of them
+reads a whole table:
+
+  - SQLite: a "SCAN <table>" step. The one exception is "SCAN <table> USING
+    INDEX" in a statement with a LIMIT and no temporary sort: an index-ordered
+    walk that stops after one page (keyset pagination does exactly this). A
+    bare "SCAN <table>" always counts, LIMIT or not - .get() and .first() add
+    a LIMIT too, and an unindexed lookup must not pass because of it.
+  - PostgreSQL: a "Seq Scan" node. Test tables are tiny, so the planner would
+    pick sequential scans everywhere; plans are taken with enable_seqscan off,
+    which leaves a Seq Scan only where no index can be used at all.
+"""
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+
+EXPLAINED_STATEMENTS = ('SELECT', 'UPDATE', 'DELETE')
+_LIMIT_RE = re.compile(r'\bLIMIT\b', re.IGNORECASE)
+_INDEX_WALK_RE = re.compile(r'^SCAN \S+( AS \S+)? USING (COVERING )?INDEX ')
+
+
+class PlanRecorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+            self.queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+def explain(sql, params=None, conn=None):
+    """Returns the plan as a list of text lines."""
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            cursor.execute("SET enable_seqscan = off")
+            try:
+                cursor.execute(f"EXPLAIN {sql}", params)
+                return [row[0] for row in cursor.fetchall()]
+            finally:
+                cursor.execute("RESET enable_seqscan")
+        if conn.vendor == 'sqlite':
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row[-1] for row in cursor.fetchall()]
+        cursor.execute(f"EXPLAIN {sql}", params)
+        return [' '.join(str(col) for col in row) for row in cursor.fetchall()]
+
+
+def full_scans(sql, params=None, conn=None):
+    """The plan lines that read a whole table (empty if the query is index-backed)."""
+    conn = conn or connection
+    plan = explain(sql, params, conn)
+    if conn.vendor == 'postgresql':
+        return [line for line in plan if 'Seq Scan' in line]
+    if conn.vendor != 'sqlite':
+        return []
+    scans = [
+        line for line in plan
+        if line.startswith('SCAN ') and 'CONSTANT ROW' not in line and 'VIRTUAL TABLE' not in line
+    ]
+    if _LIMIT_RE.search(sql) and not any('TEMP B-TREE' in line for line in plan):
+        scans = [line for line in scans if not _INDEX_WALK_RE.search(line)]
+    return scans
+
+
+class QueryPlanAssertionsMixin:
+    """For TestCase subclasses."""
+
+    @contextmanager
+    def assertNoFullScans(self, ignore_tables=()):
+        recorder = PlanRecorder()
+        with connection.execute_wrapper(recorder):
+            yield recorder
+        self.assertTrue(recorder.queries, "No queries were recorded.")
+        problems = []
+        for sql, params in recorder.queries:
+            scans = [line for line in full_scans(sql, params) if not any(table in line for table in ignore_tables)]
+            if scans:
+                problems.append(f"{sql}\n    " + "\n    ".join(scans))
+        if problems:
+            self.fail("Full table scans:\n" + "\n".join(problems))
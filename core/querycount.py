@@ -0,0 +1,157 @@
+# core/querycount.py
+"""
+N+1 query detection and per-view query budgets.
+
+QueryShapeRecorder is an execute_wrapper that groups the SELECTs run inside
+a block by shape: the SQL text with its IN (...) lists collapsed, which is
+already parameter-free. It remembers where each shape first came from: the
+innermost project frame and, for lazy lookups in templates, the template
+line. The same shape running again and again in one request is the N+1
+signature: a lazy relation walked inside a loop or a template.
+
+  - QueryBudgetMixin (tests): `query_budgets = {url_name: max_queries}` and
+    `assertWithinBudget(url_name, ...)`, which requests the page and fails
+    on a query count over budget or on a repeated shape, naming its origin.
+    Every cache is cleared first, so budgets are what a cold page costs;
+    `warm_query_budgets` and `warm=True` budget a repeat request instead,
+    measured after one untimed request has filled the caches.
+  - NPlusOneMiddleware (development): logs a warning for every request with
+    repeated shapes. It walks the stack for every new shape, so keep it
+    out of production; QUERYCOUNT_THRESHOLD (default 3) sets how many runs count.
+"""
+import logging
+import os
+import re
+import sys
+import sysconfig
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.urls import reverse
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 3
+_IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+_SKIPPED_DIRS = tuple(
+    os.path.normcase(os.path.abspath(path)) + os.sep
+    for path in (os.path.dirname(django.__file__), sysconfig.get_paths()['stdlib'], sysconfig.get_paths()['purelib'])
+)
+# Instrumentation that wraps queries or renders without causing them.
+_SKIPPED_FILES = {os.path.normcase(os.path.abspath(path)) for path in (__file__, metrics.__file__)}
+
+
+def shape(sql):
+    return _IN_LIST_RE.sub('IN (...)', sql)
+
+
+def _template_line(frame):
+    node = frame.f_locals.get('self') if frame.f_code.co_name == 'render_annotated' else None
+    token = getattr(node, 'token', None)
+    origin = getattr(node, 'origin', None)
+    if token is None or origin is None:
+        return None
+    return f'{origin.template_name}:{token.lineno}'
+
+
+def _origin():
+    """The innermost project frame, plus the innermost template line rendering at the time."""
+    template_line = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.normcase(os.path.abspath(frame.f_code.co_filename))
+        if filename.startswith(_SKIPPED_DIRS) or filename in _SKIPPED_FILES:
+            template_line = template_line or _template_line(frame)
+        else:
+            location = f'{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}'
+            return f'{template_line} via {location}' if template_line else location
+        frame = frame.f_back
+    return template_line or '<unknown>'
+
+
+@dataclass
+class RepeatedQuery:
+    sql: str
+    count: int
+    origin: str
+
+    def __str__(self):
+        return f'{self.count}x from {self.origin}: {self.sql}'
+
+
+class QueryShapeRecorder:
+    def __init__(self):
+        self.count = 0
+        self.shapes = Counter()
+        self.origins = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        if sql.lstrip().upper().startswith('SELECT'):
+            key = shape(sql)
+            self.shapes[key] += 1
+            if key not in self.origins:
+                self.origins[key] = _origin()
+        return execute(sql, params, many, context)
+
+    def repeated(self, threshold=DEFAULT_THRESHOLD):
+        """Shapes run at least `threshold` times, most frequent first."""
+        return [
+            RepeatedQuery(sql, count, self.origins[sql])
+            for sql, count in self.shapes.most_common() if count >= threshold
+        ]
+
+
+@contextmanager
+def record_queries():
+    """Records the queries run on every database connection inside the block."""
+    recorder = QueryShapeRecorder()
+    with ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(recorder))
+        yield recorder
+
+
+class NPlusOneMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'QUERYCOUNT_THRESHOLD', DEFAULT_THRESHOLD)
+
+    def __call__(self, request):
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        for repeat in recorder.repeated(self.threshold):
+            logger.warning("Repeated query on %s %s: %s", request.method, request.path, repeat)
+        return response
+
+
+class QueryBudgetMixin:
+    """For TestCase subclasses: page-level query budgets by URL name."""
+
+    query_budgets = {}
+    warm_query_budgets = {}
+    n_plus_one_threshold = DEFAULT_THRESHOLD
+
+    def assertWithinBudget(self, url_name, args=None, kwargs=None, method='get', data=None, warm=False):
+        budget = (self.warm_query_budgets if warm else self.query_budgets)[url_name]
+        url = reverse(url_name, args=args, kwargs=kwargs)
+        for cache in caches.all():
+            cache.clear()
+        if warm:
+            getattr(self.client, method)(url, data)
+        with record_queries() as recorder:
+            response = getattr(self.client, method)(url, data)
+        self.assertLess(response.status_code, 400, f"{url} returned {response.status_code}")
+        repeats = recorder.repeated(self.n_plus_one_threshold)
+        if repeats:
+            self.fail(f"{url_name} repeats queries (N+1?):\n" + '\n'.join(str(repeat) for repeat in repeats))
+        if recorder.count > budget:
+            self.fail(f"{url_name} ran {recorder.count} queries, over its budget of {budget}")
+        return response
@@ -1,3 +1,206 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from collections import Counter
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from accounts.models import ArtistProfile, User
+from accounts.tests import make_artist
+
+from . import featured
+from .metrics import MetricsMiddleware, Registry, RequestStats, registry
+from .query_plans import full_scans
+
+
+@skipUnless(connection.vendor == 'sqlite', "Checks SQLite plan lines.")
+class FullScanTests(TestCase):
+    def scans(self, queryset):
+        return full_scans(*queryset.query.sql_with_params())
+
+    def test_limit_does_not_hide_an_unindexed_lookup(self):
+        # What .first() / .get() run: the LIMIT must not exempt the table scan.
+        self.assertTrue(self.scans(ArtistProfile.objects.filter(phone='0')[:1]))
+
+    def test_index_ordered_page_is_not_a_full_scan(self):
+        self.assertFalse(self.scans(ArtistProfile.objects.order_by('pk')[:24]))
+
+    def test_index_walk_without_limit_is_a_full_scan(self):
+        self.assertTrue(self.scans(ArtistProfile.objects.order_by('pk')))
+
+
+class MetricsRegistryTests(TestCase):
+    def test_render(self):
+        metrics = Registry()
+        stats = RequestStats()
+        stats.queries, stats.sql_seconds, stats.template_seconds = 3, 0.25, 0.5
+        metrics.record('artist_profile', 0.02, stats, 200)
+        metrics.record('artist_profile', 3, stats, 500)
+        lines = metrics.render().splitlines()
+        self.assertIn('stagelink_view_duration_seconds_bucket{view="artist_profile",le="0.025"} 1', lines)
+        self.assertIn('stagelink_view_duration_seconds_bucket{view="artist_profile",le="5"} 2', lines)
+        self.assertIn('stagelink_view_duration_seconds_bucket{view="artist_profile",le="+Inf"} 2', lines)
+        self.assertIn('stagelink_view_duration_seconds_count{view="artist_profile"} 2', lines)
+        self.assertIn('stagelink_view_sql_queries_bucket{view="artist_profile",le="5"} 2', lines)
+        self.assertIn('stagelink_view_sql_seconds_total{view="artist_profile"} 0.5', lines)
+        self.assertIn('stagelink_view_template_seconds_total{view="artist_profile"} 1.0', lines)
+        self.assertIn('stagelink_view_errors_total{view="artist_profile"} 1', lines)
+
+    def test_label_escaping(self):
+        metrics = Registry()
+        metrics.record('a"b\\c', 0.01, RequestStats(), 200)
+        self.assertIn('stagelink_view_errors_total{view="a\\"b\\\\c"} 0', metrics.render().splitlines())
+
+
+class MetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def request(self, path):
+        request = RequestFactory().get(path)
+        request.resolver_match = resolve(path)
+        return request
+
+    def view(self, request):
+        list(User.objects.all()[:1])
+        list(User.objects.all()[:1])
+        return HttpResponse()
+
+    def test_records_the_view_and_its_queries(self):
+        MetricsMiddleware(self.view)(self.request(reverse('home')))
+        lines = registry.render().splitlines()
+        self.assertIn('stagelink_view_duration_seconds_count{view="home"} 1', lines)
+        self.assertIn('stagelink_view_sql_queries_bucket{view="home",le="1"} 0', lines)
+        self.assertIn('stagelink_view_sql_queries_bucket{view="home",le="2"} 1', lines)
+
+    def test_metrics_view_is_not_recorded(self):
+        MetricsMiddleware(self.view)(self.request(reverse('metrics')))
+        self.assertNotIn('view="metrics"', registry.render())
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_recorded(self):
+        MetricsMiddleware(self.view)(self.request(reverse('home')))
+        self.assertNotIn('view="home"', registry.render())
+
+
+@override_settings(METRICS_TOKEN='s3cret')
+class MetricsViewTests(TestCase):
+    def test_anonymous_local_request_is_refused(self):
+        # The test client's REMOTE_ADDR is 127.0.0.1, as for every request behind a proxy.
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+    def test_bearer_token(self):
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong').status_code, 404)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_empty_token_is_never_accepted(self):
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer ').status_code, 404)
+
+    def test_staff(self):
+        self.client.force_login(User.objects.create_user(email='staff@example.com', password='pw', is_staff=True))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.5'])
+    def test_allowed_ip(self):
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.5').status_code, 200)
+
+
+def boost_first_artist(candidates):
+    return {min(row['pk'] for row in candidates): 2}
+
+
+def boost_everyone(candidates):
+    return {row['pk']: 100 for row in candidates}
+
+
+@override_settings(FEATURED_ARTIST_WEIGHT_HOOKS=[])
+@mock.patch.object(featured, 'CHUNK_SIZE', 3)
+class FeaturedPoolTests(TestCase):
+    """The homepage pool is chunked, weighted, rebuilt behind a lock and sampled around evictions."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artists = [make_artist(n) for n in range(1, 6)]
+        make_artist(6, is_approved=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def chunks(self, pool):
+        return [cache.get(featured._chunk_key(pool['generation'], index)) for index in range(pool['chunks'])]
+
+    def test_slots_are_chunked(self):
+        pool = featured.refresh_pool()
+        self.assertEqual((pool['slot_count'], pool['artist_count'], pool['chunks']), (20, 5, 7))
+        chunks = self.chunks(pool)
+        self.assertTrue(all(len(chunk) <= 3 for chunk in chunks))
+        slots = Counter(pk for chunk in chunks for pk in chunk)
+        self.assertEqual(slots, {artist.pk: featured.SLOTS_PER_WEIGHT for artist in self.artists})
+        self.assertEqual(pool['categories'], ['Singer'])
+
+    def test_weight_hooks(self):
+        first = self.artists[0].pk
+        with self.settings(FEATURED_ARTIST_WEIGHT_HOOKS=['core.tests.boost_first_artist']):
+            slots = Counter(pk for chunk in self.chunks(featured.refresh_pool()) for pk in chunk)
+        self.assertEqual(slots[first], 2 * featured.SLOTS_PER_WEIGHT)
+        with self.settings(FEATURED_ARTIST_WEIGHT_HOOKS=['core.tests.boost_everyone']):
+            pool = featured.refresh_pool()
+        self.assertEqual(pool['slot_count'], 5 * featured.MAX_SLOTS_PER_ARTIST)
+
+    def test_only_the_lock_holder_rebuilds(self):
+        cache.add(featured.POOL_LOCK_KEY, True)
+        pool = featured.get_pool()
+        # Cold cache and someone else building: a direct sample, not an empty homepage.
+        self.assertIsNone(cache.get(featured.POOL_CACHE_KEY))
+        self.assertEqual(sorted(pool['slots']), [artist.pk for artist in self.artists])
+        self.assertEqual(len(featured.sample_artist_ids(3, pool)), 3)
+
+        cache.delete(featured.POOL_LOCK_KEY)
+        built = featured.get_pool()
+        self.assertEqual(built['artist_count'], 5)
+        self.assertIsNone(cache.get(featured.POOL_LOCK_KEY))
+
+        # A stale pool is served as is while the lock is held.
+        with mock.patch.object(featured, 'POOL_TIMEOUT', -1):
+            cache.add(featured.POOL_LOCK_KEY, True)
+            self.assertEqual(featured.get_pool()['generation'], built['generation'])
+            cache.delete(featured.POOL_LOCK_KEY)
+            self.assertNotEqual(featured.get_pool()['generation'], built['generation'])
+
+    def test_sampling_skips_evicted_chunks(self):
+        pool = featured.refresh_pool()
+        kept = self.chunks(pool)[2]
+        cache.delete_many([featured._chunk_key(pool['generation'], index) for index in range(pool['chunks']) if index != 2])
+        for _ in range(10):
+            picked = featured.sample_artist_ids(3, pool)
+            self.assertEqual(sorted(picked), sorted(set(kept)))
+        cache.delete(featured._chunk_key(pool['generation'], 2))
+        self.assertEqual(featured.sample_artist_ids(3, pool), [])
+
+
+class DemoDataSmokeTests(TestCase):
+    """seed_demo_data and run_view_benchmarks work together on a tiny dataset."""
+
+    def test_every_benchmarked_page_renders(self):
+        out = StringIO()
+        call_command(
+            'seed_demo_data', artists=5, organizers=3, bookings=20, favorites=5, conversations=3, messages=10,
+            stdout=out,
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'benchmarks.json')
+            call_command('run_view_benchmarks', iterations=1, warmup=0, output=output, stdout=out)
+            with open(output) as handle:
+                results = json.load(handle)['results']
+        self.assertIn('conversation', results)
+        for name, row in results.items():
+            self.assertEqual(row['status'], [200], name)
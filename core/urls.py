@@ -10,4 +10,5 @@ urlpatterns = [
     path('faq/', views.faq, name='faq'),
     path('terms-of-service/', views.terms_of_service, name='terms_of_service'),
     path('privacy-policy/', views.privacy_policy, name='privacy_policy'),
+    path('metrics/', views.metrics, name='metrics'),
 ]
\ No newline at end of file
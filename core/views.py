@@ -1,18 +1,19 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
-from accounts.models import ArtistProfile
+from django.utils.crypto import constant_time_compare
+from . import metrics as request_metrics
+from .featured import featured_artists as get_featured_artists
 
 def home(request):
     """
     Renders the homepage.
     Fetches featured artists and a list of categories to display.
     """
-    # Get up to 3 randomly ordered, approved artists to feature on the homepage.
-    # Note: order_by('?') can be resource-intensive on large databases, but is fine for most projects.
-    featured_artists = ArtistProfile.objects.filter(is_approved=True).order_by('?')[:3]
-    
-    # Get a distinct list of up to 5 categories from approved artists.
-    # This ensures the categories shown are relevant to the available talent.
-    categories = ArtistProfile.objects.filter(is_approved=True).values_list('category', flat=True).distinct()[:5]
+    # Up to 3 approved artists sampled from the cached, weighted featured pool,
+    # plus up to 5 categories from approved artists. Both come from the same
+    # precomputed pool (see core/featured.py), so this is only a pk lookup.
+    featured_artists, categories = get_featured_artists(3)
     
     # Create the context dictionary to pass data to the template.
     context = {
@@ -56,3 +57,23 @@ def privacy_policy(request):
     Renders the static 'Privacy Policy' page.
     """
     return render(request, 'core/privacy.html')
+
+def _metrics_token_ok(request):
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    scheme, _, credentials = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and constant_time_compare(credentials, token)
+
+def metrics(request):
+    """
+    Per-view request metrics in the Prometheus text format (see core/metrics.py).
+    Readable by staff users, with the METRICS_TOKEN bearer token, or from
+    METRICS_ALLOWED_IPS (empty by default).
+    """
+    allowed = (
+        request.user.is_staff
+        or _metrics_token_ok(request)
+        or request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', ())
+    )
+    if not allowed:
+        raise Http404
+    return HttpResponse(request_metrics.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,102 @@
+# accounts/dashboard.py
+"""
+Organizer dashboard snapshot.
+
+The dashboard is the landing page after login, so its numbers are built once
+and cached per organizer and day:
+
+  - the booking figures come from one conditional-aggregate query over the
+    organizer's accepted bookings ("pending review" is a NOT EXISTS on the
+    review, not an exclude join);
+  - the two highlighted bookings are fetched together in one query;
+  - the favorites count is annotated onto the profile fetch.
+
+The snapshot is dropped whenever the organizer's bookings, reviews, favorites
+or profile change, or a booked artist edits their profile (see
+accounts/signals.py; bookings/reservations.py does it explicitly for its
+queryset updates). The key includes the date, so
+"upcoming" rolls over at midnight on its own.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, Max, Min, OuterRef, Q
+from django.utils import timezone
+
+from bookings.models import Booking
+from reviews.models import Review
+
+from .models import OrganizerProfile
+
+SNAPSHOT_TIMEOUT = getattr(settings, 'DASHBOARD_SNAPSHOT_TIMEOUT', 10 * 60)
+
+
+def _cache_key(user_id, day):
+    return f'dashboard:organizer:{user_id}:{day.isoformat()}'
+
+
+def invalidate_organizers(user_ids):
+    keys = [_cache_key(user_id, timezone.localdate()) for user_id in set(user_ids)]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_organizer(user_id):
+    invalidate_organizers([user_id])
+
+
+def build_organizer_snapshot(profile, today=None):
+    """`profile` must come from organizer_profiles(), which adds the favorites count."""
+    today = today or timezone.localdate()
+    user_id = profile.pk
+    accepted = Booking.objects.filter(organizer_id=user_id, status=Booking.Status.ACCEPTED).annotate(
+        reviewed=Exists(Review.objects.filter(booking=OuterRef('pk'))),
+    )
+    upcoming = Q(event_date__gte=today)
+    pending_review = Q(event_date__lt=today, reviewed=False)
+    stats = accepted.aggregate(
+        upcoming_events_count=Count('pk', filter=upcoming),
+        past_events_pending_review_count=Count('pk', filter=pending_review),
+        next_event_date=Min('event_date', filter=upcoming),
+        latest_review_date=Max('event_date', filter=pending_review),
+    )
+
+    # Both highlighted bookings in one query; ties on the date go to the oldest request.
+    highlights = Q()
+    if stats['next_event_date']:
+        highlights |= upcoming & Q(event_date=stats['next_event_date'])
+    if stats['latest_review_date']:
+        highlights |= pending_review & Q(event_date=stats['latest_review_date'])
+    next_event = latest_for_review = None
+    if highlights:
+        for booking in accepted.filter(highlights).select_related('artist__artistprofile').order_by('pk'):
+            if booking.event_date >= today:
+                next_event = next_event or booking
+            else:
+                latest_for_review = latest_for_review or booking
+
+    return {
+        'completion_percentage': profile.calculate_completion_percentage(),
+        'upcoming_events_count': stats['upcoming_events_count'],
+        'next_upcoming_event': next_event,
+        'favorite_artists_count': profile.favorite_artists_count,
+        'past_events_pending_review_count': stats['past_events_pending_review_count'],
+        'latest_past_event_for_review': latest_for_review,
+    }
+
+
+def organizer_profiles():
+    return OrganizerProfile.objects.annotate(favorite_artists_count=Count('user__favorites'))
+
+
+def organizer_snapshot(user_id):
+    """The dashboard context for an organizer, or None if they have no profile."""
+    today = timezone.localdate()
+    key = _cache_key(user_id, today)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        profile = organizer_profiles().filter(pk=user_id).first()
+        if profile is None:
+            return None
+        snapshot = build_organizer_snapshot(profile, today)
+        cache.set(key, snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
@@ -0,0 +1,87 @@
+# accounts/emails.py
+"""
+Batched delivery of queued artist approval emails.
+
+send_approval_emails() takes a batch of unsent ArtistApprovalEmail rows,
+compiles the template once, and sends every message over a single backend
+connection. Connection-level failures (server dropped us, timeouts) reopen the
+connection with exponential backoff and retry the same message; a message the
+server rejects outright is left queued with its error and retried on a later
+run, up to MAX_ATTEMPTS. Works with any EMAIL_BACKEND, including locmem and
+console.
+"""
+import logging
+import smtplib
+import time
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import ArtistApprovalEmail
+
+logger = logging.getLogger(__name__)
+
+APPROVAL_SUBJECT = 'Your StageLink Account has been Approved!'
+APPROVAL_FROM_EMAIL = 'donotreply@stagelink.com'
+APPROVAL_TEMPLATE = 'emails/artist_approval_email.html'
+MAX_ATTEMPTS = 5
+
+# Errors after which the connection itself can't be trusted any more.
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+def pending_emails():
+    return ArtistApprovalEmail.objects.filter(sent_at__isnull=True, attempts__lt=MAX_ATTEMPTS)
+
+
+def build_message(queued, template, connection):
+    artist = queued.artist
+    body = template.render({'artist': artist, 'login_url': queued.login_url})
+    message = EmailMultiAlternatives(APPROVAL_SUBJECT, body, APPROVAL_FROM_EMAIL, [artist.user.email], connection=connection)
+    message.attach_alternative(body, 'text/html')
+    return message
+
+
+def _send_with_retry(connection, message, retries, backoff):
+    for attempt in range(retries + 1):
+        try:
+            return connection.send_messages([message])
+        except CONNECTION_ERRORS:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt))
+            connection.close()
+            connection.open()
+
+
+def send_approval_emails(batch_size=100, retries=3, backoff=1.0, connection=None):
+    """Sends one batch of queued approval emails. Returns (sent, failed)."""
+    batch = list(pending_emails().select_related('artist__user').order_by('pk')[:batch_size])
+    if not batch:
+        return 0, 0
+
+    template = get_template(APPROVAL_TEMPLATE)
+    connection = connection or get_connection(fail_silently=False)
+    sent_ids, failed = [], 0
+    connection.open()
+    try:
+        for queued in batch:
+            try:
+                _send_with_retry(connection, build_message(queued, template, connection), retries, backoff)
+            except Exception as exc:
+                logger.warning("Approval email %s to %s failed: %s", queued.pk, queued.artist.user.email, exc)
+                queued.attempts += 1
+                queued.last_error = str(exc)
+                queued.save(update_fields=['attempts', 'last_error'])
+                failed += 1
+                if isinstance(exc, CONNECTION_ERRORS):
+                    # Retries are exhausted for the connection; leave the rest for the next run.
+                    break
+            else:
+                sent_ids.append(queued.pk)
+    finally:
+        connection.close()
+        if sent_ids:
+            ArtistApprovalEmail.objects.filter(pk__in=sent_ids).update(sent_at=timezone.now())
+    return len(sent_ids), failed
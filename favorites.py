@@ -0,0 +1,90 @@
+# accounts/favorites.py
+"""
+Per-organizer favorite sets.
+
+Each organizer's favorited artist ids are cached as one frozenset, so "is
+this artist a favorite?" is a set lookup. The set is loaded at most once
+per request (it is memoized on the user) and at most once per change.
+
+Sets are cached under the organizer's version token, as the profile page
+fragments are (accounts/profile_page.py). Any Favorite save or delete
+replaces the token after commit (see accounts/signals.py), and the next
+read rebuilds the set with one query. A reader that loaded the old set
+while the change was committing stores it under the old token, where
+nothing reads it again.
+
+Templates use the `favorited` filter from the `favorites` tag library:
+
+    {% load favorites %}
+    {% if artist|favorited:user %}...{% endif %}
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from reviews.models import Favorite
+
+from .models import User
+
+FAVORITES_TIMEOUT = getattr(settings, 'FAVORITES_CACHE_TIMEOUT', 10 * 60)
+
+
+def _cache_key(organizer_id, token):
+    return f'favorites:organizer:{organizer_id}:{token}'
+
+
+def _version_key(organizer_id):
+    return f'favorites:version:{organizer_id}'
+
+
+def _version(organizer_id):
+    key = _version_key(organizer_id)
+    token = cache.get(key)
+    if token is None:
+        cache.add(key, time.time_ns(), None)
+        token = cache.get(key)
+    return token
+
+
+def invalidate_organizer(organizer_id):
+    key = _version_key(organizer_id)
+    transaction.on_commit(lambda: cache.set(key, time.time_ns(), None))
+
+
+def favorite_ids(organizer_id):
+    """Frozenset of the artist (user) ids the organizer has favorited."""
+    # The token is read before the table, so a set loaded before a change lands under the old token.
+    key = _cache_key(organizer_id, _version(organizer_id))
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(Favorite.objects.filter(organizer_id=organizer_id).values_list('artist_id', flat=True))
+        cache.set(key, ids, FAVORITES_TIMEOUT)
+    return ids
+
+
+def favorite_ids_for(user):
+    """favorite_ids() for a request's user, memoized on it; empty for anyone but organizers."""
+    if not user.is_authenticated or user.role != User.Role.ORGANIZER:
+        return frozenset()
+    if not hasattr(user, '_favorite_artist_ids'):
+        user._favorite_artist_ids = favorite_ids(user.pk)
+    return user._favorite_artist_ids
+
+
+def is_favorite(user, artist_id):
+    return artist_id in favorite_ids_for(user)
+
+
+def toggle(organizer, artist_id):
+    """Adds or removes the favorite. Returns True if the artist is now a favorite."""
+    if Favorite.objects.filter(organizer=organizer, artist_id=artist_id).delete()[0]:
+        return False
+    try:
+        with transaction.atomic():
+            Favorite.objects.create(organizer=organizer, artist_id=artist_id)
+    except IntegrityError:
+        # A concurrent request favorited it first.
+        pass
+    return True
@@ -1,6 +1,7 @@
 from django import forms
 from django.forms import formset_factory
 from .models import ArtistProfile, OrganizerProfile, PortfolioItem, GroupMember
+from .availability import expand_rule
 
 class ArtistSignUpForm(forms.ModelForm):
     email = forms.EmailField(required=True, help_text='This will be your login email.')
@@ -66,7 +67,41 @@ class PortfolioItemForm(forms.ModelForm):
 
 
 class AvailabilityForm(forms.Form):
+    WEEKDAY_CHOICES = [(0, 'Mon'), (1, 'Tue'), (2, 'Wed'), (3, 'Thu'), (4, 'Fri'), (5, 'Sat'), (6, 'Sun')]
+    MAX_SPAN_DAYS = 366
+
     date = forms.DateField(
+        label="From",
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
+    )
+    end_date = forms.DateField(
+        label="To (optional)",
+        required=False,
+        help_text="Leave empty to block a single day.",
         widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
     )
+    weekdays = forms.TypedMultipleChoiceField(
+        choices=WEEKDAY_CHOICES,
+        coerce=int,
+        required=False,
+        help_text="Only block these weekdays within the range, e.g. every Monday.",
+        widget=forms.CheckboxSelectMultiple
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start = cleaned_data.get('date')
+        end = cleaned_data.get('end_date') or start
+        if start and end:
+            if end < start:
+                raise forms.ValidationError("The end date must be on or after the start date.")
+            if (end - start).days >= self.MAX_SPAN_DAYS:
+                raise forms.ValidationError("You can block at most one year at a time.")
+            cleaned_data['end_date'] = end
+        return cleaned_data
+
+    def get_ranges(self):
+        """The (start, end) day ranges this submission blocks."""
+        data = self.cleaned_data
+        return expand_rule(data['date'], data['end_date'], data.get('weekdays') or None)
 
@@ -0,0 +1,217 @@
+# accounts/images.py
+"""
+Thumbnail and WebP derivatives for uploaded photos.
+
+Every profile photo, group member photo and image portfolio item gets one
+derivative per size in SIZES, each as a JPEG and a WebP, stored next to the
+original under a deterministic name:
+
+    profile_photos/stage.jpg -> profile_photos/stage.card.jpg
+                                profile_photos/stage.card.webp
+
+After an upload commits (see accounts/signals.py), the original is read from
+storage and resized in a process pool by render_derivatives(), which only
+sees bytes, so it works with any storage backend. The pool's workers are
+spawned rather than forked, so they never inherit the web process's
+database connections, locks or threads. If a worker dies the pool is
+replaced on the next submission. The parent writes the results back
+through the storage. `manage.py generate_thumbnails` fills in images
+uploaded before this existed.
+
+Templates use the `images` tag library, which falls back to the original
+until the derivatives exist:
+
+    {% load images %}
+    {% responsive_image artist.profile_photo 'thumb' alt=artist.contact_name %}
+    <img src="{{ artist.profile_photo|thumbnail_url:'card' }}">
+
+Settings: IMAGE_DERIVATIVES_ASYNC (True; False renders inline, e.g. in
+tests) and IMAGE_WORKERS (pool size, default 2).
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# name -> (width, height, crop). Cropped sizes fill the box; the others fit inside it.
+SIZES = {
+    'thumb': (120, 120, True),
+    'card': (320, 320, True),
+    'medium': (800, 800, False),
+}
+# Each size's 2x source for high-density screens.
+RETINA = {'thumb': 'card', 'card': 'medium'}
+FORMATS = {'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}), 'webp': ('WEBP', {'quality': 80, 'method': 4})}
+READY_TIMEOUT = 24 * 60 * 60
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def derivative_name(name, size, ext):
+    stem, _ = os.path.splitext(name)
+    return f'{stem}.{size}.{ext}'
+
+
+def derivative_names(name):
+    return [derivative_name(name, size, ext) for size in SIZES for ext in FORMATS]
+
+
+def render_derivatives(data):
+    """{(size, ext): bytes} for an encoded image. Pure Pillow: runs in the worker processes."""
+    with Image.open(BytesIO(data)) as original:
+        largest = max(max(width, height) for width, height, _ in SIZES.values())
+        # JPEGs can decode straight at a reduced scale, which is most of the work on big uploads.
+        original.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+        if image.mode == 'RGBA':
+            flattened = Image.new('RGB', image.size, 'white')
+            flattened.paste(image, mask=image.getchannel('A'))
+            image = flattened
+        rendered = {}
+        for size, (width, height, crop) in SIZES.items():
+            if crop:
+                resized = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+            else:
+                resized = image.copy()
+                resized.thumbnail((width, height), Image.Resampling.LANCZOS)
+            for ext, (fmt, params) in FORMATS.items():
+                buffer = BytesIO()
+                resized.save(buffer, fmt, **params)
+                rendered[size, ext] = buffer.getvalue()
+        return rendered
+
+
+def _ready_key(name):
+    return f'image_derivatives:{name}'
+
+
+def is_ready(field):
+    """Whether the derivatives for this file exist (checked in storage once, then cached)."""
+    if not field:
+        return False
+    key = _ready_key(field.name)
+    ready = cache.get(key)
+    if ready is None:
+        ready = all(field.storage.exists(name) for name in derivative_names(field.name))
+        # A missing set may be on its way; only look again a minute later.
+        cache.set(key, ready, READY_TIMEOUT if ready else 60)
+    return ready
+
+
+def store_derivatives(storage, name, rendered, on_ready=None):
+    for (size, ext), data in rendered.items():
+        target = derivative_name(name, size, ext)
+        if storage.exists(target):
+            storage.delete(target)
+        storage.save(target, ContentFile(data))
+    cache.set(_ready_key(name), True, READY_TIMEOUT)
+    if on_ready is not None:
+        on_ready()
+
+
+def read_original(field):
+    with field.storage.open(field.name, 'rb') as handle:
+        return handle.read()
+
+
+def generate(field, force=False, on_ready=None):
+    """Renders and stores the derivatives for one file, in this process. Returns True if it rendered."""
+    if not field or (not force and is_ready(field)):
+        return False
+    try:
+        store_derivatives(field.storage, field.name, render_derivatives(read_original(field)), on_ready)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        logger.warning("Could not make derivatives for %s: %s", field.name, exc)
+        return False
+    return True
+
+
+def make_executor(max_workers=None):
+    """A process pool whose workers are spawned, not forked from this process."""
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = make_executor(getattr(settings, 'IMAGE_WORKERS', 2))
+        return _executor
+
+
+def discard_executor(executor):
+    """Drops a broken pool so the next get_executor() starts a fresh one."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit(storage, name, on_ready=None):
+    try:
+        with storage.open(name, 'rb') as handle:
+            data = handle.read()
+    except OSError as exc:
+        logger.warning("Could not read %s for derivatives: %s", name, exc)
+        return None
+
+    executor = get_executor()
+    try:
+        future = executor.submit(render_derivatives, data)
+    except BrokenProcessPool:
+        logger.warning("Image worker pool was broken; starting a new one.")
+        discard_executor(executor)
+        executor = get_executor()
+        future = executor.submit(render_derivatives, data)
+
+    def store(future):
+        try:
+            store_derivatives(storage, name, future.result(), on_ready)
+        except BrokenProcessPool as exc:
+            # A worker died (e.g. killed for memory); the next submission gets a new pool.
+            logger.error("Image worker pool broke while rendering %s: %s", name, exc)
+            discard_executor(executor)
+        except Exception as exc:
+            logger.warning("Could not make derivatives for %s: %s", name, exc)
+
+    future.add_done_callback(store)
+    return future
+
+
+def schedule(field, on_ready=None):
+    """
+    Queues derivative generation for a just-saved file once the transaction
+    commits. `on_ready` runs after the derivatives are stored, e.g. to drop
+    cached HTML that still points at the original.
+    """
+    if not field or is_ready(field):
+        return
+    storage, name = field.storage, field.name
+    if getattr(settings, 'IMAGE_DERIVATIVES_ASYNC', True):
+        transaction.on_commit(lambda: _submit(storage, name, on_ready))
+    else:
+        transaction.on_commit(lambda: generate(field, on_ready=on_ready))
+
+
+def url_for(field, size, ext='jpg'):
+    """The derivative's URL, or the original's while the derivatives aren't there yet."""
+    if not field:
+        return ''
+    if is_ready(field):
+        return field.storage.url(derivative_name(field.name, size, ext))
+    return field.url
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from accounts import analytics
+from accounts.models import ArtistProfile
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the artist daily analytics rows from bookings and reviews. Safe to re-run."
+
+    def add_arguments(self, parser):
+        parser.add_argument('artist_ids', nargs='*', type=int, help="Only these artists (default: all).")
+
+    def handle(self, *args, **options):
+        artist_ids = options['artist_ids'] or ArtistProfile.objects.order_by('pk').values_list('pk', flat=True).iterator()
+        artists = rows = 0
+        for artist_id in artist_ids:
+            rows += analytics.backfill_artist(artist_id)
+            artists += 1
+        self.stdout.write(f"Rebuilt {rows} daily rows for {artists} artists.")
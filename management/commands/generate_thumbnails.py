@@ -0,0 +1,75 @@
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+
+from accounts import images, profile_page
+from accounts.models import ArtistProfile, GroupMember, PortfolioItem
+
+
+class Command(BaseCommand):
+    help = "Renders missing thumbnail/WebP derivatives for profile, member and portfolio images. Safe to re-run."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Re-render derivatives that already exist.")
+        parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per CPU).")
+        parser.add_argument('--batch-size', type=int, default=50, help="Images read into memory at a time.")
+
+    def sources(self):
+        """(field, artist_id) for every stored image."""
+        for profile in ArtistProfile.objects.exclude(profile_photo='').exclude(profile_photo=None).only('pk', 'profile_photo').iterator():
+            yield profile.profile_photo, profile.pk
+        for member in GroupMember.objects.exclude(photo='').exclude(photo=None).only('pk', 'group_id', 'photo').iterator():
+            yield member.photo, member.group_id
+        items = PortfolioItem.objects.filter(file_type='IMAGE').exclude(file='').exclude(file=None)
+        for item in items.only('pk', 'artist_id', 'file').iterator():
+            yield item.file, item.artist_id
+
+    def handle(self, *args, **options):
+        rendered = failed = 0
+        artist_ids = set()
+        batch = []
+        pool = images.make_executor(options['workers'])
+
+        def flush():
+            nonlocal rendered, failed, pool
+            jobs = []
+            for field, artist_id in batch:
+                try:
+                    jobs.append((field, artist_id, pool.submit(images.render_derivatives, images.read_original(field))))
+                except OSError as exc:
+                    self.stderr.write(f"{field.name}: {exc}")
+                    failed += 1
+            broken = False
+            for field, artist_id, job in jobs:
+                try:
+                    images.store_derivatives(field.storage, field.name, job.result())
+                except BrokenProcessPool as exc:
+                    # A worker died; this batch's remaining jobs fail with it.
+                    self.stderr.write(f"{field.name}: {exc}")
+                    failed += 1
+                    broken = True
+                    continue
+                except Exception as exc:
+                    self.stderr.write(f"{field.name}: {exc}")
+                    failed += 1
+                    continue
+                rendered += 1
+                artist_ids.add(artist_id)
+            batch.clear()
+            if broken:
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = images.make_executor(options['workers'])
+
+        try:
+            for field, artist_id in self.sources():
+                if options['force'] or not images.is_ready(field):
+                    batch.append((field, artist_id))
+                if len(batch) >= options['batch_size']:
+                    flush()
+            flush()
+        finally:
+            pool.shutdown()
+
+        # Cached profile fragments still point at the originals.
+        profile_page.invalidate_artists(artist_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rendered derivatives for {rendered} images ({failed} failed)."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from accounts import ratings
+
+
+class Command(BaseCommand):
+    help = "Recomputes the denormalized rating statistics on artist profiles from their reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument('artist_ids', nargs='*', type=int, help="Only these artists (default: all).")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        changed = ratings.reconcile(options['artist_ids'] or None, batch_size=options['batch_size'])
+        self.stdout.write(f"Updated rating statistics for {changed} artists.")
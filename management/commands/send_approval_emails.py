@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts import emails
+
+
+class Command(BaseCommand):
+    help = "Sends queued artist approval emails in batches over a single mail connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--retries', type=int, default=3, help="Reconnect attempts per message on connection errors.")
+        parser.add_argument('--backoff', type=float, default=1.0, help="Initial backoff in seconds (doubles each retry).")
+        parser.add_argument('--loop', action='store_true', help="Keep polling for new emails.")
+        parser.add_argument('--interval', type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        while True:
+            while True:
+                sent, failed = emails.send_approval_emails(
+                    batch_size=options['batch_size'], retries=options['retries'], backoff=options['backoff'],
+                )
+                if sent or failed:
+                    self.stdout.write(f"Sent {sent} approval emails, {failed} failed.")
+                if sent < options['batch_size'] or failed:
+                    break
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,62 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from bookings import counters
+from .models import Conversation, Message
+from .realtime import group_name
+
+MAX_MESSAGE_LENGTH = 5000
+
+
+class ConversationConsumer(AsyncJsonWebsocketConsumer):
+    """
+    One socket per open conversation. Receives {"content": "..."} to send a
+    message and pushes {"type": "message", "message": {...}} for every new one.
+    """
+
+    async def connect(self):
+        self.conversation_id = self.scope['url_route']['kwargs']['conversation_id']
+        self.user = self.scope.get('user')
+        self.conversation = await self.get_conversation()
+        if self.conversation is None or not self.conversation.is_participant(self.user):
+            await self.close(code=4403)
+            return
+        self.group = group_name(self.conversation_id)
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group'):
+            await self.channel_layer.group_discard(self.group, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        text = (content.get('content') or '').strip()
+        if not text:
+            await self.send_json({'type': 'error', 'error': 'Message is empty.'})
+            return
+        if len(text) > MAX_MESSAGE_LENGTH:
+            await self.send_json({'type': 'error', 'error': 'Message is too long.'})
+            return
+        # The Message post_save receiver broadcasts it back to the group.
+        await self.create_message(text)
+
+    async def chat_message(self, event):
+        message = event['message']
+        if message['sender'] != self.user.pk:
+            # The reader has the thread open, so it is read as soon as it arrives.
+            await self.mark_read()
+        await self.send_json({'type': 'message', 'message': message})
+
+    @database_sync_to_async
+    def get_conversation(self):
+        return Conversation.objects.filter(pk=self.conversation_id).first()
+
+    @database_sync_to_async
+    def create_message(self, text):
+        return Message.objects.create(conversation=self.conversation, sender=self.user, content=text)
+
+    @database_sync_to_async
+    def mark_read(self):
+        cleared = self.conversation.mark_read(self.user.pk)
+        if cleared:
+            counters.adjust(self.user.pk, messages=-cleared)
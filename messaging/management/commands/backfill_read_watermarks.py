@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from bookings import counters
+from messaging.models import Conversation, Message
+
+
+class Command(BaseCommand):
+    help = (
+        "One-off data migration from the per-message Message.is_read flags to the "
+        "per-participant read watermarks and unread counts on Conversation."
+    )
+
+    def handle(self, *args, **options):
+        for side, other in (('artist', 'organizer'), ('organizer', 'artist')):
+            # Messages this side receives are the ones the other side sent.
+            received = Message.objects.filter(conversation=OuterRef('pk'), sender_id=OuterRef(f'{other}_id'))
+            unread = received.filter(is_read=False)
+            first_unread = unread.order_by().values('conversation').annotate(first=Min('pk')).values('first')
+            unread_count = unread.order_by().values('conversation').annotate(n=Count('pk')).values('n')
+            newest = Message.objects.filter(conversation=OuterRef('pk')).order_by().values('conversation').annotate(last=Max('pk')).values('last')
+            # Everything before the first unread message counts as read.
+            Conversation.objects.update(**{
+                f'{side}_unread_count': Coalesce(Subquery(unread_count), Value(0)),
+                f'{side}_last_read_id': Coalesce(Subquery(first_unread) - 1, Subquery(newest), Value(0)),
+            })
+        total = counters.reconcile_all()
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled read state for {Conversation.objects.count()} conversations; reconciled {total} counters."
+        ))
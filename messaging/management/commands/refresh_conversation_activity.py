@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, F, OuterRef, Subquery
+
+from messaging.models import Conversation, Message
+
+
+class Command(BaseCommand):
+    help = "Backfills Conversation.last_message / last_message_at from the message table."
+
+    def handle(self, *args, **options):
+        messages = Message.objects.filter(conversation=OuterRef('pk'))
+        latest = messages.order_by('-pk')
+        updated = Conversation.objects.filter(Exists(messages)).update(
+            last_message=Subquery(latest.values('pk')[:1]),
+            last_message_at=Subquery(latest.values('timestamp')[:1]),
+        )
+        Conversation.objects.filter(last_message__isnull=True).update(last_message_at=F('created_at'))
+        self.stdout.write(self.style.SUCCESS(f"Refreshed activity for {updated} conversations."))
@@ -1,17 +1,99 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.conf import settings
+from django.utils import timezone
 
 class Conversation(models.Model):
     artist = models.ForeignKey('accounts.ArtistProfile', on_delete=models.CASCADE, related_name='conversations')
     organizer = models.ForeignKey('accounts.OrganizerProfile', on_delete=models.CASCADE, related_name='conversations')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Denormalized on every new Message (see messaging/signals.py) so the inbox
+    # can sort by activity and show a preview without touching the message table.
+    last_message = models.ForeignKey('Message', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_message_at = models.DateTimeField(default=timezone.now)
+    # Per-participant read state: the id of the last message each side has seen
+    # and how many of the other side's messages arrived after it.
+    artist_last_read_id = models.BigIntegerField(default=0)
+    organizer_last_read_id = models.BigIntegerField(default=0)
+    artist_unread_count = models.PositiveIntegerField(default=0)
+    organizer_unread_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ('artist', 'organizer')
+        indexes = [
+            models.Index(fields=['artist', '-last_message_at'], name='conv_artist_activity_idx'),
+            models.Index(fields=['organizer', '-last_message_at'], name='conv_organizer_activity_idx'),
+        ]
+
+    def participant_ids(self):
+        # Both profile models use the user id as their primary key.
+        return {self.artist_id, self.organizer_id}
+
+    def is_participant(self, user):
+        """The access rule shared by the conversation page, its history API and the chat socket."""
+        return user.is_authenticated and user.pk in self.participant_ids()
+
+    def side_for(self, user_id):
+        """'artist' or 'organizer', depending on which participant user_id is."""
+        if user_id == self.artist_id:
+            return 'artist'
+        if user_id == self.organizer_id:
+            return 'organizer'
+        raise ValueError(f'User {user_id} is not part of conversation {self.pk}')
+
+    def unread_count_for(self, user_id):
+        return getattr(self, f'{self.side_for(user_id)}_unread_count')
+
+    def last_read_id_for(self, user_id):
+        return getattr(self, f'{self.side_for(user_id)}_last_read_id')
+
+    def mark_read(self, user_id):
+        """
+        Moves user_id's watermark to the latest message with a single-row write.
+        Returns how many messages went from unread to read.
+        """
+        side = self.side_for(user_id)
+        with transaction.atomic():
+            state = (
+                Conversation.objects.select_for_update()
+                .filter(pk=self.pk)
+                .values(f'{side}_unread_count', 'last_message_id')
+                .first()
+            )
+            if state is None:
+                return 0
+            cleared = state[f'{side}_unread_count']
+            last_message_id = state['last_message_id'] or 0
+            Conversation.objects.filter(pk=self.pk).update(**{
+                f'{side}_unread_count': 0,
+                f'{side}_last_read_id': Greatest(F(f'{side}_last_read_id'), last_message_id),
+            })
+        setattr(self, f'{side}_unread_count', 0)
+        setattr(self, f'{side}_last_read_id', max(getattr(self, f'{side}_last_read_id'), last_message_id))
+        return cleared
 
 class Message(models.Model):
     conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='messages')
     sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     content = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
-    is_read = models.BooleanField(default=False)
\ No newline at end of file
+    # Legacy per-message flag. Read state now lives on Conversation
+    # (*_last_read_id / *_unread_count); this is only kept for the backfill.
+    is_read = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Serves the newest-first history window, its "load older" cursor
+            # and the latest-message lookup in refresh_conversation_activity.
+            models.Index(fields=['conversation', 'id'], name='message_conv_id_idx'),
+        ]
+
+    def to_dict(self):
+        return {
+            'id': self.pk,
+            'conversation': self.conversation_id,
+            'sender': self.sender_id,
+            'content': self.content,
+            'timestamp': self.timestamp.isoformat(),
+        }
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""
+Live delivery of new messages over WebSockets.
+
+Channels is optional: without it (or without a configured channel layer)
+broadcast_message() is a no-op and the conversation page keeps working
+through plain form posts. For a single process with no external services:
+
+    CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+and route messaging.routing.websocket_urlpatterns in the project's asgi.py.
+"""
+try:
+    from asgiref.sync import async_to_sync
+    from channels.layers import get_channel_layer
+except ImportError:
+    get_channel_layer = None
+
+
+def group_name(conversation_id):
+    return f'conversation_{conversation_id}'
+
+
+def broadcast_message(message):
+    if get_channel_layer is None:
+        return
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    async_to_sync(layer.group_send)(group_name(message.conversation_id), {
+        'type': 'chat.message',
+        'message': message.to_dict(),
+    })
@@ -0,0 +1,7 @@
+from django.urls import path
+from . import consumers
+
+# Wrap with channels.auth.AuthMiddlewareStack in asgi.py so scope['user'] is set.
+websocket_urlpatterns = [
+    path('ws/messages/conversation/<int:conversation_id>/', consumers.ConversationConsumer.as_asgi()),
+]
@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from bookings import counters
+from .models import Conversation, Message
+from . import realtime
+
+
+@receiver(post_save, sender=Message)
+def record_conversation_activity(sender, instance, created, **kwargs):
+    """
+    Moves the conversation to the top of both inboxes with a fresh preview,
+    bumps the recipient's unread count and marks the message read for its sender.
+    """
+    if created:
+        sender_side = instance.conversation.side_for(instance.sender_id)
+        recipient_side = 'organizer' if sender_side == 'artist' else 'artist'
+        Conversation.objects.filter(pk=instance.conversation_id).update(**{
+            'last_message': instance,
+            'last_message_at': instance.timestamp,
+            f'{recipient_side}_unread_count': F(f'{recipient_side}_unread_count') + 1,
+            f'{sender_side}_last_read_id': instance.pk,
+        })
+        # Profiles use the user id as their primary key.
+        counters.adjust(getattr(instance.conversation, f'{recipient_side}_id'), messages=1)
+        # Push to anyone connected to the conversation's chat socket, whichever way it was sent.
+        transaction.on_commit(lambda: realtime.broadcast_message(instance))
@@ -1,3 +1,239 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import skipIf
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import OrganizerProfile, User
+from accounts.tests import make_artist, make_organizer
+from bookings import counters
+from core.query_plans import QueryPlanAssertionsMixin
+from core.querycount import QueryBudgetMixin
+
+from .models import Conversation, Message
+from .views import HISTORY_PAGE_SIZE, INBOX_PAGE_SIZE
+
+try:
+    from channels.routing import URLRouter
+    from channels.testing import WebsocketCommunicator
+
+    from .consumers import MAX_MESSAGE_LENGTH
+    from .routing import websocket_urlpatterns
+except ImportError:
+    WebsocketCommunicator = None
+
+
+class ConversationTestCase(TestCase):
+    """An artist and an organizer with one conversation of `message_count` alternating messages."""
+
+    message_count = 0
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artist = make_artist(1)
+        cls.organizer = make_organizer(1)
+        cls.conversation = Conversation.objects.create(artist=cls.artist, organizer=cls.organizer)
+        for n in range(cls.message_count):
+            sender = cls.organizer.user if n % 2 else cls.artist.user
+            Message.objects.create(conversation=cls.conversation, sender=sender, content=f'Message {n}')
+
+
+class ReadStateTests(ConversationTestCase):
+    """Unread counts and read watermarks on Conversation, and the backfill from Message.is_read."""
+
+    def setUp(self):
+        cache.clear()
+
+    def send(self, sender, count=1):
+        return [
+            Message.objects.create(conversation=self.conversation, sender=sender.user, content='Hi')
+            for _ in range(count)
+        ]
+
+    def refreshed(self):
+        return Conversation.objects.get(pk=self.conversation.pk)
+
+    def test_unread_count(self):
+        self.send(self.artist, 3)
+        self.send(self.organizer)
+        conversation = self.refreshed()
+        self.assertEqual(conversation.unread_count_for(self.organizer.pk), 3)
+        self.assertEqual(conversation.unread_count_for(self.artist.pk), 1)
+        self.assertEqual(counters.get_counts(self.organizer.pk)['messages'], 3)
+
+    def test_mark_read_moves_the_watermark(self):
+        latest = self.send(self.artist, 3)[-1]
+        conversation = self.refreshed()
+        self.assertEqual(conversation.mark_read(self.organizer.pk), 3)
+        self.assertEqual((conversation.organizer_unread_count, conversation.organizer_last_read_id), (0, latest.pk))
+        self.assertEqual(self.refreshed().last_read_id_for(self.organizer.pk), latest.pk)
+        self.assertEqual(conversation.mark_read(self.organizer.pk), 0)
+        # The watermark only moves forward.
+        Conversation.objects.filter(pk=self.conversation.pk).update(organizer_last_read_id=latest.pk + 10)
+        self.refreshed().mark_read(self.organizer.pk)
+        self.assertEqual(self.refreshed().organizer_last_read_id, latest.pk + 10)
+
+    def test_opening_the_conversation_marks_it_read(self):
+        self.send(self.artist, 2)
+        self.assertEqual(counters.get_counts(self.organizer.pk)['messages'], 2)
+        self.client.force_login(self.organizer.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('conversation', args=[self.conversation.pk]))
+        self.assertEqual(self.refreshed().unread_count_for(self.organizer.pk), 0)
+        self.assertEqual(counters.get_counts(self.organizer.pk)['messages'], 0)
+
+    def test_backfill_converts_is_read_flags(self):
+        read, first_unread, _ = self.send(self.artist, 3)
+        reply = self.send(self.organizer)[0]
+        Message.objects.filter(pk__in=[read.pk, reply.pk]).update(is_read=True)
+        # As the rows looked before the watermarks existed.
+        Conversation.objects.update(
+            artist_last_read_id=0, organizer_last_read_id=0, artist_unread_count=0, organizer_unread_count=0,
+        )
+        call_command('backfill_read_watermarks', stdout=StringIO())
+        conversation = self.refreshed()
+        self.assertEqual(conversation.organizer_unread_count, 2)
+        self.assertTrue(read.pk <= conversation.organizer_last_read_id < first_unread.pk)
+        self.assertEqual((conversation.artist_unread_count, conversation.artist_last_read_id), (0, reply.pk))
+        self.assertEqual(counters.get_counts(self.organizer.pk)['messages'], 2)
+
+
+class HotQueryPlanTests(QueryPlanAssertionsMixin, ConversationTestCase):
+    """Inbox and conversation queries must stay index-backed."""
+
+    message_count = 5
+
+    def test_inbox(self):
+        for user in (self.artist.user, self.organizer.user):
+            self.client.force_login(user)
+            with self.subTest(role=user.role), self.assertNoFullScans():
+                self.client.get(reverse('inbox'))
+
+    def test_conversation_and_history(self):
+        self.client.force_login(self.organizer.user)
+        with self.assertNoFullScans():
+            self.client.get(reverse('conversation', args=[self.conversation.pk]))
+        with self.assertNoFullScans():
+            self.client.get(reverse('conversation_history', args=[self.conversation.pk]))
+
+
+class QueryBudgetTests(QueryBudgetMixin, ConversationTestCase):
+    query_budgets = {'conversation_history': 4}
+
+    message_count = 10
+
+    def test_conversation_history(self):
+        self.client.force_login(self.organizer.user)
+        response = self.assertWithinBudget('conversation_history', args=[self.conversation.pk])
+        self.assertEqual(len(response.json()['messages']), 10)
+
+
+class HistoryPaginationTests(ConversationTestCase):
+    """"Load older" must neither skip nor repeat messages, even when timestamps tie."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Message.objects.bulk_create(
+            Message(conversation=cls.conversation, sender=cls.organizer.user, content=f'Message {n}')
+            for n in range(HISTORY_PAGE_SIZE + 5)
+        )
+        # All within one millisecond, a few of them on the exact same microsecond.
+        sent_at = timezone.now().replace(microsecond=250000)
+        for n, message in enumerate(Message.objects.order_by('pk')):
+            Message.objects.filter(pk=message.pk).update(timestamp=sent_at + timedelta(microseconds=n // 3))
+
+    def test_pages_cover_every_message_once(self):
+        self.client.force_login(self.organizer.user)
+        url = reverse('conversation_history', args=[self.conversation.pk])
+        first = self.client.get(url).json()
+        older = self.client.get(url, {'cursor': first['older_cursor']}).json()
+        self.assertIsNone(older['older_cursor'])
+        seen = [message['id'] for message in older['messages'] + first['messages']]
+        self.assertEqual(seen, list(self.conversation.messages.order_by('pk').values_list('pk', flat=True)))
+
+
+class InboxPaginationTests(TestCase):
+    """The inbox cursor keeps last_message_at exact, so ties at a page boundary aren't dropped."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artist = make_artist(1)
+        users = User.objects.bulk_create(
+            User(email=f'organizer{n}@example.com', role='ORGANIZER') for n in range(INBOX_PAGE_SIZE + 5)
+        )
+        organizers = OrganizerProfile.objects.bulk_create(
+            OrganizerProfile(user=user, full_name=f'Organizer {n}', organization_name='Org', phone='0')
+            for n, user in enumerate(users)
+        )
+        active_at = timezone.now().replace(microsecond=500000)
+        Conversation.objects.bulk_create(
+            Conversation(artist=cls.artist, organizer=organizer, last_message_at=active_at + timedelta(microseconds=n // 3))
+            for n, organizer in enumerate(organizers)
+        )
+
+    def test_pages_cover_every_conversation_once(self):
+        self.client.force_login(self.artist.user)
+        first = self.client.get(reverse('inbox'))
+        second = self.client.get(reverse('inbox'), {'cursor': first.context['next_cursor']})
+        self.assertIsNone(second.context['next_cursor'])
+        seen = [row['conversation'].pk for row in first.context['conversations_with_status'] + second.context['conversations_with_status']]
+        self.assertEqual(sorted(seen), sorted(Conversation.objects.values_list('pk', flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+
+@skipIf(WebsocketCommunicator is None, "channels is not installed.")
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class ConversationConsumerTests(TransactionTestCase):
+    """The socket admits only participants and turns valid frames into broadcast messages."""
+
+    def setUp(self):
+        self.artist = make_artist(1)
+        self.organizer = make_organizer(1)
+        self.conversation = Conversation.objects.create(artist=self.artist, organizer=self.organizer)
+
+    def communicator(self, user):
+        communicator = WebsocketCommunicator(
+            URLRouter(websocket_urlpatterns), f'/ws/messages/conversation/{self.conversation.pk}/'
+        )
+        communicator.scope['user'] = user
+        return communicator
+
+    async def test_non_participant_is_rejected(self):
+        outsider = await User.objects.acreate(email='outsider@example.com', role='ORGANIZER')
+        communicator = self.communicator(outsider)
+        connected, code = await communicator.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4403)
+
+    async def test_message_is_created_and_broadcast(self):
+        sender = self.communicator(self.artist.user)
+        reader = self.communicator(self.organizer.user)
+        self.assertTrue((await sender.connect())[0])
+        self.assertTrue((await reader.connect())[0])
+
+        await sender.send_json_to({'content': '  Are you free on the 12th?  '})
+        frame = await reader.receive_json_from()
+        self.assertEqual(frame['type'], 'message')
+        self.assertEqual(frame['message']['content'], 'Are you free on the 12th?')
+        self.assertEqual(frame['message']['sender'], self.artist.user.pk)
+        self.assertEqual((await sender.receive_json_from())['message']['id'], frame['message']['id'])
+        self.assertEqual(await Message.objects.filter(conversation=self.conversation).acount(), 1)
+
+        await sender.disconnect()
+        await reader.disconnect()
+
+    async def test_invalid_content_gets_an_error_frame(self):
+        communicator = self.communicator(self.organizer.user)
+        await communicator.connect()
+        for content in ('   ', 'x' * (MAX_MESSAGE_LENGTH + 1)):
+            with self.subTest(length=len(content)):
+                await communicator.send_json_to({'content': content})
+                self.assertEqual((await communicator.receive_json_from())['type'], 'error')
+        self.assertTrue(await communicator.receive_nothing())
+        self.assertEqual(await Message.objects.acount(), 0)
+        await communicator.disconnect()
@@ -4,5 +4,6 @@ from . import views
 urlpatterns = [
     path('', views.inbox_view, name='inbox'),
     path('conversation/<int:conversation_id>/', views.conversation_view, name='conversation'),
+    path('conversation/<int:conversation_id>/history/', views.conversation_history_view, name='conversation_history'),
     path('start/<int:artist_id>/', views.start_conversation_view, name='start_conversation'),
 ]
\ No newline at end of file
@@ -1,37 +1,66 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q
 from .models import Conversation, Message
 from accounts.models import ArtistProfile
+from accounts.pagination import KeysetPaginator, InvalidCursor
+from bookings import counters
+
+INBOX_PAGE_SIZE = 30
+HISTORY_PAGE_SIZE = 50
+
+
+def _history_page(conversation, cursor=None):
+    """
+    One window of a conversation's history, newest first, plus the cursor for
+    the next older window. Ids grow with send time, so the pk alone orders the
+    history exactly (timestamps can tie); uses the (conversation, id) index.
+    """
+    paginator = KeysetPaginator(
+        conversation.messages.all(), ['-pk'],
+        page_size=HISTORY_PAGE_SIZE, salt=f'conversation-history:{conversation.pk}',
+    )
+    try:
+        return paginator.page(cursor)
+    except InvalidCursor:
+        return paginator.page()
 
 @login_required
 def inbox_view(request):
-    # Get all conversations the user is a part of
+    # One query: the user's conversations by latest activity, with both profiles
+    # and the last-message preview joined in. Unread counts are stored per participant.
     conversations_qs = Conversation.objects.filter(
-        Q(artist__user=request.user) | Q(organizer__user=request.user)
-    ).order_by('-created_at')
+        Q(artist_id=request.user.pk) | Q(organizer_id=request.user.pk)
+    ).select_related('artist', 'organizer', 'last_message')
 
-    # Create a new list to hold conversation data + unread status
-    conversations_with_status = []
-    for conv in conversations_qs:
-        unread_count = conv.messages.filter(is_read=False).exclude(sender=request.user).count()
-        conversations_with_status.append({
-            'conversation': conv,
-            'has_unread': unread_count > 0
-        })
+    paginator = KeysetPaginator(conversations_qs, ['-last_message_at', '-pk'], page_size=INBOX_PAGE_SIZE, salt='inbox')
+    try:
+        page = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        page = paginator.page()
 
-    return render(request, 'messaging/inbox.html', {'conversations_with_status': conversations_with_status})
+    conversations_with_status = []
+    for conv in page:
+        unread_count = conv.unread_count_for(request.user.pk)
+        conversations_with_status.append({'conversation': conv, 'has_unread': unread_count > 0, 'unread_count': unread_count})
+    return render(request, 'messaging/inbox.html', {
+        'conversations_with_status': conversations_with_status,
+        'next_cursor': page.next_cursor,
+    })
 
 @login_required
 def conversation_view(request, conversation_id):
     conversation = get_object_or_404(Conversation, pk=conversation_id)
     # Security check...
-    if request.user != conversation.artist.user and request.user != conversation.organizer.user:
+    if not conversation.is_participant(request.user):
         return redirect('inbox')
 
-    # --- ADD THIS LINE TO MARK MESSAGES AS READ ---
-    # Mark messages sent by the OTHER person in this conversation as read
-    conversation.messages.filter(is_read=False).exclude(sender=request.user).update(is_read=True)
+    # Mark messages sent by the OTHER person in this conversation as read by
+    # moving this user's read watermark (one row, however long the thread is).
+    marked_read = conversation.mark_read(request.user.pk)
+    if marked_read:
+        counters.adjust(request.user.pk, messages=-marked_read)
 
 
     if request.method == 'POST':
@@ -39,9 +68,28 @@ def conversation_view(request, conversation_id):
         if content:
             Message.objects.create(conversation=conversation, sender=request.user, content=content)
         return redirect('conversation', conversation_id=conversation_id)
-        
-    messages = conversation.messages.all().order_by('timestamp')
-    return render(request, 'messaging/conversation.html', {'conversation': conversation, 'messages': messages})
+
+    # Only the latest window is rendered; older messages come from conversation_history_view.
+    page = _history_page(conversation)
+    messages = list(reversed(page.items))
+    return render(request, 'messaging/conversation.html', {
+        'conversation': conversation,
+        'messages': messages,
+        'older_cursor': page.next_cursor,
+    })
+
+@login_required
+def conversation_history_view(request, conversation_id):
+    """JSON "load older" endpoint: the window of messages before ?cursor=."""
+    conversation = get_object_or_404(Conversation, pk=conversation_id)
+    if not conversation.is_participant(request.user):
+        return JsonResponse({'error': 'Not a participant in this conversation.'}, status=403)
+
+    page = _history_page(conversation, request.GET.get('cursor'))
+    return JsonResponse({
+        'messages': [message.to_dict() for message in reversed(page.items)],
+        'older_cursor': page.next_cursor,
+    })
 
 @login_required
 def start_conversation_view(request, artist_id):
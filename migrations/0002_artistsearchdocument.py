@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def install_search_backend(apps, schema_editor):
+    # Creates the vendor-specific full-text structures (FTS5 table, tsvector column).
+    from accounts.search import get_backend
+    get_backend(schema_editor.connection).install(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtistSearchDocument',
+            fields=[
+                ('artist', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='accounts.artistprofile')),
+                ('display_name', models.CharField(max_length=255)),
+                ('category_key', models.CharField(max_length=100)),
+                ('location_key', models.CharField(max_length=100)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['category_key', 'location_key'], name='search_doc_cat_loc_idx'), models.Index(fields=['location_key'], name='search_doc_loc_idx')],
+            },
+        ),
+        migrations.RunPython(install_search_backend, migrations.RunPython.noop),
+    ]
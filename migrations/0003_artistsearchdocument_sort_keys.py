@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:40
+
+from django.db import migrations, models
+
+
+def copy_sort_keys(apps, schema_editor):
+    ArtistSearchDocument = apps.get_model('accounts', 'ArtistSearchDocument')
+    documents = ArtistSearchDocument.objects.select_related('artist')
+    for doc in documents.iterator(chunk_size=500):
+        artist = doc.artist
+        name = artist.group_name if artist.is_group and artist.group_name else artist.contact_name
+        doc.sort_name = name.strip().lower()
+        doc.price = artist.pricing_per_event
+        doc.save(update_fields=['sort_name', 'price'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_artistsearchdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artistsearchdocument',
+            name='price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='artistsearchdocument',
+            name='sort_name',
+            field=models.CharField(default='', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='artistsearchdocument',
+            index=models.Index(fields=['price', 'artist'], name='search_doc_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='artistsearchdocument',
+            index=models.Index(fields=['sort_name', 'artist'], name='search_doc_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='artistsearchdocument',
+            index=models.Index(fields=['category_key', 'price', 'artist'], name='search_doc_cat_price_idx'),
+        ),
+        migrations.RunPython(copy_sort_keys, migrations.RunPython.noop),
+    ]
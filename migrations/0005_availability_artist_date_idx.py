@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 00:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_artistapprovalemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='availability',
+            index=models.Index(fields=['artist', 'date'], name='availability_artist_date_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 00:27
+
+from django.db import migrations, models
+
+
+def copy_start_to_end(apps, schema_editor):
+    # Existing rows are single blocked days.
+    Availability = apps.get_model('accounts', 'Availability')
+    Availability.objects.update(end_date=models.F('date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_availability_artist_date_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='availability',
+            name='end_date',
+            field=models.DateField(help_text='Last blocked day (inclusive); equal to date for a single day.', null=True),
+        ),
+        migrations.RunPython(copy_start_to_end, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='availability',
+            name='end_date',
+            field=models.DateField(help_text='Last blocked day (inclusive); equal to date for a single day.'),
+        ),
+        migrations.AlterField(
+            model_name='availability',
+            name='date',
+            field=models.DateField(help_text='First blocked day.'),
+        ),
+        migrations.AddIndex(
+            model_name='availability',
+            index=models.Index(fields=['artist', 'end_date'], name='availability_artist_end_idx'),
+        ),
+    ]
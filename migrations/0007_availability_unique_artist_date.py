@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:12
+
+from django.db import migrations, models
+
+
+def merge_duplicate_starts(apps, schema_editor):
+    # Concurrent accepts could insert the same day twice. Keep the longest
+    # period for each (artist, date) and drop the rest.
+    Availability = apps.get_model('accounts', 'Availability')
+    duplicates = (
+        Availability.objects.values('artist_id', 'date')
+        .annotate(rows=models.Count('id'))
+        .filter(rows__gt=1)
+    )
+    for group in duplicates:
+        rows = list(Availability.objects.filter(artist_id=group['artist_id'], date=group['date']).order_by('-end_date', 'pk'))
+        keep = rows[0]
+        if any(row.is_booked for row in rows) and not keep.is_booked:
+            keep.is_booked = True
+            keep.save(update_fields=['is_booked'])
+        Availability.objects.filter(pk__in=[row.pk for row in rows[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_availability_end_date'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_starts, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='availability',
+            name='availability_artist_date_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='availability',
+            constraint=models.UniqueConstraint(fields=('artist', 'date'), name='unique_availability_artist_date'),
+        ),
+    ]
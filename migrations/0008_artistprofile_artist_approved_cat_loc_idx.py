@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_availability_unique_artist_date'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='artistprofile',
+            index=models.Index(fields=['is_approved', 'category', 'location'], name='artist_approved_cat_loc_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 00:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_artistprofile_artist_approved_cat_loc_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtistDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('accepted', models.PositiveIntegerField(default=0)),
+                ('declined', models.PositiveIntegerField(default=0)),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('response_seconds', models.BigIntegerField(default=0)),
+                ('earnings', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('reviews', models.PositiveIntegerField(default=0)),
+                ('rating_total', models.PositiveIntegerField(default=0)),
+                ('artist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='accounts.artistprofile')),
+            ],
+            options={
+                'verbose_name_plural': 'Artist daily stats',
+                'constraints': [models.UniqueConstraint(fields=('artist', 'day'), name='unique_artist_daily_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 5.2.6 on 2026-10-18 00:40
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def fill_rating_stats(apps, schema_editor):
+    # What ratings.reconcile() does, against the historical models. The
+    # reviews app has no migrations, so its table is read directly.
+    connection = schema_editor.connection
+    if 'reviews_review' not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT artist_id, rating, COUNT(*) FROM reviews_review GROUP BY artist_id, rating')
+        rows = cursor.fetchall()
+    stars_by_artist = defaultdict(dict)
+    for artist_id, rating, count in rows:
+        stars_by_artist[artist_id][rating] = count
+
+    ArtistProfile = apps.get_model('accounts', 'ArtistProfile')
+    ArtistSearchDocument = apps.get_model('accounts', 'ArtistSearchDocument')
+    fields = ['rating_count', 'rating_sum', 'rating_average', *(f'rating_{stars}_count' for stars in range(1, 6))]
+    profiles = []
+    for profile in ArtistProfile.objects.filter(pk__in=list(stars_by_artist)).only('pk', *fields).iterator(chunk_size=500):
+        counts = stars_by_artist[profile.pk]
+        profile.rating_count = sum(counts.values())
+        profile.rating_sum = sum(rating * count for rating, count in counts.items())
+        profile.rating_average = profile.rating_sum / profile.rating_count
+        for stars in range(1, 6):
+            setattr(profile, f'rating_{stars}_count', counts.get(stars, 0))
+        profiles.append(profile)
+    ArtistProfile.objects.bulk_update(profiles, fields, batch_size=500)
+
+    source = ArtistProfile.objects.filter(pk=models.OuterRef('artist_id'))
+    ArtistSearchDocument.objects.filter(artist_id__in=[profile.pk for profile in profiles]).update(
+        rating=models.Subquery(source.values('rating_average')[:1]),
+        rating_count=models.Subquery(source.values('rating_count')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_artistdailystats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artistprofile',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artistprofile',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artistprofile',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artistprofile',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artistprofile',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artistprofile',
+            name='rating_average',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artistprofile',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artistprofile',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artistsearchdocument',
+            name='rating',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artistsearchdocument',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='artistprofile',
+            index=models.Index(fields=['is_approved', 'rating_average', 'rating_count'], name='artist_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='artistsearchdocument',
+            index=models.Index(fields=['rating', 'rating_count', 'artist'], name='search_doc_rating_idx'),
+        ),
+        migrations.RunPython(fill_rating_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:05
+
+from django.db import migrations
+
+
+def fill_search_documents(apps, schema_editor):
+    # Browse and search read only ArtistSearchDocument, so existing approved
+    # artists need their documents before the new views serve traffic. This
+    # reuses search.rebuild_index(), which works on the current models, so it
+    # runs once every column it writes exists (after 0010), not in 0002.
+    from accounts import search
+    search.rebuild_index()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_artist_rating_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+    ]
@@ -50,6 +50,29 @@ class ArtistProfile(models.Model):
     profile_photo = models.ImageField(upload_to='profile_photos/', blank=True, null=True, help_text="Main photo for an individual or a group logo.")
     government_id = models.FileField(upload_to='gov_ids/')
     is_approved = models.BooleanField(default=False)
+    # Review statistics, maintained by accounts/ratings.py as reviews are written.
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_average = models.FloatField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_approved', 'category', 'location'], name='artist_approved_cat_loc_idx'),
+            models.Index(fields=['is_approved', 'rating_average', 'rating_count'], name='artist_rating_idx'),
+        ]
+
+    @property
+    def rating_histogram(self):
+        """[(stars, count, percent)] from 5 stars down, for the star summary."""
+        return [
+            (stars, count, round(100 * count / self.rating_count) if self.rating_count else 0)
+            for stars, count in ((stars, getattr(self, f'rating_{stars}_count')) for stars in range(5, 0, -1))
+        ]
 
     def calculate_completion_percentage(self):
         total_fields = 7
@@ -89,7 +112,8 @@ class OrganizerProfile(models.Model):
     phone = models.CharField(max_length=20)
 
     def get_favorite_artists(self):
-        return [favorite.artist for favorite in self.favorites.all()]
+        # Membership checks should use accounts.favorites.favorite_ids() instead.
+        return [favorite.artist for favorite in self.user.favorites.select_related('artist')]
 
     def calculate_completion_percentage(self):
         total_fields = 3
@@ -115,11 +139,107 @@ class PortfolioItem(models.Model):
         return f"{self.title} for {self.artist}"
 
 class Availability(models.Model):
+    """
+    A blocked period: every day from `date` to `end_date` (inclusive). An artist's
+    periods never overlap, and touch only where a booked period meets a manual
+    one - accounts/availability.py merges periods of the same kind on insert.
+    """
     artist = models.ForeignKey(ArtistProfile, on_delete=models.CASCADE, related_name='availability')
-    date = models.DateField()
+    date = models.DateField(help_text="First blocked day.")
+    end_date = models.DateField(help_text="Last blocked day (inclusive); equal to date for a single day.")
     is_booked = models.BooleanField(default=False)
     class Meta:
         verbose_name_plural = 'Availabilities'
+        constraints = [
+            # Periods are disjoint, so no two can start on the same day. The
+            # unique index also serves the (artist, date) seeks.
+            models.UniqueConstraint(fields=['artist', 'date'], name='unique_availability_artist_date'),
+        ]
+        indexes = [
+            models.Index(fields=['artist', 'end_date'], name='availability_artist_end_idx'),
+        ]
     def __str__(self):
+        if self.end_date and self.end_date != self.date:
+            return f"{self.artist} - {self.date} to {self.end_date}"
         return f"{self.artist} - {self.date}"
 
+
+class ArtistSearchDocument(models.Model):
+    """
+    Denormalized search copy of an approved artist, kept in sync by the
+    signals in accounts/signals.py. Only approved artists have a document,
+    so browse and search never touch the raw profile table.
+    """
+    artist = models.OneToOneField(ArtistProfile, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    display_name = models.CharField(max_length=255)
+    category_key = models.CharField(max_length=100)
+    location_key = models.CharField(max_length=100)
+    body = models.TextField(blank=True)
+    # Browse sort keys, copied from the profile so keyset pagination stays on this table.
+    sort_name = models.CharField(max_length=255, default='')
+    price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    rating = models.FloatField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['category_key', 'location_key'], name='search_doc_cat_loc_idx'),
+            models.Index(fields=['location_key'], name='search_doc_loc_idx'),
+            models.Index(fields=['price', 'artist'], name='search_doc_price_idx'),
+            models.Index(fields=['sort_name', 'artist'], name='search_doc_name_idx'),
+            models.Index(fields=['category_key', 'price', 'artist'], name='search_doc_cat_price_idx'),
+            models.Index(fields=['rating', 'rating_count', 'artist'], name='search_doc_rating_idx'),
+        ]
+
+    def __str__(self):
+        return self.display_name
+
+class ArtistApprovalEmail(models.Model):
+    """
+    An approval email waiting to be sent. The admin approve action only queues
+    these; accounts/emails.py sends them in batches over one SMTP connection.
+    """
+    artist = models.ForeignKey(ArtistProfile, on_delete=models.CASCADE, related_name='approval_emails')
+    login_url = models.CharField(max_length=500)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'], name='approval_email_pending_idx', condition=models.Q(sent_at__isnull=True)),
+        ]
+
+    def __str__(self):
+        return f"Approval email for {self.artist}"
+
+
+class ArtistDailyStats(models.Model):
+    """
+    One artist's booking and review activity for one day, kept up to date by
+    accounts/analytics.py as bookings and reviews are written. Dashboards read
+    a fixed window of these rows instead of scanning the artist's history;
+    `manage.py backfill_artist_stats` rebuilds them from the source tables.
+    """
+    artist = models.ForeignKey(ArtistProfile, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    requests = models.PositiveIntegerField(default=0)
+    accepted = models.PositiveIntegerField(default=0)
+    declined = models.PositiveIntegerField(default=0)
+    # Sum of request -> answer times for the `responses` answered by the artist that day.
+    responses = models.PositiveIntegerField(default=0)
+    response_seconds = models.BigIntegerField(default=0)
+    earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    reviews = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'Artist daily stats'
+        constraints = [
+            models.UniqueConstraint(fields=['artist', 'day'], name='unique_artist_daily_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.artist} - {self.day}"
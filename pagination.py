@@ -0,0 +1,114 @@
+# accounts/pagination.py
+"""
+Keyset (cursor) pagination.
+
+Instead of OFFSET, each page remembers the sort key of its last row and the
+next page asks for rows strictly "after" it, so page N costs the same as
+page 1 as long as the ordering is backed by an index. The ordering must end
+in a unique column (usually the pk) to be stable.
+
+Cursor tokens are signed, so clients can't forge arbitrary filter values.
+Datetimes keep their full microseconds: rows sharing a truncated timestamp
+would otherwise be skipped or repeated at a page boundary.
+"""
+import json
+from datetime import datetime
+
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder rounds datetimes to milliseconds; cursors need them exact."""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return {'datetime': o.isoformat()}
+        return super().default(o)
+
+
+def _decode_value(obj):
+    if obj.keys() == {'datetime'}:
+        return datetime.fromisoformat(obj['datetime'])
+    return obj
+
+
+def encode_cursor(values, salt):
+    payload = json.dumps(list(values), cls=CursorEncoder, separators=(',', ':'))
+    return signing.dumps(payload, salt=salt, compress=True)
+
+
+def decode_cursor(token, salt):
+    try:
+        return json.loads(signing.loads(token, salt=salt), object_hook=_decode_value)
+    except (signing.BadSignature, ValueError, TypeError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+class KeysetPaginator:
+    """
+    Paginates `queryset` by `ordering`, e.g. ['-price', 'pk'].
+    Sort columns must be non-null.
+    """
+
+    def __init__(self, queryset, ordering, page_size=24, salt='keyset'):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.page_size = page_size
+        self.salt = salt
+
+    def _fields(self):
+        return [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    def _after(self, values):
+        # (a, b, c) > (va, vb, vc) spelled out so each column can have its own direction.
+        condition = Q()
+        equal_so_far = Q()
+        for (field, descending), value in zip(self._fields(), values):
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal_so_far & Q(**{f'{field}__{lookup}': value})
+            equal_so_far &= Q(**{field: value})
+        return condition
+
+    def page(self, cursor=None):
+        queryset = self.queryset.order_by(*self.ordering)
+        if cursor:
+            values = decode_cursor(cursor, self.salt)
+            if len(values) != len(self.ordering):
+                raise InvalidCursor('Cursor does not match the current ordering.')
+            queryset = queryset.filter(self._after(values))
+        # One extra row tells us whether there is a next page without a COUNT.
+        rows = list(queryset[:self.page_size + 1])
+        items = rows[:self.page_size]
+        next_cursor = None
+        if len(rows) > self.page_size:
+            last = items[-1]
+            next_cursor = encode_cursor([self._value(last, field) for field, _ in self._fields()], self.salt)
+        return KeysetPage(items, next_cursor)
+
+    @staticmethod
+    def _value(obj, field):
+        for part in field.split('__'):
+            obj = getattr(obj, 'pk' if part == 'pk' else part)
+        return obj
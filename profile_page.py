@@ -0,0 +1,94 @@
+# accounts/profile_page.py
+"""
+Public artist profile page: one loader, a fixed number of queries.
+
+load_profile() fetches the profile (with its user) in one query. Its
+portfolio, group members and reviews - with each reviewer's organizer
+profile - are prefetched together, one query per relation, and only when
+a public fragment has to be rendered.
+
+Those fragments are cached under the artist's version token, so a render
+from cache reads nothing but the profile. The token is replaced whenever
+the profile, its portfolio, its members or its reviews change (see
+accounts/signals.py; accounts/ratings.py does it for its bulk updates),
+which orphans every fragment cached under the old one.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, cache, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.shortcuts import get_object_or_404
+
+from reviews.models import Review
+
+from .models import ArtistProfile
+
+FRAGMENT_TIMEOUT = getattr(settings, 'PROFILE_FRAGMENT_TIMEOUT', 60 * 60)
+
+PREFETCHES = (
+    'portfolio',
+    'members',
+    Prefetch(
+        'user__reviews_received',
+        queryset=Review.objects.select_related('organizer__organizerprofile').order_by('-created_at'),
+    ),
+)
+
+
+def _version_key(artist_id):
+    return f'artist_profile:version:{artist_id}'
+
+
+def version(artist_id):
+    """The artist's current fragment version token."""
+    key = _version_key(artist_id)
+    token = cache.get(key)
+    if token is None:
+        cache.add(key, time.time_ns(), None)
+        token = cache.get(key)
+    return token
+
+
+def invalidate_artists(artist_ids):
+    # A fresh token rather than incr(): an evicted counter restarting at an old
+    # value would bring stale fragments back.
+    keys = [_version_key(artist_id) for artist_id in set(artist_ids)]
+    transaction.on_commit(lambda: cache.set_many({key: time.time_ns() for key in keys}, None))
+
+
+def invalidate_artist(artist_id):
+    invalidate_artists([artist_id])
+
+
+def _fragment_cache():
+    # The {% cache %} tag prefers a 'template_fragments' cache when one is configured.
+    try:
+        return caches['template_fragments']
+    except InvalidCacheBackendError:
+        return cache
+
+
+def fragment_names(artist, for_organizer):
+    """The cached fragments the page renders for this viewer."""
+    names = ['artist_profile_header', 'artist_profile_about', 'artist_profile_reviews']
+    if for_organizer:
+        names.append('artist_profile_portfolio')
+    if artist.is_group:
+        names.append('artist_profile_members')
+    return names
+
+
+def load_profile(artist_id, for_organizer=False):
+    """
+    The approved profile and its fragment version. Related rows are only
+    prefetched when one of the viewer's fragments is missing from the cache.
+    """
+    artist = get_object_or_404(ArtistProfile.objects.select_related('user'), pk=artist_id, is_approved=True)
+    token = version(artist.pk)
+    keys = [make_template_fragment_key(name, [artist.pk, token]) for name in fragment_names(artist, for_organizer)]
+    if len(_fragment_cache().get_many(keys)) < len(keys):
+        prefetch_related_objects([artist], *PREFETCHES)
+    return artist, token
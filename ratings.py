@@ -0,0 +1,97 @@
+# accounts/ratings.py
+"""
+Denormalized review statistics on ArtistProfile.
+
+Each review adds to (or, when deleted, subtracts from) the artist's
+rating_count, rating_sum, rating_average and the per-star counter in one
+UPDATE, and copies the new average onto the artist's search document so
+browse can sort by it. Pages read the numbers straight off the profile: no
+per-request aggregation over Review.
+
+`manage.py reconcile_artist_ratings` recomputes everything from the Review
+table (one grouped query) to repair drift or fill the columns the first time.
+"""
+from django.db.models import Case, Count, F, FloatField, OuterRef, PositiveIntegerField, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Greatest
+
+from reviews.models import Review
+
+from .models import ArtistProfile, ArtistSearchDocument
+from . import profile_page
+
+STARS = range(1, 6)
+
+
+def _sync_search_document(artist_ids):
+    profile = ArtistProfile.objects.filter(pk=OuterRef('artist_id'))
+    ArtistSearchDocument.objects.filter(artist_id__in=artist_ids).update(
+        rating=Subquery(profile.values('rating_average')[:1]),
+        rating_count=Subquery(profile.values('rating_count')[:1]),
+    )
+
+
+def _shift(field, delta):
+    if delta > 0:
+        return F(field) + delta
+    # Never below zero, e.g. deleting a review from before the counters were filled.
+    return Greatest(F(field) + delta, 0, output_field=PositiveIntegerField())
+
+
+def apply_review(artist_id, rating, sign=1):
+    """Adds (sign=1) or removes (sign=-1) one review's rating."""
+    count_after = _shift('rating_count', sign)
+    sum_after = _shift('rating_sum', sign * rating)
+    ArtistProfile.objects.filter(pk=artist_id).update(
+        rating_count=count_after,
+        rating_sum=sum_after,
+        rating_average=Case(
+            # Right-hand sides see the old values: this is "no reviews left".
+            When(rating_count__lte=-sign, then=Value(0.0)),
+            default=Cast(sum_after, FloatField()) / Cast(count_after, FloatField()),
+            output_field=FloatField(),
+        ),
+        **{f'rating_{rating}_count': _shift(f'rating_{rating}_count', sign)},
+    )
+    _sync_search_document([artist_id])
+
+
+def compute_stats(artist_ids=None):
+    """{artist_id: field values} straight from the Review table."""
+    reviews = Review.objects.all()
+    if artist_ids is not None:
+        reviews = reviews.filter(artist_id__in=artist_ids)
+    rows = reviews.values('artist_id').annotate(
+        rating_count=Count('pk'),
+        rating_sum=Sum('rating'),
+        **{f'rating_{stars}_count': Count('pk', filter=Q(rating=stars)) for stars in STARS},
+    )
+    stats = {}
+    for row in rows:
+        artist_id = row.pop('artist_id')
+        row['rating_average'] = row['rating_sum'] / row['rating_count']
+        stats[artist_id] = row
+    return stats
+
+
+def reconcile(artist_ids=None, batch_size=500):
+    """Rewrites the stored statistics. Returns the number of profiles changed."""
+    stats = compute_stats(artist_ids)
+    empty = {'rating_count': 0, 'rating_sum': 0, 'rating_average': 0.0, **{f'rating_{stars}_count': 0 for stars in STARS}}
+    fields = list(empty)
+    profiles = ArtistProfile.objects.only('pk', *fields).order_by('pk')
+    if artist_ids is not None:
+        profiles = profiles.filter(pk__in=artist_ids)
+    changed = []
+    for profile in profiles.iterator(chunk_size=batch_size):
+        values = stats.get(profile.pk, empty)
+        if any(getattr(profile, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(profile, field, value)
+            changed.append(profile)
+    for start in range(0, len(changed), batch_size):
+        chunk = changed[start:start + batch_size]
+        ArtistProfile.objects.bulk_update(chunk, fields)
+        _sync_search_document([profile.pk for profile in chunk])
+        # bulk_update sends no signals; the star summary is in the cached fragments.
+        profile_page.invalidate_artists([profile.pk for profile in chunk])
+    return len(changed)
@@ -16,6 +16,12 @@ class Review(models.Model):
     comment = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Profile page and "my reviews": an artist's reviews, newest first.
+            models.Index(fields=['artist', 'created_at'], name='review_artist_created_idx'),
+        ]
+
     def __str__(self):
         return f'Review by {self.organizer.email} for {self.artist.email} - {self.rating} stars'
 
@@ -30,6 +36,10 @@ class Favorite(models.Model):
 
     class Meta:
         unique_together = ('artist', 'organizer') # Prevents duplicate favorites
+        indexes = [
+            # The unique index leads with artist; this one serves "my favorites".
+            models.Index(fields=['organizer', 'created_at'], name='favorite_organizer_idx'),
+        ]
 
     def __str__(self):
         return f'{self.organizer.email} favorited {self.artist.email}'
@@ -0,0 +1,288 @@
+# accounts/search.py
+"""
+Artist search engine.
+
+Every approved ArtistProfile has one ArtistSearchDocument row holding the
+text we search on (names, bio, group member names and roles) plus
+normalized category/location keys. The document is rebuilt whenever the
+profile or one of its group members changes (see accounts/signals.py).
+
+Free-text queries are answered by a backend chosen from the database
+vendor:
+  - SQLite     -> FTS5 virtual table ranked with bm25()
+  - PostgreSQL -> tsvector column (GIN) + pg_trgm similarity on the name
+  - anything else -> plain icontains on the document (no ranking)
+"""
+import re
+
+from django.db import connection, transaction
+
+from .models import ArtistProfile, ArtistSearchDocument
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize_key(value):
+    """Normalizes a category/location value so equality lookups hit the index."""
+    return (value or '').strip().lower()
+
+
+def tokenize(query):
+    return _TOKEN_RE.findall((query or '').lower())
+
+
+def build_document(profile):
+    """Returns the field values of the search document for a profile."""
+    parts = [profile.contact_name, profile.group_name or '', profile.category, profile.location, profile.bio]
+    if profile.is_group:
+        for member in profile.members.all():
+            parts.extend([member.name, member.role])
+    return {
+        'display_name': str(profile),
+        'category_key': normalize_key(profile.category),
+        'location_key': normalize_key(profile.location),
+        'body': '\n'.join(part for part in parts if part),
+        'sort_name': str(profile).strip().lower(),
+        'price': profile.pricing_per_event,
+        'rating': profile.rating_average,
+        'rating_count': profile.rating_count,
+    }
+
+
+# --- BACKENDS ---
+
+class SimpleSearchBackend:
+    """Fallback for databases without a full-text engine. Unranked."""
+
+    def install(self, conn):
+        pass
+
+    def index(self, artist_ids):
+        pass
+
+    def remove(self, artist_ids):
+        pass
+
+    def search(self, query, category=None, location=None, limit=DEFAULT_LIMIT):
+        docs = _filtered_documents(category, location)
+        for token in tokenize(query):
+            docs = docs.filter(body__icontains=token)
+        return list(docs.order_by('display_name').values_list('artist_id', flat=True)[:limit])
+
+
+class SQLiteSearchBackend(SimpleSearchBackend):
+    """FTS5 index keyed by rowid == artist id."""
+
+    table = 'accounts_artistsearch_fts'
+
+    def install(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} "
+                f"USING fts5(display_name, body, tokenize='unicode61 remove_diacritics 2')"
+            )
+
+    def index(self, artist_ids):
+        if not artist_ids:
+            return
+        rows = ArtistSearchDocument.objects.filter(artist_id__in=artist_ids).values_list('artist_id', 'display_name', 'body')
+        with connection.cursor() as cursor:
+            self._delete(cursor, artist_ids)
+            cursor.executemany(f"INSERT INTO {self.table} (rowid, display_name, body) VALUES (%s, %s, %s)", list(rows))
+
+    def remove(self, artist_ids):
+        if not artist_ids:
+            return
+        with connection.cursor() as cursor:
+            self._delete(cursor, artist_ids)
+
+    def _delete(self, cursor, artist_ids):
+        placeholders = ', '.join(['%s'] * len(artist_ids))
+        cursor.execute(f"DELETE FROM {self.table} WHERE rowid IN ({placeholders})", list(artist_ids))
+
+    def search(self, query, category=None, location=None, limit=DEFAULT_LIMIT):
+        tokens = tokenize(query)
+        if not tokens:
+            return super().search(query, category, location, limit)
+        # Every token must match, each as a prefix ("gui" finds "guitarist").
+        match = ' '.join('"%s"*' % token.replace('"', '""') for token in tokens)
+        sql = [
+            f"SELECT d.artist_id FROM {self.table} f",
+            f"JOIN {ArtistSearchDocument._meta.db_table} d ON d.artist_id = f.rowid",
+            f"WHERE {self.table} MATCH %s",
+        ]
+        params = [match]
+        sql, params = _append_key_filters(sql, params, category, location)
+        # Name hits weigh ten times more than body hits.
+        sql.append(f"ORDER BY bm25({self.table}, 10.0, 1.0) LIMIT %s")
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(' '.join(sql), params)
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend(SimpleSearchBackend):
+    """Weighted tsvector column with a GIN index, plus trigram matching on names."""
+
+    def install(self, conn):
+        table = ArtistSearchDocument._meta.db_table
+        with conn.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS search_doc_vector_idx ON {table} USING gin (search_vector)")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS search_doc_name_trgm_idx ON {table} USING gin (display_name gin_trgm_ops)")
+
+    def index(self, artist_ids):
+        if not artist_ids:
+            return
+        table = ArtistSearchDocument._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET search_vector = "
+                f"setweight(to_tsvector('simple', display_name), 'A') || "
+                f"setweight(to_tsvector('simple', body), 'B') "
+                f"WHERE artist_id = ANY(%s)",
+                [list(artist_ids)],
+            )
+
+    def search(self, query, category=None, location=None, limit=DEFAULT_LIMIT):
+        if not tokenize(query):
+            return super().search(query, category, location, limit)
+        table = ArtistSearchDocument._meta.db_table
+        sql = [
+            f"SELECT d.artist_id FROM {table} d, websearch_to_tsquery('simple', %s) q",
+            "WHERE (d.search_vector @@ q OR d.display_name %% %s)",
+        ]
+        params = [query, query]
+        sql, params = _append_key_filters(sql, params, category, location)
+        sql.append("ORDER BY ts_rank(d.search_vector, q) + similarity(d.display_name, %s) DESC LIMIT %s")
+        params.extend([query, limit])
+        with connection.cursor() as cursor:
+            cursor.execute(' '.join(sql), params)
+            return [row[0] for row in cursor.fetchall()]
+
+
+_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend(conn=None):
+    conn = conn or connection
+    return _BACKENDS.get(conn.vendor, SimpleSearchBackend)()
+
+
+def _filtered_documents(category=None, location=None):
+    docs = ArtistSearchDocument.objects.all()
+    if category:
+        docs = docs.filter(category_key=normalize_key(category))
+    if location:
+        docs = docs.filter(location_key=normalize_key(location))
+    return docs
+
+
+def _append_key_filters(sql, params, category, location):
+    if category:
+        sql.append("AND d.category_key = %s")
+        params.append(normalize_key(category))
+    if location:
+        sql.append("AND d.location_key = %s")
+        params.append(normalize_key(location))
+    return sql, params
+
+
+# --- PUBLIC API ---
+
+# Browse orderings. Each ends in the artist id so keyset cursors are stable.
+BROWSE_SORTS = {
+    'newest': ['-artist_id'],
+    'price_low': ['price', 'artist_id'],
+    'price_high': ['-price', '-artist_id'],
+    'name': ['sort_name', 'artist_id'],
+    'top_rated': ['-rating', '-rating_count', '-artist_id'],
+}
+DEFAULT_BROWSE_SORT = 'newest'
+
+
+def browse_documents(category=None, location=None):
+    """Queryset of search documents (i.e. approved artists) matching the filters."""
+    return _filtered_documents(category, location)
+
+
+def search_artists(query, category=None, location=None, limit=DEFAULT_LIMIT):
+    """Returns artist ids ranked by relevance for a free-text query."""
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    return get_backend().search(query, category=category, location=location, limit=limit)
+
+
+def _write_documents(profiles, backend):
+    ids = [profile.pk for profile in profiles]
+    ArtistSearchDocument.objects.filter(artist_id__in=ids).delete()
+    ArtistSearchDocument.objects.bulk_create(
+        [ArtistSearchDocument(artist=profile, **build_document(profile)) for profile in profiles]
+    )
+    backend.index(ids)
+
+
+def index_artists(artist_ids):
+    """
+    Creates, refreshes or drops the search documents for a set of artists in a
+    fixed number of queries. Use this after queryset.update(), which skips the
+    save signals that normally keep the index in sync.
+    """
+    artist_ids = list(artist_ids)
+    if not artist_ids:
+        return
+    profiles = list(
+        ArtistProfile.objects.filter(pk__in=artist_ids, is_approved=True).prefetch_related('members')
+    )
+    backend = get_backend()
+    with transaction.atomic():
+        indexed = {profile.pk for profile in profiles}
+        dropped = [pk for pk in artist_ids if pk not in indexed]
+        if dropped:
+            ArtistSearchDocument.objects.filter(artist_id__in=dropped).delete()
+            backend.remove(dropped)
+        if profiles:
+            _write_documents(profiles, backend)
+
+
+def index_artist(artist_id):
+    """Creates, refreshes or drops the search document for one artist."""
+    index_artists([artist_id])
+
+
+def remove_artist(artist_id):
+    ArtistSearchDocument.objects.filter(artist_id=artist_id).delete()
+    get_backend().remove([artist_id])
+
+
+def rebuild_index(batch_size=500):
+    """Rebuilds every document from scratch. Returns the number indexed."""
+    backend = get_backend()
+    backend.install(connection)
+    stale_ids = list(
+        ArtistSearchDocument.objects.exclude(artist__is_approved=True).values_list('artist_id', flat=True)
+    )
+    for start in range(0, len(stale_ids), batch_size):
+        chunk = stale_ids[start:start + batch_size]
+        ArtistSearchDocument.objects.filter(artist_id__in=chunk).delete()
+        backend.remove(chunk)
+
+    approved = ArtistProfile.objects.filter(is_approved=True).order_by('pk').prefetch_related('members')
+    total = 0
+    last_pk = None
+    while True:
+        page = approved.filter(pk__gt=last_pk) if last_pk is not None else approved
+        batch = list(page[:batch_size])
+        if not batch:
+            break
+        with transaction.atomic():
+            _write_documents(batch, backend)
+        total += len(batch)
+        last_pk = batch[-1].pk
+    return total
@@ -0,0 +1,148 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from bookings.intervals import local_date
+from bookings.models import Booking
+from reviews.models import Favorite, Review
+
+from .models import ArtistProfile, GroupMember, Availability, OrganizerProfile, PortfolioItem
+from . import analytics, ratings, search, availability, dashboard, favorites, images, profile_page
+
+
+def _schedule_reindex(artist_id):
+    # Run after commit so a profile saved together with its members is indexed once, complete.
+    transaction.on_commit(lambda: search.index_artist(artist_id))
+
+
+@receiver(post_save, sender=ArtistProfile)
+def reindex_artist_on_save(sender, instance, **kwargs):
+    _schedule_reindex(instance.pk)
+
+
+@receiver(post_delete, sender=ArtistProfile)
+def remove_artist_from_index(sender, instance, **kwargs):
+    # The document row itself cascades; this clears the backend's own index.
+    search.get_backend().remove([instance.pk])
+
+
+@receiver(post_save, sender=GroupMember)
+@receiver(post_delete, sender=GroupMember)
+def reindex_group_on_member_change(sender, instance, **kwargs):
+    _schedule_reindex(instance.group_id)
+
+
+@receiver(post_save, sender=Availability)
+@receiver(post_delete, sender=Availability)
+def invalidate_availability_month(sender, instance, **kwargs):
+    availability.invalidate_range(instance.artist_id, instance.date, instance.end_date or instance.date)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def invalidate_organizer_dashboard(sender, instance, **kwargs):
+    dashboard.invalidate_organizer(instance.organizer_id)
+
+
+@receiver(post_save, sender=OrganizerProfile)
+def invalidate_dashboard_on_profile_save(sender, instance, **kwargs):
+    dashboard.invalidate_organizer(instance.pk)
+
+
+@receiver(post_save, sender=ArtistProfile)
+def invalidate_booked_organizer_dashboards(sender, instance, **kwargs):
+    # The highlighted bookings show the artist's profile.
+    dashboard.invalidate_organizers(
+        Booking.objects.filter(artist_id=instance.pk, status=Booking.Status.ACCEPTED).values_list('organizer_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def invalidate_favorite_set(sender, instance, **kwargs):
+    favorites.invalidate_organizer(instance.organizer_id)
+
+
+@receiver(post_save, sender=Booking)
+def count_booking_request(sender, instance, created, **kwargs):
+    if created:
+        analytics.record_request(instance)
+
+
+@receiver(post_save, sender=Review)
+def count_review(sender, instance, created, **kwargs):
+    if created:
+        analytics.record_review(instance)
+    else:
+        # The rating may have been edited; the old value isn't known here.
+        analytics.recount_reviews(instance.artist_id, local_date(instance.created_at))
+
+
+@receiver(post_delete, sender=Review)
+def uncount_review(sender, instance, **kwargs):
+    analytics.record_review(instance, sign=-1)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_stats(sender, instance, created, **kwargs):
+    if created:
+        ratings.apply_review(instance.artist_id, instance.rating)
+    else:
+        # The rating may have been edited; the old value isn't known here.
+        ratings.reconcile([instance.artist_id])
+
+
+@receiver(post_delete, sender=Review)
+def remove_rating_stats(sender, instance, **kwargs):
+    ratings.apply_review(instance.artist_id, instance.rating, sign=-1)
+
+
+@receiver(post_save, sender=ArtistProfile)
+@receiver(post_delete, sender=ArtistProfile)
+def invalidate_profile_page(sender, instance, **kwargs):
+    profile_page.invalidate_artist(instance.pk)
+
+
+@receiver(post_save, sender=PortfolioItem)
+@receiver(post_delete, sender=PortfolioItem)
+def invalidate_profile_page_on_portfolio_change(sender, instance, **kwargs):
+    profile_page.invalidate_artist(instance.artist_id)
+
+
+@receiver(post_save, sender=GroupMember)
+@receiver(post_delete, sender=GroupMember)
+def invalidate_profile_page_on_member_change(sender, instance, **kwargs):
+    profile_page.invalidate_artist(instance.group_id)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_profile_page_on_review_change(sender, instance, **kwargs):
+    profile_page.invalidate_artist(instance.artist_id)
+
+
+@receiver(post_save, sender=OrganizerProfile)
+def invalidate_reviewed_profile_pages(sender, instance, **kwargs):
+    # Reviews show the organizer's name.
+    profile_page.invalidate_artists(
+        Review.objects.filter(organizer_id=instance.pk).values_list('artist_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=ArtistProfile)
+def make_profile_photo_derivatives(sender, instance, **kwargs):
+    images.schedule(instance.profile_photo, on_ready=lambda: profile_page.invalidate_artist(instance.pk))
+
+
+@receiver(post_save, sender=GroupMember)
+def make_member_photo_derivatives(sender, instance, **kwargs):
+    images.schedule(instance.photo, on_ready=lambda: profile_page.invalidate_artist(instance.group_id))
+
+
+@receiver(post_save, sender=PortfolioItem)
+def make_portfolio_image_derivatives(sender, instance, **kwargs):
+    if instance.file_type == 'IMAGE':
+        images.schedule(instance.file, on_ready=lambda: profile_page.invalidate_artist(instance.artist_id))
@@ -0,0 +1,12 @@
+from django import template
+
+from .. import favorites
+
+register = template.Library()
+
+
+@register.filter
+def favorited(artist, user):
+    """`{% if artist|favorited:user %}` - accepts an ArtistProfile, a User or an id."""
+    artist_id = getattr(artist, 'pk', artist)
+    return favorites.is_favorite(user, artist_id)
@@ -0,0 +1,42 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from .. import images
+
+register = template.Library()
+
+
+@register.filter
+def thumbnail_url(field, size='thumb'):
+    """`{{ artist.profile_photo|thumbnail_url:'card' }}` - JPEG derivative URL, or the original's."""
+    return images.url_for(field, size)
+
+
+@register.simple_tag
+def responsive_image(field, size='thumb', **attrs):
+    """
+    A <picture> with WebP and JPEG sources at 1x and 2x for `size`, e.g.
+    `{% responsive_image member.photo 'thumb' alt=member.name class='avatar' %}`.
+    Until the derivatives exist it is a plain <img> of the original.
+    """
+    if not field:
+        return ''
+    attrs = {'loading': 'lazy', **attrs}
+    if not images.is_ready(field):
+        return format_html('<img src="{}"{}>', field.url, flatatt(attrs))
+    width, height, crop = images.SIZES[size]
+    if crop:
+        attrs.setdefault('width', width)
+        attrs.setdefault('height', height)
+
+    def srcset(ext):
+        sources = [f'{images.url_for(field, size, ext)} 1x']
+        if size in images.RETINA:
+            sources.append(f'{images.url_for(field, images.RETINA[size], ext)} 2x')
+        return ', '.join(sources)
+
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}"><img src="{}" srcset="{}"{}></picture>',
+        srcset('webp'), images.url_for(field, size), srcset('jpg'), flatatt(attrs),
+    )
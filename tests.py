@@ -1,3 +1,686 @@
-from django.test import TestCase
+import os
+import shutil
+import smtplib
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template import engines
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings import reservations
+from bookings.models import Booking
+from core.query_plans import QueryPlanAssertionsMixin
+from core.querycount import QueryBudgetMixin
+from PIL import Image
+from reviews.models import Favorite, Review
+
+from . import analytics, availability, dashboard, emails, favorites, images, profile_page, search
+from .admin import approve_artists
+from .templatetags.images import responsive_image, thumbnail_url
+from .models import ArtistApprovalEmail, ArtistDailyStats, ArtistProfile, Availability, GroupMember, OrganizerProfile, PortfolioItem, User
+from .views import EditArtistProfileView
+
+
+def make_artist(n, **kwargs):
+    user = User.objects.create_user(email=f'artist{n}@example.com', password='pw', role='ARTIST')
+    fields = dict(
+        user=user, contact_name=f'Artist {n}', phone='0', category='Singer', location='Mumbai',
+        pricing_per_event=100 + n, is_approved=True,
+    )
+    fields.update(kwargs)
+    return ArtistProfile.objects.create(**fields)
+
+
+def make_jpeg(width=640, height=480):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'teal').save(buffer, 'JPEG')
+    return ContentFile(buffer.getvalue(), name='photo.jpg')
+
+
+def make_organizer(n):
+    user = User.objects.create_user(email=f'organizer{n}@example.com', password='pw', role='ORGANIZER')
+    return OrganizerProfile.objects.create(user=user, full_name=f'Organizer {n}', organization_name='Org', phone='0')
+
+
+class HotQueryPlanTests(QueryPlanAssertionsMixin, TestCase):
+    """The queries behind the busiest pages must stay index-backed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artists = [make_artist(n, category=['Singer', 'DJ'][n % 2]) for n in range(6)]
+        cls.artist = cls.artists[0]
+        cls.organizer = make_organizer(1)
+        today = date.today()
+        cls.past = Booking.objects.create(
+            artist=cls.artist.user, organizer=cls.organizer.user, event_date=today - timedelta(days=10),
+            event_details='Past gig', status=Booking.Status.ACCEPTED,
+        )
+        Booking.objects.create(
+            artist=cls.artist.user, organizer=cls.organizer.user, event_date=today + timedelta(days=10),
+            event_details='Upcoming gig', status=Booking.Status.ACCEPTED,
+        )
+        Booking.objects.create(
+            artist=cls.artists[1].user, organizer=cls.organizer.user, event_date=today + timedelta(days=20),
+            event_details='Request',
+        )
+        Review.objects.create(booking=cls.past, artist=cls.artist.user, organizer=cls.organizer.user, rating=5, comment='Great')
+        Favorite.objects.create(artist=cls.artist.user, organizer=cls.organizer.user)
+        availability.block_ranges(cls.artist, [(today + timedelta(days=3), today + timedelta(days=5))])
+        search.index_artists([artist.pk for artist in cls.artists])
+
+    def test_browse_filters_and_sorts(self):
+        url = reverse('artist_list_feed')
+        for params in [
+            {},
+            {'category': 'Singer', 'location': 'Mumbai'},
+            {'sort': 'price_low'},
+            {'category': 'DJ', 'sort': 'name'},
+            {'sort': 'top_rated'},
+            # free_between(): two correlated scalar subqueries, each a descending seek for the previous period.
+            {'available_from': (date.today() + timedelta(days=4)).isoformat()},
+        ]:
+            with self.subTest(params=params), self.assertNoFullScans():
+                self.client.get(url, params)
+
+    def test_artist_profile_and_calendar(self):
+        with self.assertNoFullScans():
+            self.client.get(reverse('artist_profile', args=[self.artist.pk]))
+        with self.assertNoFullScans():
+            self.client.get(reverse('artist_availability', args=[self.artist.pk]), {'months': 3})
+
+    def test_organizer_dashboard(self):
+        self.client.force_login(self.organizer.user)
+        with self.assertNoFullScans():
+            self.client.get(reverse('dashboard'))
+
+    def test_organizer_booking_lists(self):
+        self.client.force_login(self.organizer.user)
+        for name, key in [
+            ('organizer_bookings', 'bookings'),
+            ('organizer_upcoming_events', 'upcoming_bookings'),
+            ('organizer_past_events', 'past_bookings'),
+            ('favorite_artists', 'favorite_artists'),
+        ]:
+            with self.subTest(view=name), self.assertNoFullScans():
+                response = self.client.get(reverse(name))
+                list(response.context[key])
+
+    def test_artist_pages(self):
+        self.client.force_login(self.artist.user)
+        with self.assertNoFullScans():
+            response = self.client.get(reverse('manage_availability'))
+            list(response.context['blocked_dates'])
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Page query counts stay flat however many reviews, members or favorites there are."""
+
+    # Cold-cache costs (assertWithinBudget clears the caches first). Logged-in
+    # pages include the session, the user and the notification counters; the
+    # profile is budgeted for an organizer, who also gets the portfolio.
+    query_budgets = {
+        'artist_profile': 8,
+        'artist_list': 4,
+        'artist_list_feed': 4,
+        'artist_availability': 2,
+        'favorite_ids': 3,
+        'artist_stats': 4,
+    }
+    # Repeat visits: the fragments and counters come from the cache, so only the
+    # profile row is read, after the session and the user when logged in.
+    warm_query_budgets = {
+        'artist_profile': 3,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artist = make_artist(0, is_group=True, group_name='The Band')
+        cls.others = [make_artist(n) for n in range(1, 5)]
+        cls.organizers = [make_organizer(n) for n in range(5)]
+        past = date.today() - timedelta(days=10)
+        for n, organizer in enumerate(cls.organizers):
+            GroupMember.objects.create(group=cls.artist, name=f'Member {n}', role='Vocalist')
+            PortfolioItem.objects.create(artist=cls.artist, file_type='IMAGE', title=f'Item {n}', url='https://example.com/')
+            booking = Booking.objects.create(
+                artist=cls.artist.user, organizer=organizer.user, event_date=past,
+                event_details='Gig', status=Booking.Status.ACCEPTED,
+            )
+            Review.objects.create(booking=booking, artist=cls.artist.user, organizer=organizer.user, rating=4, comment='Good')
+        for artist in cls.others:
+            Favorite.objects.create(artist=artist.user, organizer=cls.organizers[0].user)
+        search.index_artists([cls.artist.pk] + [artist.pk for artist in cls.others])
+
+    def test_artist_profile(self):
+        self.assertWithinBudget('artist_profile', args=[self.artist.pk])
+        self.client.force_login(self.organizers[0].user)
+        response = self.assertWithinBudget('artist_profile', args=[self.artist.pk])
+        self.assertContains(response, 'Organizer 4')
+
+    def test_artist_profile_from_cache(self):
+        response = self.assertWithinBudget('artist_profile', args=[self.artist.pk], warm=True)
+        self.assertContains(response, 'Member 4')
+        self.client.force_login(self.organizers[0].user)
+        response = self.assertWithinBudget('artist_profile', args=[self.artist.pk], warm=True)
+        self.assertContains(response, 'Organizer 4')
+
+    def test_browse(self):
+        self.client.force_login(self.organizers[0].user)
+        self.assertWithinBudget('artist_list')
+        response = self.assertWithinBudget('artist_list_feed')
+        self.assertEqual(sum(result['is_favorite'] for result in response.json()['results']), len(self.others))
+
+    def test_json_endpoints(self):
+        self.client.force_login(self.organizers[0].user)
+        self.assertWithinBudget('artist_availability', args=[self.artist.pk])
+        self.assertWithinBudget('favorite_ids')
+        self.client.force_login(self.artist.user)
+        self.assertWithinBudget('artist_stats')
+
+
+class BlockRangesTests(TestCase):
+    """Booked and manually blocked periods only merge with their own kind."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artist = make_artist(1)
+
+    def periods(self):
+        return list(Availability.objects.filter(artist=self.artist).order_by('date').values_list('date', 'end_date', 'is_booked'))
+
+    def jan(self, day):
+        return date(2030, 1, day)
+
+    def test_same_kind_merges(self):
+        availability.block_ranges(self.artist, [(self.jan(1), self.jan(5))])
+        self.assertEqual(availability.block_ranges(self.artist, [(self.jan(6), self.jan(7))]), 2)
+        self.assertEqual(self.periods(), [(self.jan(1), self.jan(7), False)])
+
+    def test_booking_next_to_manual_block_stays_separate(self):
+        availability.block_ranges(self.artist, [(self.jan(1), self.jan(5))])
+        self.assertEqual(availability.block_ranges(self.artist, [(self.jan(6), self.jan(6))], is_booked=True), 1)
+        self.assertEqual(self.periods(), [(self.jan(1), self.jan(5), False), (self.jan(6), self.jan(6), True)])
+
+    def test_booking_inside_manual_block_splits_it(self):
+        availability.block_ranges(self.artist, [(self.jan(1), self.jan(10))])
+        self.assertEqual(availability.block_ranges(self.artist, [(self.jan(4), self.jan(5))], is_booked=True), 0)
+        self.assertEqual(self.periods(), [
+            (self.jan(1), self.jan(3), False), (self.jan(4), self.jan(5), True), (self.jan(6), self.jan(10), False),
+        ])
+
+    def test_manual_block_over_booking_keeps_it_booked(self):
+        availability.block_ranges(self.artist, [(self.jan(4), self.jan(5))], is_booked=True)
+        self.assertEqual(availability.block_ranges(self.artist, [(self.jan(1), self.jan(10))]), 8)
+        self.assertEqual(self.periods(), [
+            (self.jan(1), self.jan(3), False), (self.jan(4), self.jan(5), True), (self.jan(6), self.jan(10), False),
+        ])
+
+
+class AnalyticsTests(TestCase):
+    """Daily rollups stay in step with bookings and reviews, and never go negative."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artist = make_artist(1)
+        cls.organizer = make_organizer(1)
+
+    def row(self, day=None):
+        return ArtistDailyStats.objects.filter(artist=self.artist, day=day or timezone.localdate()).values(
+            'requests', 'reviews', 'rating_total',
+        ).first()
+
+    def book_and_review(self, rating):
+        booking = Booking.objects.create(
+            artist=self.artist.user, organizer=self.organizer.user, event_date=date.today() - timedelta(days=1),
+            event_details='Gig', status=Booking.Status.COMPLETED,
+        )
+        return Review.objects.create(booking=booking, artist=self.artist.user, organizer=self.organizer.user, rating=rating, comment='-')
+
+    def test_record_creates_then_adds(self):
+        day = date(2030, 1, 1)
+        analytics.record(self.artist.pk, day, requests=1)
+        analytics.record(self.artist.pk, day, requests=2, reviews=1, rating_total=4)
+        self.assertEqual(self.row(day), {'requests': 3, 'reviews': 1, 'rating_total': 4})
+
+    def test_negative_deltas_stop_at_zero(self):
+        day = date(2030, 1, 1)
+        analytics.record(self.artist.pk, day, reviews=-1, rating_total=-5)
+        self.assertIsNone(self.row(day))
+        analytics.record(self.artist.pk, day, requests=1, rating_total=3)
+        analytics.record(self.artist.pk, day, requests=-1, rating_total=-5)
+        self.assertEqual(self.row(day), {'requests': 0, 'reviews': 0, 'rating_total': 0})
+
+    def test_review_create_edit_delete(self):
+        review = self.book_and_review(5)
+        self.assertEqual(self.row(), {'requests': 1, 'reviews': 1, 'rating_total': 5})
+        review.rating = 2
+        review.save()
+        self.assertEqual(self.row(), {'requests': 1, 'reviews': 1, 'rating_total': 2})
+        review.delete()
+        self.assertEqual(self.row(), {'requests': 1, 'reviews': 0, 'rating_total': 0})
+
+    def test_artist_summary(self):
+        today = date(2030, 1, 31)
+        analytics.record(self.artist.pk, today, requests=2, accepted=1, declined=1, reviews=1, rating_total=5)
+        analytics.record(self.artist.pk, today - timedelta(days=3), reviews=1, rating_total=3)
+        # Previous window: only used for the rating change.
+        analytics.record(self.artist.pk, today - timedelta(days=10), reviews=1, rating_total=2)
+        summary = analytics.artist_summary(self.artist.pk, days=7, today=today)
+        self.assertEqual(len(summary['series']), 7)
+        self.assertEqual(summary['series'][-1]['day'], today)
+        self.assertEqual(summary['totals']['requests'], 2)
+        self.assertEqual(summary['totals']['acceptance_rate'], 50)
+        self.assertEqual(summary['totals']['average_rating'], 4)
+        self.assertEqual(summary['rating_change'], 2)
+
+    def test_backfill_matches_live_counters(self):
+        for rating in (5, 3):
+            self.book_and_review(rating)
+        live = self.row()
+        ArtistDailyStats.objects.filter(artist=self.artist).update(requests=0, reviews=0, rating_total=0)
+        self.assertEqual(analytics.backfill_artist(self.artist.pk), 1)
+        self.assertEqual(self.row(), live)
+        self.assertEqual(live, {'requests': 2, 'reviews': 2, 'rating_total': 8})
+
+
+class RatingStatsTests(TestCase):
+    """The denormalized rating columns follow review create, edit and delete."""
+
+    fields = ('rating_count', 'rating_sum', 'rating_average', 'rating_2_count', 'rating_4_count')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artist = make_artist(1)
+        cls.organizer = make_organizer(1)
+
+    def stats(self):
+        return ArtistProfile.objects.filter(pk=self.artist.pk).values_list(*self.fields).get()
+
+    def review(self, rating):
+        booking = Booking.objects.create(
+            artist=self.artist.user, organizer=self.organizer.user, event_date=date.today() - timedelta(days=1),
+            event_details='Gig', status=Booking.Status.COMPLETED,
+        )
+        return Review.objects.create(booking=booking, artist=self.artist.user, organizer=self.organizer.user, rating=rating, comment='-')
+
+    def test_create_edit_delete(self):
+        first = self.review(4)
+        self.review(4)
+        self.assertEqual(self.stats(), (2, 8, 4.0, 0, 2))
+        first.rating = 2
+        first.save()
+        self.assertEqual(self.stats(), (2, 6, 3.0, 1, 1))
+        first.delete()
+        self.assertEqual(self.stats(), (1, 4, 4.0, 0, 1))
+
+    def test_profile_edit_keeps_counters(self):
+        # The edit view loaded the profile before the review landed.
+        stale = ArtistProfile.objects.get(pk=self.artist.pk)
+        self.review(4)
+        self.client.force_login(self.artist.user)
+        data = {
+            'contact_name': 'Renamed', 'group_name': '', 'phone': stale.phone, 'category': stale.category,
+            'location': stale.location, 'pricing_per_event': stale.pricing_per_event, 'bio': 'New bio',
+        }
+        with mock.patch.object(EditArtistProfileView, 'get_object', return_value=stale):
+            response = self.client.post(reverse('edit_artist_profile'), data)
+        self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
+        self.assertEqual(self.stats(), (1, 4, 4.0, 0, 1))
+        self.assertEqual(ArtistProfile.objects.get(pk=self.artist.pk).contact_name, 'Renamed')
+
+    def test_delete_never_goes_below_zero(self):
+        review = self.review(4)
+        # As for a review written before the counters were filled.
+        ArtistProfile.objects.filter(pk=self.artist.pk).update(rating_count=0, rating_sum=0, rating_average=0, rating_4_count=0)
+        review.delete()
+        self.assertEqual(self.stats(), (0, 0, 0.0, 0, 0))
+
+
+class FavoriteSetTests(TestCase):
+    """Cached favorite sets follow every change, even one racing a cache refill."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artists = [make_artist(n) for n in range(2)]
+        cls.organizer = make_organizer(1)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_toggle(self):
+        artist_id = self.artists[0].pk
+        self.assertEqual(favorites.favorite_ids(self.organizer.pk), frozenset())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(favorites.toggle(self.organizer.user, artist_id))
+        self.assertEqual(favorites.favorite_ids(self.organizer.pk), {artist_id})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertFalse(favorites.toggle(self.organizer.user, artist_id))
+        self.assertEqual(favorites.favorite_ids(self.organizer.pk), frozenset())
+
+    def test_set_loaded_before_a_change_is_not_served_after_it(self):
+        # A slow reader takes the token and reads the table before the favorite commits...
+        token = favorites._version(self.organizer.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            Favorite.objects.create(artist=self.artists[1].user, organizer=self.organizer.user)
+        # ...and only stores its (now stale) set afterwards.
+        cache.set(favorites._cache_key(self.organizer.pk, token), frozenset(), favorites.FAVORITES_TIMEOUT)
+        self.assertEqual(favorites.favorite_ids(self.organizer.pk), {self.artists[1].pk})
+
+
+class ImageDerivativeTests(TestCase):
+    """Uploaded photos get their derivatives after commit; templates fall back until then."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        overrides = self.settings(MEDIA_ROOT=media_root, IMAGE_DERIVATIVES_ASYNC=False)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        cache.clear()
+
+    def test_render_derivatives(self):
+        rendered = images.render_derivatives(make_jpeg(1600, 1200).read())
+        self.assertEqual(set(rendered), {(size, ext) for size in images.SIZES for ext in images.FORMATS})
+        with Image.open(BytesIO(rendered['thumb', 'webp'])) as thumb:
+            self.assertEqual((thumb.format, thumb.size), ('WEBP', (120, 120)))
+        with Image.open(BytesIO(rendered['medium', 'jpg'])) as medium:
+            self.assertEqual((medium.format, medium.size), ('JPEG', (800, 600)))
+
+    def test_signals_render_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            artist = make_artist(1, profile_photo=make_jpeg())
+            member = GroupMember.objects.create(group=artist, name='Member', role='Vocalist', photo=make_jpeg())
+            image = PortfolioItem.objects.create(artist=artist, file_type='IMAGE', title='Stage', file=make_jpeg())
+            video = PortfolioItem.objects.create(artist=artist, file_type='VIDEO', title='Clip', file=make_jpeg())
+        for field in (artist.profile_photo, member.photo, image.file):
+            self.assertTrue(default_storage.exists(images.derivative_name(field.name, 'card', 'webp')), field.name)
+        self.assertFalse(default_storage.exists(images.derivative_name(video.file.name, 'thumb', 'jpg')))
+
+    def test_generate_skips_broken_and_oversized_images(self):
+        artist = make_artist(1, profile_photo=ContentFile(b'not an image', name='broken.jpg'))
+        with self.assertLogs('accounts.images', 'WARNING'):
+            self.assertFalse(images.generate(artist.profile_photo))
+        artist.profile_photo = make_jpeg()
+        artist.save()
+        max_pixels = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = 1000
+        self.addCleanup(setattr, Image, 'MAX_IMAGE_PIXELS', max_pixels)
+        with self.assertLogs('accounts.images', 'WARNING'):
+            self.assertFalse(images.generate(artist.profile_photo))
+
+    def test_template_tags(self):
+        photo = make_artist(1, profile_photo=make_jpeg()).profile_photo
+        self.assertEqual(thumbnail_url(photo, 'card'), photo.url)
+        self.assertEqual(responsive_image(photo, 'thumb', alt='Artist'), f'<img src="{photo.url}" alt="Artist" loading="lazy">')
+        self.assertTrue(images.generate(photo))
+        self.assertEqual(thumbnail_url(photo, 'card'), default_storage.url(images.derivative_name(photo.name, 'card', 'jpg')))
+        html = responsive_image(photo, 'thumb', alt='Artist')
+        thumb_webp, card_webp = (default_storage.url(images.derivative_name(photo.name, size, 'webp')) for size in ('thumb', 'card'))
+        self.assertIn(f'<source type="image/webp" srcset="{thumb_webp} 1x, {card_webp} 2x">', html)
+        self.assertIn('width="120"', html)
+        self.assertEqual(responsive_image(None), '')
+
+    def test_broken_pool_is_replaced(self):
+        self.addCleanup(self.shut_down_pool)
+        name = default_storage.save('profile_photos/stage.jpg', make_jpeg())
+        broken = images.get_executor()
+        with self.assertRaises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result(timeout=60)
+        with self.assertLogs('accounts.images', 'WARNING'):
+            future = images._submit(default_storage, name)
+        self.assertIsNot(images.get_executor(), broken)
+        self.assertIn(('thumb', 'jpg'), future.result(timeout=60))
+
+    def shut_down_pool(self):
+        executor = images.get_executor()
+        # Waits for the store callbacks too; they run on the pool's management thread.
+        executor.shutdown()
+        images.discard_executor(executor)
+
+
+class SearchTests(TestCase):
+    """Free-text search ranks name hits first, matches prefixes and follows profile changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.named = make_artist(1, contact_name='Guitar Ravi', bio='Weddings and parties.')
+        cls.mentioned = make_artist(2, contact_name='Meera', bio='Singer who also plays guitar.')
+        cls.band = make_artist(3, contact_name='Arjun', is_group=True, group_name='The Strings')
+        GroupMember.objects.create(group=cls.band, name='Kabir', role='Guitarist')
+        search.index_artists([cls.named.pk, cls.mentioned.pk, cls.band.pk])
+
+    def test_name_hits_rank_first(self):
+        self.assertEqual(search.search_artists('guitar')[:2], [self.named.pk, self.mentioned.pk])
+
+    def test_prefix_matching(self):
+        self.assertEqual(search.search_artists('strin'), [self.band.pk])
+        self.assertIn(self.band.pk, search.search_artists('guitari'))
+        self.assertEqual(search.search_artists('kab'), [self.band.pk])
+
+    def test_filters(self):
+        self.assertEqual(search.search_artists('guitar', category='DJ'), [])
+        self.assertEqual(search.search_artists('meera', location=' mumbai '), [self.mentioned.pk])
+
+    def test_edit_approval_and_deletion_reindex(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mentioned.bio = 'Classical violin.'
+            self.mentioned.save()
+        self.assertEqual(search.search_artists('violin'), [self.mentioned.pk])
+        self.assertNotIn(self.mentioned.pk, search.search_artists('guitar'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mentioned.is_approved = False
+            self.mentioned.save()
+        self.assertEqual(search.search_artists('violin'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mentioned.is_approved = True
+            self.mentioned.save()
+        self.assertEqual(search.search_artists('violin'), [self.mentioned.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mentioned.user.delete()
+        self.assertEqual(search.search_artists('violin'), [])
+        self.assertEqual(search.search_artists('meera'), [])
+
+
+class FakeConnection:
+    """A mail connection that counts opens; `failures` maps a recipient to the errors its sends raise, in turn."""
+
+    def __init__(self, failures=None):
+        self.failures = failures or {}
+        self.opened = 0
+        self.sent = []
+
+    def open(self):
+        self.opened += 1
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        for message in messages:
+            errors = self.failures.get(message.to[0])
+            if errors:
+                raise errors.pop(0)
+            self.sent.append(message.to[0])
+        return len(messages)
+
+
+@mock.patch('accounts.emails.get_template', lambda name: engines.all()[0].from_string('{{ login_url }}'))
+class ApprovalEmailTests(TestCase):
+    """Approval queues mail for opted-in artists; delivery batches it over one connection."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artists = [make_artist(n, is_approved=False) for n in range(1, 4)]
+        User.objects.filter(pk=cls.artists[2].pk).update(email_notifications_enabled=False)
+
+    def queue_all(self):
+        ArtistApprovalEmail.objects.bulk_create(
+            ArtistApprovalEmail(artist=artist, login_url='https://stagelink.test/login/') for artist in self.artists
+        )
+
+    def test_approve_queues_mail_for_opted_in_artists(self):
+        ids = [artist.pk for artist in self.artists]
+        versions = [profile_page.version(pk) for pk in ids]
+        with self.captureOnCommitCallbacks(execute=True):
+            approve_artists(mock.Mock(), RequestFactory().post('/admin/'), ArtistProfile.objects.all())
+        self.assertFalse(ArtistProfile.objects.filter(is_approved=False).exists())
+        self.assertFalse(User.objects.filter(pk__in=ids, is_active=False).exists())
+        self.assertEqual(sorted(ArtistApprovalEmail.objects.values_list('artist_id', flat=True)), ids[:2])
+        self.assertEqual(sorted(search.search_artists('artist')), ids)
+        for pk, old in zip(ids, versions):
+            self.assertNotEqual(profile_page.version(pk), old)
+
+    def test_one_connection_per_batch(self):
+        self.queue_all()
+        connection = FakeConnection()
+        self.assertEqual(emails.send_approval_emails(batch_size=2, connection=connection), (2, 0))
+        self.assertEqual(connection.opened, 1)
+        self.assertEqual(emails.send_approval_emails(batch_size=2, connection=connection), (1, 0))
+        self.assertEqual(connection.opened, 2)
+        self.assertEqual(connection.sent, [artist.user.email for artist in self.artists])
+        self.assertFalse(emails.pending_emails().exists())
+
+    def test_connection_errors_retry_with_backoff(self):
+        self.queue_all()
+        first = self.artists[0].user.email
+        connection = FakeConnection({first: [smtplib.SMTPServerDisconnected('gone'), smtplib.SMTPServerDisconnected('gone')]})
+        with mock.patch('accounts.emails.time.sleep') as sleep:
+            self.assertEqual(emails.send_approval_emails(backoff=0.5, connection=connection), (3, 0))
+        self.assertEqual([c.args for c in sleep.call_args_list], [(0.5,), (1.0,)])
+        self.assertEqual(connection.opened, 3)
+
+    def test_exhausted_retries_leave_the_batch_queued(self):
+        self.queue_all()
+        first = self.artists[0].user.email
+        connection = FakeConnection({first: [smtplib.SMTPServerDisconnected('gone')] * 2})
+        with mock.patch('accounts.emails.time.sleep'), self.assertLogs('accounts.emails', 'WARNING'):
+            self.assertEqual(emails.send_approval_emails(retries=1, connection=connection), (0, 1))
+        queued = ArtistApprovalEmail.objects.get(artist=self.artists[0])
+        self.assertEqual((queued.attempts, queued.last_error), (1, 'gone'))
+        self.assertEqual(emails.pending_emails().count(), 3)
+
+    def test_rejected_message_records_error(self):
+        self.queue_all()
+        rejected = self.artists[1].user.email
+        connection = FakeConnection({rejected: [smtplib.SMTPRecipientsRefused({rejected: (550, b'No such user')})]})
+        with self.assertLogs('accounts.emails', 'WARNING'):
+            self.assertEqual(emails.send_approval_emails(connection=connection), (2, 1))
+        queued = ArtistApprovalEmail.objects.get(artist=self.artists[1])
+        self.assertEqual(queued.attempts, 1)
+        self.assertIn('No such user', queued.last_error)
+        self.assertEqual(list(emails.pending_emails()), [queued])
+
+
+class DashboardSnapshotTests(TestCase):
+    """The cached organizer dashboard is rebuilt after every change it shows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artist = make_artist(1)
+        cls.organizer = make_organizer(1)
+
+    def setUp(self):
+        cache.clear()
+
+    def booking(self, days, status=Booking.Status.PENDING):
+        return Booking.objects.create(
+            artist=self.artist.user, organizer=self.organizer.user, event_date=date.today() + timedelta(days=days),
+            event_details='Gig', status=status,
+        )
+
+    def snapshot_after(self, change):
+        dashboard.organizer_snapshot(self.organizer.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        return dashboard.organizer_snapshot(self.organizer.pk)
+
+    def test_booking_created(self):
+        snapshot = self.snapshot_after(lambda: self.booking(10, Booking.Status.ACCEPTED))
+        self.assertEqual(snapshot['upcoming_events_count'], 1)
+
+    def test_booking_accepted(self):
+        pending = self.booking(10)
+        snapshot = self.snapshot_after(lambda: reservations.accept_booking(pending.pk, self.artist.pk))
+        self.assertEqual(snapshot['upcoming_events_count'], 1)
+        self.assertEqual(snapshot['next_upcoming_event'].pk, pending.pk)
+
+    def test_review(self):
+        past = self.booking(-3, Booking.Status.ACCEPTED)
+        self.assertEqual(dashboard.organizer_snapshot(self.organizer.pk)['past_events_pending_review_count'], 1)
+        snapshot = self.snapshot_after(lambda: Review.objects.create(
+            booking=past, artist=self.artist.user, organizer=self.organizer.user, rating=5, comment='Great',
+        ))
+        self.assertEqual(snapshot['past_events_pending_review_count'], 0)
+
+    def test_favorite(self):
+        snapshot = self.snapshot_after(lambda: Favorite.objects.create(artist=self.artist.user, organizer=self.organizer.user))
+        self.assertEqual(snapshot['favorite_artists_count'], 1)
+
+    def test_artist_profile_edit(self):
+        self.booking(10, Booking.Status.ACCEPTED)
+
+        def rename():
+            self.artist.contact_name = 'Renamed'
+            self.artist.save()
+
+        snapshot = self.snapshot_after(rename)
+        self.assertEqual(snapshot['next_upcoming_event'].artist.artistprofile.contact_name, 'Renamed')
+
+
+class ProfilePageVersionTests(TestCase):
+    """The cached profile fragments get a new version whenever something they show changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.artist = make_artist(1, is_group=True, group_name='The Band')
+        cls.organizer = make_organizer(1)
+
+    def setUp(self):
+        cache.clear()
+
+    def assertNewVersion(self, change):
+        before = profile_page.version(self.artist.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        self.assertNotEqual(profile_page.version(self.artist.pk), before)
+
+    def test_portfolio_item(self):
+        item = PortfolioItem(artist=self.artist, file_type='IMAGE', title='Stage', url='https://example.com/')
+        self.assertNewVersion(item.save)
+        self.assertNewVersion(item.delete)
+
+    def test_group_member(self):
+        member = GroupMember(group=self.artist, name='Kabir', role='Drums')
+        self.assertNewVersion(member.save)
+        member.role = 'Vocals'
+        self.assertNewVersion(member.save)
+        self.assertNewVersion(member.delete)
+
+    def test_review(self):
+        booking = Booking.objects.create(
+            artist=self.artist.user, organizer=self.organizer.user, event_date=date.today() - timedelta(days=1),
+            event_details='Gig', status=Booking.Status.ACCEPTED,
+        )
+        review = Review(booking=booking, artist=self.artist.user, organizer=self.organizer.user, rating=4, comment='Good')
+        self.assertNewVersion(review.save)
+        review.comment = 'Great'
+        self.assertNewVersion(review.save)
+        self.assertNewVersion(review.delete)
+
+    def test_reviewer_rename(self):
+        booking = Booking.objects.create(
+            artist=self.artist.user, organizer=self.organizer.user, event_date=date.today() - timedelta(days=1),
+            event_details='Gig', status=Booking.Status.ACCEPTED,
+        )
+        Review.objects.create(booking=booking, artist=self.artist.user, organizer=self.organizer.user, rating=4, comment='Good')
+        self.organizer.full_name = 'Renamed'
+        self.assertNewVersion(self.organizer.save)
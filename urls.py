@@ -12,9 +12,11 @@ urlpatterns = [
 
     # --- MAIN DASHBOARD ---
     path('dashboard/', views.DashboardView.as_view(), name='dashboard'),
+    path('dashboard/stats/', views.artist_stats_api, name='artist_stats'),
 
     # --- PUBLIC FACING ---
     path('artists/', views.artist_list_view, name='artist_list'),
+    path('artists/feed/', views.artist_list_feed_view, name='artist_list_feed'),
 
     # --- PROFILE MANAGEMENT ---
     path('profile/edit/artist/', views.EditArtistProfileView.as_view(), name='edit_artist_profile'),
@@ -31,11 +33,13 @@ urlpatterns = [
     # --- ORGANIZER-SPECIFIC PAGES ---
     
     path("favorites/", views.favorite_artists_view, name="favorite_artists"),
+    path("favorites/ids/", views.favorite_ids_api, name="favorite_ids"),
     path("toggle-favorite/<int:artist_id>/", views.toggle_favorite, name="toggle_favorite"),
     path('upcoming-events/', views.organizer_upcoming_events_view, name='organizer_upcoming_events'),
     path('past-events/', views.organizer_past_events_view, name='organizer_past_events'),
     path('my-bookings/', views.organizer_bookings_view, name='organizer_bookings'),
     path("artists/<int:artist_id>/", views.artist_profile_view, name="artist_profile"),
+    path("artists/<int:artist_id>/availability/", views.artist_availability_api, name="artist_availability"),
     
     path('group/members/', views.manage_group_members, name='manage_group_members'),
     path('group/members/add/', views.add_group_member, name='add_group_member'),
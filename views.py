@@ -5,12 +5,17 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.http import Http404, HttpResponseRedirect, JsonResponse
 from django.views.generic import CreateView, TemplateView, UpdateView
 from django.contrib import messages
 import calendar
+from datetime import timedelta
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from .forms import GroupMemberForm
+from . import analytics, search, availability, dashboard, favorites, images, profile_page
+from .pagination import KeysetPaginator, InvalidCursor, encode_cursor, decode_cursor
 
 # --- 2. CORRECT MODEL IMPORTS ---
 from bookings.models import Booking
@@ -100,23 +105,16 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         if user.role == 'ARTIST':
             profile = get_object_or_404(ArtistProfile, user=user)
             context['completion_percentage'] = profile.calculate_completion_percentage()
+            # Precomputed daily rollups; the charts page through them via artist_stats_api.
+            context['analytics'] = analytics.artist_summary(profile.pk)
 
         elif user.role == 'ORGANIZER':
-            profile = get_object_or_404(OrganizerProfile, user=user)
-            now = timezone.now()
-            
-            # All queries are now definitively correct
-            upcoming_bookings = Booking.objects.filter(organizer=user, status='ACCEPTED', event_date__gte=now).order_by('event_date')
-            favorite_artists_count = Favorite.objects.filter(organizer=user).count()
-            past_bookings_pending_review = Booking.objects.filter(organizer=user, status='ACCEPTED', event_date__lt=now).exclude(review__organizer=user).order_by('-event_date')
-            
-            context['completion_percentage'] = profile.calculate_completion_percentage()
-            context['upcoming_events_count'] = upcoming_bookings.count()
-            context['next_upcoming_event'] = upcoming_bookings.first()
-            context['favorite_artists_count'] = favorite_artists_count
-            context['past_events_pending_review_count'] = past_bookings_pending_review.count()
-            context['latest_past_event_for_review'] = past_bookings_pending_review.first()
-            
+            # Cached per organizer; built with a single aggregate query on a miss.
+            snapshot = dashboard.organizer_snapshot(user.pk)
+            if snapshot is None:
+                raise Http404("No OrganizerProfile matches the given query.")
+            context.update(snapshot)
+
         return context
 
 # --- 4. ORGANIZER-SPECIFIC VIEWS (AUDITED AND CORRECT) ---
@@ -139,18 +137,105 @@ def organizer_past_events_view(request):
 
 
 # --- Other required views ---
+BROWSE_PAGE_SIZE = 24
+MAX_AVAILABILITY_WINDOW_DAYS = 31
+BROWSE_SORT_CHOICES = [('newest', 'Newest'), ('price_low', 'Price: Low to High'), ('price_high', 'Price: High to Low'), ('name', 'Name'), ('top_rated', 'Top Rated')]
+
+
+def _date_window(request):
+    """
+    The (start, end) range from ?available_from=YYYY-MM-DD[&available_to=...],
+    or None. A missing or earlier end means the single start day.
+    """
+    try:
+        start = parse_date(request.GET.get('available_from') or '')
+        end = parse_date(request.GET.get('available_to') or '')
+    except ValueError:
+        return None
+    if start is None:
+        return None
+    if end is None or end < start:
+        end = start
+    return start, min(end, start + timedelta(days=MAX_AVAILABILITY_WINDOW_DAYS - 1))
+
+
+def _browse_page(request):
+    """
+    Returns (artists, next_cursor, sort) for one page of the browse listing.
+    Filter/sort pages use keyset pagination over the search documents; free-text
+    queries page through a bounded, relevance-ranked id list.
+    """
+    category_filter = request.GET.get('category')
+    location_filter = request.GET.get('location')
+    query = request.GET.get('q', '').strip()
+    cursor = request.GET.get('cursor')
+    sort = request.GET.get('sort') or ('relevance' if query else search.DEFAULT_BROWSE_SORT)
+    window = _date_window(request)
+
+    if query and sort == 'relevance':
+        try:
+            offset = int(decode_cursor(cursor, salt='artist-search')[0]) if cursor else 0
+        except (InvalidCursor, ValueError, IndexError):
+            offset = 0
+        limit = search.MAX_LIMIT if window else offset + BROWSE_PAGE_SIZE + 1
+        artist_ids = search.search_artists(query, category=category_filter, location=location_filter, limit=limit)
+        if window:
+            free = set(ArtistProfile.objects.filter(availability.free_between(*window, artist_ref='pk'), pk__in=artist_ids).values_list('pk', flat=True))
+            artist_ids = [pk for pk in artist_ids if pk in free]
+        page_ids = artist_ids[offset:offset + BROWSE_PAGE_SIZE]
+        next_cursor = encode_cursor([offset + BROWSE_PAGE_SIZE], salt='artist-search') if len(artist_ids) > offset + BROWSE_PAGE_SIZE else None
+        profiles = ArtistProfile.objects.in_bulk(page_ids)
+        return [profiles[pk] for pk in page_ids if pk in profiles], next_cursor, sort
+
+    if sort not in search.BROWSE_SORTS:
+        sort = search.DEFAULT_BROWSE_SORT
+    # Search documents only exist for approved artists and carry indexed filter and sort keys.
+    documents = search.browse_documents(category=category_filter, location=location_filter)
+    if query:
+        documents = documents.filter(artist_id__in=search.search_artists(query, category=category_filter, location=location_filter, limit=search.MAX_LIMIT))
+    if window:
+        documents = documents.filter(availability.free_between(*window))
+    paginator = KeysetPaginator(documents.select_related('artist'), search.BROWSE_SORTS[sort], page_size=BROWSE_PAGE_SIZE, salt=f'artist-browse:{sort}')
+    try:
+        page = paginator.page(cursor)
+    except InvalidCursor:
+        page = paginator.page()
+    return [doc.artist for doc in page], page.next_cursor, sort
+
+
 def artist_list_view(request):
     CATEGORIES = ['Singer', 'Band', 'DJ', 'Musician (Instrumental)', 'Comedian', 'Dancer (Solo)', 'Dance Group', 'Magician', 'Host/MC', 'Speaker']
     LOCATIONS = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad', 'Jaipur', 'Kochi', 'Goa']
-    artists = ArtistProfile.objects.filter(is_approved=True)
-    category_filter = request.GET.get('category')
-    location_filter = request.GET.get('location')
-    if category_filter:
-        artists = artists.filter(category__iexact=category_filter)
-    if location_filter:
-        artists = artists.filter(location__iexact=location_filter)
-    context = {'artists': artists, 'categories': CATEGORIES, 'locations': LOCATIONS, 'selected_category': category_filter, 'selected_location': location_filter}
+    artists, next_cursor, sort = _browse_page(request)
+    next_params = request.GET.copy()
+    next_params['cursor'] = next_cursor or ''
+    context = {
+        'artists': artists, 'categories': CATEGORIES, 'locations': LOCATIONS,
+        'selected_category': request.GET.get('category'), 'selected_location': request.GET.get('location'),
+        'search_query': request.GET.get('q', '').strip(), 'sort_choices': BROWSE_SORT_CHOICES, 'selected_sort': sort,
+        'next_cursor': next_cursor, 'next_page_query': next_params.urlencode(),
+        'available_from': request.GET.get('available_from', ''), 'available_to': request.GET.get('available_to', ''),
+    }
     return render(request, 'accounts/browse_artists.html', context)
+
+
+def artist_list_feed_view(request):
+    """JSON variant of the browse page for infinite scroll."""
+    artists, next_cursor, sort = _browse_page(request)
+    favorite_ids = favorites.favorite_ids_for(request.user)
+    results = [{
+        'id': artist.pk,
+        'name': str(artist),
+        'is_group': artist.is_group,
+        'category': artist.category,
+        'location': artist.location,
+        'pricing_per_event': str(artist.pricing_per_event),
+        'photo_url': artist.profile_photo.url if artist.profile_photo else None,
+        'thumbnail_url': images.url_for(artist.profile_photo, 'thumb') or None,
+        'profile_url': reverse('artist_profile', args=[artist.pk]),
+        'is_favorite': artist.pk in favorite_ids,
+    } for artist in artists]
+    return JsonResponse({'results': results, 'next_cursor': next_cursor, 'sort': sort})
     
 
 
@@ -158,37 +243,73 @@ def artist_list_view(request):
 
 def artist_profile_view(request, artist_id):
     """Displays the public profile for a single artist or group."""
-    artist_profile = get_object_or_404(ArtistProfile, pk=artist_id, is_approved=True)
-
-    # Fetch reviews
-    reviews = Review.objects.filter(artist=artist_profile.user).order_by('-created_at')
-
-    # Fetch unavailable dates
-    unavailable_dates = list(
-        Availability.objects.filter(artist=artist_profile).values_list('date', flat=True)
-    )
+    is_organizer = request.user.is_authenticated and request.user.role == User.Role.ORGANIZER
+    # Portfolio, members and reviews are prefetched by the loader, and only
+    # when their cached fragments (see profile_page.py) need rendering.
+    artist_profile, profile_version = profile_page.load_profile(artist_id, for_organizer=is_organizer)
 
+    # Calendar for the requested month (?month=YYYY-MM), built from per-month
+    # availability bitmaps rather than the artist's full blocked-date history.
     today = timezone.now().date()
-    cal = calendar.Calendar()
-    month_days = cal.monthdatescalendar(today.year, today.month)
-
-    # ✅ Add group members if this is a group
-    group_members = None
-    if artist_profile.is_group:
-        group_members = artist_profile.members.all()
+    year, month = availability.parse_month(request.GET.get('month'), default=(today.year, today.month))
+    calendar_weeks = availability.calendar_weeks(artist_profile.pk, year, month, today=today)
 
     context = {
         'artist': artist_profile,
-        'reviews': reviews,
-        'unavailable_dates': unavailable_dates,
-        'month_days': month_days,
-        'current_month_name': calendar.month_name[today.month],
-        'group_members': group_members,  # <-- added
+        'profile_version': profile_version,
+        'fragment_timeout': profile_page.FRAGMENT_TIMEOUT,
+        'calendar_weeks': calendar_weeks,
+        'current_month_name': f'{calendar.month_name[month]} {year}',
+        'prev_month': '%04d-%02d' % availability.add_months(year, month, -1),
+        'next_month': '%04d-%02d' % availability.add_months(year, month, 1),
     }
     return render(request, 'accounts/artist_profile.html', context)
 
 
-class EditArtistProfileView(LoginRequiredMixin, UpdateView):
+def artist_availability_api(request, artist_id):
+    """
+    Blocked days for a window of months, e.g. ?start=2026-10&months=3.
+    Used by the profile calendar to page through months.
+    """
+    artist_profile = get_object_or_404(ArtistProfile, pk=artist_id, is_approved=True)
+    today = timezone.now().date()
+    year, month = availability.parse_month(request.GET.get('start'), default=(today.year, today.month))
+    try:
+        months = int(request.GET.get('months', 1))
+    except ValueError:
+        months = 1
+    bitmaps = availability.month_bitmaps(artist_profile.pk, year, month, months)
+    return JsonResponse({'months': [
+        {'month': '%04d-%02d' % ym, 'bitmap': bits, 'blocked_days': availability.blocked_days(bits)}
+        for ym, bits in sorted(bitmaps.items())
+    ]})
+
+
+@login_required
+def artist_stats_api(request):
+    """Daily analytics for the logged-in artist's dashboard charts, e.g. ?days=90."""
+    artist_profile = get_object_or_404(ArtistProfile, user=request.user)
+    try:
+        days = int(request.GET.get('days', 30))
+    except ValueError:
+        days = 30
+    return JsonResponse(analytics.artist_summary(artist_profile.pk, days))
+
+
+class FormFieldsUpdateMixin:
+    """Write only the columns the form edits.
+
+    A full save() would write back every column of the instance loaded at the
+    start of the request, undoing the rating counters apply_review() moved with
+    F() expressions in the meantime.
+    """
+    def form_valid(self, form):
+        self.object = form.save(commit=False)
+        self.object.save(update_fields=list(form.fields))
+        form.save_m2m()
+        return HttpResponseRedirect(self.get_success_url())
+
+class EditArtistProfileView(LoginRequiredMixin, FormFieldsUpdateMixin, UpdateView):
     model = ArtistProfile
     form_class = ArtistProfileForm
     template_name = 'dashboards/edit_artist_profile.html'
@@ -196,7 +317,7 @@ class EditArtistProfileView(LoginRequiredMixin, UpdateView):
     def get_object(self):
         return self.request.user.artistprofile
 
-class EditOrganizerProfileView(LoginRequiredMixin, UpdateView):
+class EditOrganizerProfileView(LoginRequiredMixin, FormFieldsUpdateMixin, UpdateView):
     model = OrganizerProfile
     form_class = OrganizerProfileForm
     template_name = 'dashboards/edit_organizer_profile.html'
@@ -311,12 +432,12 @@ def manage_availability_view(request):
     if request.method == 'POST':
         form = AvailabilityForm(request.POST)
         if form.is_valid():
-            date = form.cleaned_data['date']
-            availability, created = Availability.objects.get_or_create(artist=artist_profile, date=date, defaults={'is_booked': True})
-            if created:
-                messages.success(request, f'Date {date} has been blocked out on your calendar.')
+            # A single day, a range or a weekly rule all end up as merged periods in one write.
+            newly_blocked = availability.block_ranges(artist_profile, form.get_ranges())
+            if newly_blocked:
+                messages.success(request, f'{newly_blocked} day(s) have been blocked out on your calendar.')
             else:
-                messages.warning(request, f'Date {date} was already blocked out.')
+                messages.warning(request, 'Those dates were already blocked out.')
             return redirect('manage_availability')
     else:
         form = AvailabilityForm()
@@ -326,10 +447,10 @@ def manage_availability_view(request):
 
 @login_required
 def delete_availability_view(request, pk):
-    availability = get_object_or_404(Availability, pk=pk, artist=request.user.artistprofile)
+    period = get_object_or_404(Availability, pk=pk, artist=request.user.artistprofile)
     if request.method == 'POST':
-        availability.delete()
-        messages.success(request, 'Date removed from your availability.')
+        period.delete()
+        messages.success(request, 'Blocked period removed from your availability.')
         return redirect('manage_availability')
     return redirect('manage_availability')
 
@@ -397,16 +518,23 @@ def booking_detail_view(request, booking_id):
 @login_required
 def toggle_favorite(request, artist_id):
     artist = get_object_or_404(ArtistProfile, pk=artist_id)
-    organizer_profile = get_object_or_404(OrganizerProfile, user=request.user)
+    if request.user.role != User.Role.ORGANIZER:
+        raise Http404
 
-    if artist in organizer_profile.favorite_artists.all():
-        organizer_profile.favorite_artists.remove(artist)
-        messages.success(request, f"{artist.full_name} removed from favorites.")
+    if favorites.toggle(request.user, artist.pk):
+        messages.success(request, f"{artist} added to favorites.")
     else:
-        organizer_profile.favorite_artists.add(artist)
-        messages.success(request, f"{artist.full_name} added to favorites.")
+        messages.success(request, f"{artist} removed from favorites.")
+
+    return redirect(request.META.get("HTTP_REFERER") or "artist_list")
 
-    return redirect(request.META.get("HTTP_REFERER", "discover_artists"))
+
+@login_required
+def favorite_ids_api(request):
+    """The organizer's favorited artist ids, for rendering favorite hearts client-side."""
+    if request.user.role != User.Role.ORGANIZER:
+        raise Http404
+    return JsonResponse({'artist_ids': sorted(favorites.favorite_ids_for(request.user))})
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
 from .models import GroupMember, ArtistProfile